@@ -0,0 +1,97 @@
+# scripts/check_import_time.py
+"""
+Checks that importing the API module stays fast enough for a quick cold start.
+
+Imports `src.main` in fresh interpreters with `-X importtime` and fails (exit 1)
+if the best of several runs exceeds the budget, or if any heavy module that
+should only load lazily (LangChain integrations, Chroma, model runtimes, PDF
+parsing, data-provider SDKs) was imported. Run it from the repository root:
+
+    python scripts/check_import_time.py --budget-ms 1500
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+MODULE = "src.main"
+
+# Top-level packages that must not be imported by `src.main` itself.
+LAZY_PACKAGES = (
+    "alpha_vantage",
+    "chromadb",
+    "fitz",
+    "langchain_community",
+    "langchain_groq",
+    "langchain_huggingface",
+    "langchain_text_splitters",
+    "numpy",
+    "onnxruntime",
+    "pandas",
+    "sentence_transformers",
+    "tavily",
+    "torch",
+    "transformers",
+    "unstructured",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, dict[str, float]]:
+    """Returns the module's cumulative import time and every top-level import (ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    total, packages = 0.0, {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        name = match.group(4)
+        if name == module:
+            total = cumulative_ms
+        top_level = name.split(".")[0]
+        packages[top_level] = max(packages.get(top_level, 0.0), cumulative_ms)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure(MODULE) for _ in range(max(1, args.runs))]
+    total, packages = min(runs, key=lambda run: run[0])
+
+    print(
+        f"import {MODULE}: {total:.0f} ms "
+        f"(best of {len(runs)}, budget {args.budget_ms:.0f} ms)"
+    )
+    print("Slowest top-level packages:")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {name:30s} {ms:8.1f} ms")
+
+    failures = []
+    eager = sorted(name for name in LAZY_PACKAGES if name in packages)
+    if eager:
+        failures.append(f"heavy packages imported eagerly: {', '.join(eager)}")
+    if total > args.budget_ms:
+        failures.append(f"{total:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if failures:
+        sys.exit("FAILED: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import streamlit as st
 import requests
 import time
 import os
+import json
+import itertools
 import markdown
 
 # --- Page Configuration ---
@@ -65,6 +67,78 @@ st.markdown(
 # --- Backend URL Configuration ---
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:7861")
 
+
+def render_canvas(target, answer_markdown: str):
+    """Renders an answer into the canvas; `target` is `st` or an `st.empty()` slot."""
+    html_content = markdown.markdown(answer_markdown)
+    canvas_html = f"""
+        <div class="gemini-canvas">
+            <div class="canvas-header"><h2>Analysis Result</h2></div>
+            <div class="canvas-body">{html_content}</div>
+        </div>
+        """
+    target.markdown(canvas_html, unsafe_allow_html=True)
+
+
+def stream_query(request_body: dict, canvas) -> dict:
+    """Runs a query through /query/stream, rendering the answer into `canvas`."""
+    with st.spinner("AI is analyzing, please wait..."):
+        response = requests.post(
+            f"{BACKEND_URL}/query/stream", json=request_body, stream=True, timeout=600
+        )
+        response.raise_for_status()
+        events = (
+            json.loads(line)
+            for line in response.iter_lines(decode_unicode=True)
+            if line
+        )
+        # Keep the spinner up until the backend has picked a path.
+        first_event = next(events, None)
+
+    response_data, partial_answer, last_render = {}, "", 0.0
+    pending = [first_event] if first_event else []
+    for event in itertools.chain(pending, events):
+        if event["event"] == "token":
+            partial_answer += event["text"]
+            # Re-render at most ~10 times a second, not per token.
+            if time.monotonic() - last_render > 0.1:
+                render_canvas(canvas, partial_answer + " ▌")
+                last_render = time.monotonic()
+        elif event["event"] == "status":
+            render_canvas(canvas, "*Retrieving sources...*")
+        elif event["event"] == "result":
+            response_data = event
+        elif event["event"] == "error":
+            raise RuntimeError(event["message"])
+    return response_data
+
+
+def wait_for_indexing(ticker: str, progress_slot) -> str | None:
+    """
+    Follows the backend's event stream for a ticker until indexing finishes,
+    showing stage progress in `progress_slot`. Returns the final status.
+    """
+    status = None
+    with requests.get(
+        f"{BACKEND_URL}/events/{ticker}", stream=True, timeout=(10, 120)
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue  # Blank separators and keep-alive comments.
+            event = json.loads(line[len("data: ") :])
+            if event["event"] == "progress":
+                progress_slot.progress(
+                    min(max(event["progress"], 0.0), 1.0),
+                    text=f"Indexing the full report: {event['stage']}...",
+                )
+            elif event["event"] == "status":
+                status = event["status"]
+                if status == "processing":
+                    progress_slot.progress(0.0, text="Indexing the full report...")
+    return status
+
+
 # --- Session State Initialization ---
 if "analysis_result" not in st.session_state:
     st.session_state.analysis_result = None
@@ -73,6 +147,9 @@ if "require_manual_ticker" not in st.session_state:
     st.session_state.require_manual_ticker = False
 if "stored_query" not in st.session_state:
     st.session_state.stored_query = {}
+# [NEW] A preliminary answer's ticker and query, re-run once indexing completes
+if "awaiting_index" not in st.session_state:
+    st.session_state.awaiting_index = None
 
 # --- App Layout (40/60 split) ---
 left_column, right_column = st.columns([4, 6])
@@ -119,60 +196,85 @@ with left_column:
     st.markdown("</div>", unsafe_allow_html=True)
 
     if analyze_button:
+        st.session_state.awaiting_index = None
         if not company_input or not question_input:
             st.warning("Please provide both a company/ticker and a question.")
         else:
             with right_column:
-                with st.spinner("AI is analyzing, please wait..."):
-                    # [MODIFIED] Build the request body based on whether manual ticker is used
-                    request_body = {
-                        "company_input": company_input,
-                        "question": question_input,
-                    }
-                    if manual_ticker_input:
-                        request_body["exact_ticker"] = manual_ticker_input
-
-                    try:
-                        response = requests.post(
-                            f"{BACKEND_URL}/query", json=request_body, timeout=600
-                        )
-                        response.raise_for_status()
-                        response_data = response.json()
-
-                        # [MODIFIED] Handle the new API limit status
-                        if response_data.get("status") == "api_limit_exceeded":
-                            st.session_state.require_manual_ticker = True
-                            st.session_state.stored_query = {
-                                "company": company_input,
-                                "question": question_input,
-                            }
-                            st.rerun()
-                        else:
-                            st.session_state.analysis_result = (
-                                response_data.get("answer") or "No answer found."
-                            )
-                            st.session_state.require_manual_ticker = False
-                            st.session_state.stored_query = {}
-
-                    except Exception as e:
+                # [MODIFIED] Stream the answer and render it as it is generated
+                request_body = {
+                    "company_input": company_input,
+                    "question": question_input,
+                }
+                if manual_ticker_input:
+                    request_body["exact_ticker"] = manual_ticker_input
+
+                canvas = st.empty()
+                try:
+                    response_data = stream_query(request_body, canvas)
+
+                    # [MODIFIED] Handle the new API limit status
+                    if response_data.get("status") == "api_limit_exceeded":
+                        st.session_state.require_manual_ticker = True
+                        st.session_state.stored_query = {
+                            "company": company_input,
+                            "question": question_input,
+                        }
+                        st.rerun()
+                    else:
                         st.session_state.analysis_result = (
-                            f"### An Error Occurred\n\n**Details:** `{e}`"
+                            response_data.get("answer") or "No answer found."
                         )
                         st.session_state.require_manual_ticker = False
                         st.session_state.stored_query = {}
+                        # [NEW] Wait for the full report to be indexed, then re-ask.
+                        if response_data.get("status") in (
+                            "complete_preliminary",
+                            "processing",
+                        ) and response_data.get("ticker"):
+                            st.session_state.awaiting_index = {
+                                "ticker": response_data["ticker"],
+                                "request_body": request_body,
+                            }
+
+                except Exception as e:
+                    st.session_state.analysis_result = (
+                        f"### An Error Occurred\n\n**Details:** `{e}`"
+                    )
+                    st.session_state.require_manual_ticker = False
+                    st.session_state.stored_query = {}
             st.rerun()
 
 # --- Right Column (Canvas Output) ---
 with right_column:
     if st.session_state.analysis_result:
-        html_content = markdown.markdown(st.session_state.analysis_result)
-        canvas_html = f"""
-        <div class="gemini-canvas">
-            <div class="canvas-header"><h2>Analysis Result</h2></div>
-            <div class="canvas-body">{html_content}</div>
-        </div>
-        """
-        st.markdown(canvas_html, unsafe_allow_html=True)
+        canvas = st.empty()
+        render_canvas(canvas, st.session_state.analysis_result)
+
+        # [NEW] Update the preliminary answer in place once indexing completes
+        awaiting = st.session_state.awaiting_index
+        if awaiting:
+            progress_slot = st.empty()
+            try:
+                final_status = wait_for_indexing(awaiting["ticker"], progress_slot)
+                progress_slot.empty()
+                if final_status == "indexed":
+                    response_data = stream_query(awaiting["request_body"], canvas)
+                    st.session_state.analysis_result = (
+                        response_data.get("answer")
+                        or st.session_state.analysis_result
+                    )
+                else:
+                    st.session_state.analysis_result += (
+                        f"\n\n*Full report processing for {awaiting['ticker']} "
+                        f"did not complete ({final_status}).*"
+                    )
+            except Exception as e:
+                st.session_state.analysis_result += (
+                    f"\n\n*Stopped waiting for the full analysis: {e}*"
+                )
+            st.session_state.awaiting_index = None
+            st.rerun()
     elif (
         not st.session_state.require_manual_ticker
     ):  # Don't show initial message if asking for ticker
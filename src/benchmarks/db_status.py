@@ -0,0 +1,109 @@
+# src/benchmarks/db_status.py
+"""
+Measures /status-style lookups per second under concurrent readers and writers.
+
+Reader threads call `get_company_status` in a loop while writer threads record
+ingestion progress, against a throwaway database. Each pool size is run in turn
+(0 = open a connection per call) and reads/s, writes/s and lock errors are
+reported for each.
+
+    python -m src.benchmarks.db_status --readers 16 --writers 4 --pool-sizes 0 8
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import src.utils.database_handler as db
+
+TICKERS = [f"T{i:03d}" for i in range(200)]
+
+
+def seed():
+    db.initialize_database()
+    db.execute_batch(
+        [
+            (
+                "INSERT OR REPLACE INTO indexed_companies (ticker, status, indexed_at) VALUES (?, 'indexed', ?)",
+                (ticker, time.time()),
+            )
+            for ticker in TICKERS
+        ]
+    )
+    return [
+        db.enqueue_ingestion_job(ticker, ticker) for ticker in TICKERS[: len(TICKERS) // 4]
+    ]
+
+
+def run_once(pool_size: int, readers: int, writers: int, seconds: float) -> dict:
+    db._pool.close_all()
+    db._pool = db.ConnectionPool(pool_size)
+    job_ids = seed()
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader(offset: int):
+        done, i = 0, offset
+        while not stop.is_set():
+            db.get_company_status(TICKERS[i % len(TICKERS)])
+            done, i = done + 1, i + 7
+        with lock:
+            counts["reads"] += done
+
+    def writer(offset: int):
+        done, errors, i = 0, 0, offset
+        while not stop.is_set():
+            try:
+                db.update_ingestion_job_progress(job_ids[i % len(job_ids)], "embed", 0.5)
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+            i += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "pool_size": pool_size,
+        "reads_per_sec": counts["reads"] / seconds,
+        "writes_per_sec": counts["writes"] / seconds,
+        "lock_errors": counts["errors"],
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[0, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="db_bench_") as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        print(f"{'pool':>5} {'reads/s':>10} {'writes/s':>10} {'lock errors':>12}")
+        for pool_size in args.pool_sizes:
+            r = run_once(pool_size, args.readers, args.writers, args.seconds)
+            print(
+                f"{r['pool_size']:>5} {r['reads_per_sec']:>10.0f} "
+                f"{r['writes_per_sec']:>10.0f} {r['lock_errors']:>12}"
+            )
+        db._pool.close_all()
+
+
+if __name__ == "__main__":
+    main_cli()
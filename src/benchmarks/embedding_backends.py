@@ -0,0 +1,139 @@
+# src/benchmarks/embedding_backends.py
+"""
+Compares embedding backends on throughput and retrieval agreement.
+
+Each backend embeds the same corpus of chunk-sized texts and a set of queries.
+Throughput is reported in chunks/s. Agreement with the PyTorch baseline is
+reported as recall@5 (the share of the baseline's top 5 chunks per query that
+the backend also ranks in its top 5) and the mean cosine between the two
+backends' vectors for the same chunk. The corpus is synthetic filing prose by
+default; pass --texts with one chunk per line to use real ones.
+
+    python -m src.benchmarks.embedding_backends --chunks 512 --backends torch onnx onnx-int8
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.core.embeddings import (
+    EMBEDDING_BACKENDS,
+    EMBEDDING_MAX_BATCH_SIZE,
+    EMBEDDING_MODEL_NAME,
+    load_embedding_model,
+)
+
+COMPANIES = ["Tata Steel", "Infosys", "Reliance", "Apple", "Microsoft", "Siemens"]
+SUBJECTS = [
+    "Revenue from operations",
+    "EBITDA margin",
+    "Net debt",
+    "Free cash flow",
+    "Capital expenditure",
+    "Order backlog",
+    "Employee attrition",
+    "Dividend per share",
+]
+MOVES = ["rose", "fell", "was flat", "improved", "declined", "recovered"]
+DRIVERS = [
+    "on higher realisations in the domestic market",
+    "as input costs for coking coal eased",
+    "due to weaker demand from European customers",
+    "after the completion of the expansion project",
+    "reflecting one-off restructuring charges",
+    "as the company prepaid long-term borrowings",
+    "on the back of strong services growth",
+    "following currency headwinds in emerging markets",
+]
+QUESTIONS = [
+    "How did {company}'s {subject} change {driver}?",
+    "What explains the movement in {subject} at {company}?",
+    "Did {company} report lower {subject} this year?",
+]
+
+
+def make_corpus(chunks: int, queries: int, seed: int = 7) -> tuple[list, list]:
+    rng = random.Random(seed)
+
+    def sentence(company: str) -> str:
+        return (
+            f"{rng.choice(SUBJECTS)} at {company} {rng.choice(MOVES)} "
+            f"{rng.randint(1, 40)}.{rng.randint(0, 9)}% {rng.choice(DRIVERS)}."
+        )
+
+    texts = []
+    for _ in range(chunks):
+        company = rng.choice(COMPANIES)
+        texts.append(" ".join(sentence(company) for _ in range(rng.randint(3, 12))))
+    questions = [
+        rng.choice(QUESTIONS).format(
+            company=rng.choice(COMPANIES),
+            subject=rng.choice(SUBJECTS).lower(),
+            driver=rng.choice(DRIVERS),
+        )
+        for _ in range(queries)
+    ]
+    return texts, questions
+
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+
+
+def run_backend(backend: str, texts: list[str], questions: list[str], batch_size: int):
+    model = load_embedding_model(EMBEDDING_MODEL_NAME, backend, batch_size)
+    model.embed_documents(texts[:16])  # Warm up.
+    start = time.perf_counter()
+    doc_vectors = np.asarray(model.embed_documents(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    query_vectors = np.asarray(
+        [model.embed_query(question) for question in questions], dtype=np.float32
+    )
+    return len(texts) / elapsed, doc_vectors, query_vectors
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--texts", help="File with one chunk of text per line.")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(EMBEDDING_BACKENDS),
+        choices=EMBEDDING_BACKENDS,
+    )
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_MAX_BATCH_SIZE)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    texts, questions = make_corpus(args.chunks, args.queries)
+    if args.texts:
+        with open(args.texts) as f:
+            texts = [line.strip() for line in f if line.strip()][: args.chunks]
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    baseline = None
+    print(f"{len(texts)} chunks, {len(questions)} queries, recall@{args.k} vs torch")
+    for backend in backends:
+        rate, doc_vectors, query_vectors = run_backend(
+            backend, texts, questions, args.batch_size
+        )
+        if baseline is None:
+            baseline = (rate, doc_vectors, top_k(doc_vectors, query_vectors, args.k))
+        base_rate, base_docs, base_top = baseline
+        found = top_k(doc_vectors, query_vectors, args.k)
+        recall = np.mean(
+            [len(set(a) & set(b)) / args.k for a, b in zip(base_top, found)]
+        )
+        cosine = np.mean(np.sum(base_docs * doc_vectors, axis=1))
+        print(
+            f"{backend:10s} {rate:8.1f} chunks/s ({rate / base_rate:4.2f}x)  "
+            f"recall@{args.k} {recall:.3f}  mean cosine to torch {cosine:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,108 @@
+# src/benchmarks/live_retriever.py
+"""
+Compares the preliminary-answer retrieval paths: an ephemeral Chroma collection
+built with `Chroma.from_documents` versus `InMemoryVectorRetriever`.
+
+Each run builds a retriever over freshly chunked news-sized documents and
+answers one query, which is what the live path does per request. Embeddings come
+from a deterministic hashing stand-in by default, so the numbers isolate the
+vector-store overhead; pass --real-model to include the shared embedding model.
+
+    python -m src.benchmarks.live_retriever --docs 5 10 25 --runs 20
+"""
+
+import argparse
+import statistics
+import time
+import zlib
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.core.retrievers import InMemoryVectorRetriever
+
+QUERY = "What did the company report for quarterly revenue and guidance?"
+
+
+class HashingEmbeddings(Embeddings):
+    """Cheap, deterministic 384-d vectors seeded from each text's CRC32."""
+
+    def _vector(self, text: str) -> list[float]:
+        rng = np.random.default_rng(zlib.crc32(text.encode()))
+        return rng.standard_normal(384, dtype=np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vector(text)
+
+
+def make_documents(count: int, run: int) -> list[Document]:
+    paragraph = (
+        "Revenue rose on strong services demand while margins narrowed. "
+        "Management reiterated full-year guidance and announced a buyback. "
+    )
+    return [
+        Document(
+            page_content=f"Article {run}-{i}. " + paragraph * 20,
+            metadata={"url": f"https://news.example/{run}/{i}", "title": f"Story {i}"},
+        )
+        for i in range(count)
+    ]
+
+
+def chroma_path(chunks, embedding):
+    retriever = Chroma.from_documents(chunks, embedding).as_retriever(
+        search_kwargs={"k": 5}
+    )
+    return retriever.invoke(QUERY)
+
+
+def numpy_path(chunks, embedding):
+    retriever = InMemoryVectorRetriever.from_documents(chunks, embedding, k=5)
+    return retriever.invoke(QUERY)
+
+
+def time_path(path, doc_count: int, runs: int, embedding) -> list[float]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100)
+    timings = []
+    for run in range(runs):
+        chunks = splitter.split_documents(make_documents(doc_count, run))
+        start = time.perf_counter()
+        results = path(chunks, embedding)
+        timings.append(time.perf_counter() - start)
+        assert len(results) == min(5, len(chunks))
+    return timings
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, nargs="+", default=[5, 10, 25])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    if args.real_model:
+        from src.core.embeddings import get_embedding_service
+
+        embedding = get_embedding_service()
+        embedding.warmup()
+    else:
+        embedding = HashingEmbeddings()
+
+    print(f"{'docs':>5} {'chroma p50 ms':>14} {'numpy p50 ms':>13} {'speedup':>8}")
+    for doc_count in args.docs:
+        chroma = statistics.median(time_path(chroma_path, doc_count, args.runs, embedding))
+        numpy = statistics.median(time_path(numpy_path, doc_count, args.runs, embedding))
+        print(
+            f"{doc_count:>5} {chroma * 1000:>14.2f} {numpy * 1000:>13.2f} "
+            f"{chroma / numpy:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,342 @@
+# src/benchmarks/load_test.py
+"""
+Load-tests the API at increasing concurrency and reports latency curves.
+
+The app is served by one uvicorn worker on a local socket, with every external
+service replaced by the stand-ins in `src.benchmarks.stubs` and ingestion
+jobs accepted but never run. Seeded tickers cover each /query branch:
+indexed (full RAG answer), processing (status message) and new (scheduling
+plus a preliminary answer from live news). Virtual users send a weighted mix
+of these while background clients poll GET /status/{ticker}.
+
+Each concurrency level reports throughput and p50/p95/p99 latency per endpoint
+and branch. The server's event loop is sampled the whole time, and a level is
+flagged when the loop stalls for longer than `--stall-ms`. The load is
+generated in a separate process so it doesn't compete with the server for the
+GIL.
+
+    python -m src.benchmarks.load_test --concurrency 1 8 32 64 --duration 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+BRANCHES = ("indexed", "processing", "new")
+
+
+# --- Load generator (runs in a child process) ---
+
+
+async def _virtual_user(client, plan: dict, rng: random.Random, records: list, stop):
+    while not stop.is_set():
+        branch = rng.choices(BRANCHES, weights=plan["mix"])[0]
+        if branch == "new":
+            company = f"N{uuid.uuid4().hex[:9]} Holdings"
+        else:
+            company = f"{rng.choice(plan['tickers'][branch])} Industries"
+        # Unique questions, so indexed queries measure generation, not the cache.
+        body = {"company_input": company, "question": f"How did margins move? #{rng.random()}"}
+        start = time.perf_counter()
+        try:
+            response = await client.post("/query", json=body)
+            code = response.status_code
+            outcome = response.json().get("status") if code == 200 else None
+        except Exception:
+            code, outcome = None, None
+        records.append(("/query", branch, outcome, code, time.perf_counter() - start))
+
+
+async def _poller(client, plan: dict, rng: random.Random, records: list, stop):
+    tickers = plan["tickers"]["indexed"] + plan["tickers"]["processing"]
+    while not stop.is_set():
+        ticker = rng.choice(tickers)
+        start = time.perf_counter()
+        try:
+            response = await client.get(f"/status/{ticker}")
+            code, outcome = response.status_code, response.json().get("status")
+        except Exception:
+            code, outcome = None, None
+        records.append(("/status", "poll", outcome, code, time.perf_counter() - start))
+        try:
+            await asyncio.wait_for(stop.wait(), plan["poll_interval"])
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _generate_load(base_url: str, plan: dict) -> list:
+    import httpx
+
+    users = plan["concurrency"] + plan["pollers"]
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    records, stop = [], asyncio.Event()
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=plan["timeout"]
+    ) as client:
+        tasks = [
+            asyncio.create_task(
+                _virtual_user(client, plan, random.Random(i), records, stop)
+            )
+            for i in range(plan["concurrency"])
+        ]
+        tasks += [
+            asyncio.create_task(_poller(client, plan, random.Random(-i), records, stop))
+            for i in range(1, plan["pollers"] + 1)
+        ]
+        await asyncio.sleep(plan["duration"])
+        stop.set()
+        await asyncio.gather(*tasks)
+    return records
+
+
+def _client_process(base_url: str, plan: dict, results):
+    results.put(asyncio.run(_generate_load(base_url, plan)))
+
+
+# --- Server (runs in this process) ---
+
+
+class LoopMonitor:
+    """Samples how late the server's event loop wakes from a short sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._lags = []
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            with self._lock:
+                self._lags.append(lag)
+
+    def take(self) -> list[float]:
+        with self._lock:
+            lags, self._lags = self._lags, []
+        return lags
+
+
+class StubIngestionPool:
+    """Accepts ingestion jobs without running them, so new tickers stay processing."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, ticker: str, company_name: str, priority: int = 0) -> int:
+        self.submitted += 1
+        return self.submitted
+
+
+def seed_tickers(indexed: int, processing: int) -> dict:
+    """Creates indexed tickers with stored chunks, and tickers mid-ingestion."""
+    from langchain_core.documents import Document
+
+    import src.utils.database_handler as db
+    from src.benchmarks.stubs import company_overview, news_results
+    from src.core.processing import CollectionSync, batch_chunks, embed_batches
+
+    tickers = {
+        "indexed": [f"IDX{i:03d}" for i in range(indexed)],
+        "processing": [f"PRC{i:03d}" for i in range(processing)],
+    }
+    for ticker in tickers["indexed"]:
+        docs = [
+            Document(
+                page_content=result["content"],
+                metadata={"url": result["url"], "title": result["title"]},
+            )
+            for result in news_results(f"{ticker} Industries", 20)
+        ]
+        sync = CollectionSync(ticker)
+        for _ in sync.upsert(embed_batches(sync.skip_unchanged(batch_chunks(docs)))):
+            pass
+        db.mark_company_as_processing(ticker)
+        db.mark_company_as_indexed(ticker, company_overview(ticker))
+    for ticker in tickers["processing"]:
+        db.mark_company_as_processing(ticker)
+    return tickers
+
+
+# --- Report ---
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize_level(
+    concurrency: int, duration: float, records: list, lags: list, stall_ms: float
+) -> dict:
+    groups = defaultdict(list)
+    for endpoint, branch, outcome, code, latency in records:
+        groups[(endpoint, branch)].append((outcome, code, latency))
+
+    endpoints = {}
+    for (endpoint, branch), rows in sorted(groups.items()):
+        latencies = sorted(latency for _, code, latency in rows if code == 200)
+        errors = sum(1 for _, code, _ in rows if code != 200)
+        outcomes = defaultdict(int)
+        for outcome, _, _ in rows:
+            outcomes[str(outcome)] += 1
+        endpoints[f"{endpoint} {branch}"] = {
+            "requests": len(rows),
+            "errors": errors,
+            "throughput_rps": len(latencies) / duration,
+            "p50_ms": 1000 * statistics.median(latencies) if latencies else None,
+            "p95_ms": 1000 * percentile(latencies, 0.95) if latencies else None,
+            "p99_ms": 1000 * percentile(latencies, 0.99) if latencies else None,
+            "outcomes": dict(outcomes),
+        }
+
+    lags = sorted(lags) or [0.0]
+    queries = sum(1 for r in records if r[0] == "/query" and r[3] == 200)
+    return {
+        "concurrency": concurrency,
+        "query_throughput_rps": queries / duration,
+        "endpoints": endpoints,
+        "event_loop": {
+            "max_lag_ms": 1000 * lags[-1],
+            "p99_lag_ms": 1000 * percentile(lags, 0.99),
+            "stalls": sum(1 for lag in lags if lag * 1000 > stall_ms),
+            "stalled": lags[-1] * 1000 > stall_ms,
+        },
+    }
+
+
+def print_level(level: dict, stall_ms: float):
+    loop = level["event_loop"]
+    flag = f"  STALLED (> {stall_ms:.0f} ms)" if loop["stalled"] else ""
+    print(
+        f"\nconcurrency {level['concurrency']}: "
+        f"{level['query_throughput_rps']:.1f} queries/s, event loop max lag "
+        f"{loop['max_lag_ms']:.1f} ms, p99 {loop['p99_lag_ms']:.1f} ms, "
+        f"{loop['stalls']} stalls{flag}"
+    )
+    print(
+        f"  {'endpoint / branch':24s} {'req':>6s} {'err':>5s} {'rps':>7s} "
+        f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+    )
+    for name, stats in level["endpoints"].items():
+        p50, p95, p99 = (
+            f"{stats[key]:8.1f}" if stats[key] is not None else f"{'-':>8s}"
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        )
+        print(
+            f"  {name:24s} {stats['requests']:6d} {stats['errors']:5d} "
+            f"{stats['throughput_rps']:7.1f} {p50} {p95} {p99}"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument(
+        "--mix",
+        type=float,
+        nargs=3,
+        default=[70, 20, 10],
+        metavar=("INDEXED", "PROCESSING", "NEW"),
+        help="Relative weights of the /query branches.",
+    )
+    parser.add_argument("--pollers", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=2)
+    parser.add_argument("--indexed-tickers", type=int, default=20)
+    parser.add_argument("--processing-tickers", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--api-latency", type=float, default=0.1)
+    parser.add_argument("--stall-ms", type=float, default=100)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    wanted = 2 * (max(args.concurrency) + args.pollers) + 256
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, wanted)), hard))
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workspace:
+        # Chroma and the database live in the throwaway workspace.
+        os.chdir(workspace)
+        import src.utils.database_handler as db
+
+        db.DB_PATH = os.path.join(workspace, "bench.db")
+        db.initialize_database()
+
+        import src.main as main
+        from src.benchmarks.stubs import (
+            FakeChatModel,
+            Latency,
+            OfflineEmbeddings,
+            install_offline_stubs,
+            start_server,
+        )
+
+        install_offline_stubs(
+            {},
+            FakeChatModel(latency=args.llm_latency),
+            Latency(args.api_latency, args.api_latency, args.api_latency),
+            embeddings=OfflineEmbeddings(),
+        )
+        pool = StubIngestionPool()
+        main.get_ingestion_pool = lambda: pool
+
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            tickers = seed_tickers(args.indexed_tickers, args.processing_tickers)
+        monitor = LoopMonitor()
+        server, base_url = start_server(on_loop=monitor.run)
+
+        context = multiprocessing.get_context("spawn")
+        levels = []
+        try:
+            for concurrency in args.concurrency:
+                plan = {
+                    "concurrency": concurrency,
+                    "duration": args.duration,
+                    "mix": args.mix,
+                    "pollers": args.pollers,
+                    "poll_interval": args.poll_interval,
+                    "tickers": tickers,
+                    "timeout": args.timeout,
+                }
+                results = context.Queue()
+                client = context.Process(
+                    target=_client_process, args=(base_url, plan, results)
+                )
+                # The app logs every request; keep that out of the report.
+                with contextlib.redirect_stdout(open(os.devnull, "w")):
+                    client.start()
+                    monitor.take()
+                    records = results.get()
+                    lags = monitor.take()
+                    client.join()
+                level = summarize_level(
+                    concurrency, args.duration, records, lags, args.stall_ms
+                )
+                levels.append(level)
+                print_level(level, args.stall_ms)
+        finally:
+            server.should_exit = True
+            db._pool.close_all()
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"args": vars(args), "levels": levels}, f, indent=2)
+        print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main_cli()
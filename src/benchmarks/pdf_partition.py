@@ -0,0 +1,101 @@
+# src/benchmarks/pdf_partition.py
+"""
+Measures how PDF partitioning wall-clock time scales with worker processes.
+
+Runs `load_and_chunk_pdfs` on the same document with increasing worker counts,
+reports time and speedup over the single-process run, and checks that every run
+produces the same chunks in the same order. `--mode` compares the per-page
+triage path against sending every page through hi_res.
+
+    python -m src.benchmarks.pdf_partition --pdf data/report.pdf --workers 1 2 4 8
+    python -m src.benchmarks.pdf_partition --pages 60 --mode hi_res
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from src.ingestion.document_loader import (
+    load_and_chunk_pdfs,
+    PDF_PARTITION_MODE,
+    PDF_SHARD_PAGES,
+)
+
+SAMPLE_PARAGRAPH = (
+    "Revenue for the quarter increased compared with the prior year, driven by "
+    "higher services volume and improved pricing. Operating margin expanded as "
+    "cost discipline offset continued investment in research and development. "
+)
+
+
+def write_sample_pdf(path: str, pages: int):
+    """Writes a synthetic text-only report with `pages` pages."""
+    with fitz.open() as pdf:
+        for number in range(pages):
+            page = pdf.new_page()
+            text = f"Section {number + 1}\n\n" + SAMPLE_PARAGRAPH * 8
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=10)
+        pdf.save(path)
+
+
+def run(
+    pdf_path: str, worker_counts: list[int], shard_pages: int, mode: str
+) -> list[dict]:
+    work_dir = tempfile.mkdtemp(prefix="pdf_bench_")
+    try:
+        shutil.copy(pdf_path, os.path.join(work_dir, "report.pdf"))
+        results, reference = [], None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            chunks = load_and_chunk_pdfs(
+                work_dir, workers=workers, shard_pages=shard_pages, mode=mode
+            )
+            elapsed = time.perf_counter() - start
+
+            contents = [chunk.page_content for chunk in chunks]
+            if reference is None:
+                reference = contents
+            results.append(
+                {
+                    "workers": workers,
+                    "seconds": elapsed,
+                    "chunks": len(chunks),
+                    "matches_baseline": contents == reference,
+                }
+            )
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pdf", help="PDF to partition (defaults to a synthetic one)")
+    parser.add_argument("--pages", type=int, default=40, help="Pages in the synthetic PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shard-pages", type=int, default=PDF_SHARD_PAGES)
+    parser.add_argument("--mode", choices=["triage", "hi_res"], default=PDF_PARTITION_MODE)
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    if not pdf_path:
+        pdf_path = os.path.join(tempfile.gettempdir(), f"sample_{args.pages}p.pdf")
+        write_sample_pdf(pdf_path, args.pages)
+
+    results = run(pdf_path, args.workers, args.shard_pages, args.mode)
+    baseline = results[0]["seconds"]
+    print(f"\nmode={args.mode}")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'chunks':>7}  same output")
+    for r in results:
+        print(
+            f"{r['workers']:>8} {r['seconds']:>10.2f} {baseline / r['seconds']:>7.2f}x "
+            f"{r['chunks']:>7}  {r['matches_baseline']}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,369 @@
+# src/benchmarks/pipeline.py
+"""
+Times every stage of ingestion and of the query path, fully offline.
+
+Tavily, Alpha Vantage, the report download and the Groq LLM are replaced with
+the local stand-ins in `src.benchmarks.stubs`, and a fixture report is generated
+for each requested page count. `process_company_data_background` then runs for
+real (partitioning, dedupe, embedding, Chroma) against a throwaway workspace,
+followed by `--questions` queries per ticker through resolve, retrieve, prompt
+build and generate.
+
+Results are written as JSON to `--output`. Pass an earlier file as
+`--baseline` to print the change of every metric and exit non-zero when one
+regressed by more than `--tolerance`.
+
+    python -m src.benchmarks.pipeline --pages 5 20 80 --questions 20 --output run.json
+    python -m src.benchmarks.pipeline --baseline run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import src.ingestion.document_loader as document_loader
+import src.ingestion.orchestrator as orchestrator
+import src.utils.database_handler as db
+from src.benchmarks.stubs import (
+    FakeChatModel,
+    Latency,
+    OfflineEmbeddings,
+    install_offline_stubs,
+    make_report_pdf,
+)
+from src.core.qa_agent import create_persistent_rag_chain
+from src.utils.ticker_checker import afind_best_ticker_match
+
+# Orchestrator pipeline stages by function name, and the label they're reported as.
+STAGE_LABELS = {
+    "chunk_stage": "partition",
+    "filter": "dedupe",
+    "batch_chunks": "batch",
+    "skip_unchanged": "skip_unchanged",
+    "embed_batches": "embed",
+}
+
+QUESTIONS = [
+    "How did revenue from operations change this year?",
+    "What happened to net debt and borrowings?",
+    "What was the EBITDA margin and why did it move?",
+    "How much capital expenditure did the company incur?",
+    "What dividend did the board recommend?",
+]
+
+
+class StageTimings:
+    """
+    Accumulates the time spent inside each stage. Pipeline stages run in their
+    own threads, so a stage's time excludes what it spent waiting on the stage
+    before it; stage times can therefore add up to more than the wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = defaultdict(float)
+        self.items = defaultdict(int)
+
+    def reset(self):
+        with self._lock:
+            self.seconds.clear()
+            self.items.clear()
+
+    def add(self, name: str, seconds: float, items: int = 0):
+        with self._lock:
+            self.seconds[name] += seconds
+            self.items[name] += items
+
+    def timed(self, name: str, func):
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start, 1)
+
+        return call
+
+    @staticmethod
+    def _clocked(iterator, clock: dict):
+        iterator = iter(iterator)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                clock["seconds"] += time.perf_counter() - start
+                return
+            clock["seconds"] += time.perf_counter() - start
+            clock["items"] += 1
+            yield item
+
+    def timed_stage(self, name: str, stage):
+        def run(items):
+            upstream = {"seconds": 0.0, "items": 0}
+            own = {"seconds": 0.0, "items": 0}
+            try:
+                yield from self._clocked(stage(self._clocked(items, upstream)), own)
+            finally:
+                self.add(name, own["seconds"] - upstream["seconds"], own["items"])
+
+        return run
+
+    def timed_source(self, name: str, source):
+        clock = {"seconds": 0.0, "items": 0}
+        try:
+            yield from self._clocked(source, clock)
+        finally:
+            self.add(name, clock["seconds"], clock["items"])
+
+
+def instrument_orchestrator(timings: StageTimings) -> list:
+    """Wraps the orchestrator's stages with timers. Returns the CollectionSyncs used."""
+    syncs = []
+    run_pipeline = orchestrator.run_pipeline
+
+    def timed_run_pipeline(source, stages, **kwargs):
+        return run_pipeline(
+            timings.timed_source("report_download", source),
+            [
+                timings.timed_stage(STAGE_LABELS.get(s.__name__, s.__name__), s)
+                for s in stages
+            ],
+            **kwargs,
+        )
+
+    class TimedCollectionSync(orchestrator.CollectionSync):
+        def __init__(self, ticker: str):
+            super().__init__(ticker)
+            syncs.append(self)
+
+        def upsert(self, embedded):
+            return timings.timed_stage("chroma_write", super().upsert)(embedded)
+
+        def sweep(self) -> int:
+            return timings.timed("chroma_sweep", super().sweep)()
+
+    orchestrator.run_pipeline = timed_run_pipeline
+    orchestrator.CollectionSync = TimedCollectionSync
+    orchestrator.fetch_company_news = timings.timed(
+        "news_fetch", orchestrator.fetch_company_news
+    )
+    orchestrator.get_company_overview = timings.timed(
+        "overview_fetch", orchestrator.get_company_overview
+    )
+    return syncs
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": 1000 * statistics.median(ordered),
+        "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "mean_ms": 1000 * statistics.fmean(ordered),
+    }
+
+
+def run_ingestion(
+    timings: StageTimings, syncs: list, ticker: str, company: str, pages: int
+) -> dict:
+    timings.reset()
+    syncs.clear()
+    start = time.perf_counter()
+    orchestrator.process_company_data_background(ticker, company)
+    wall = time.perf_counter() - start
+
+    status = db.get_company_status(ticker)
+    chunks = len(syncs[-1].seen_ids) if syncs else 0
+    return {
+        "pages": pages,
+        "status": status,
+        "chunks": chunks,
+        "wall_seconds": wall,
+        "pages_per_sec": pages / wall,
+        "chunks_per_sec": chunks / wall,
+        "stage_seconds": dict(timings.seconds),
+    }
+
+
+async def run_queries(company: str, questions: list[str]) -> dict:
+    samples = defaultdict(list)
+    for question in questions:
+        start = time.perf_counter()
+        ticker, _ = await afind_best_ticker_match(company)
+        samples["resolve"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        chain = await asyncio.to_thread(create_persistent_rag_chain, ticker)
+        samples["chain"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        docs = await chain.aretrieve(question)
+        samples["retrieve"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        answer_input, _ = chain.pack(question, docs)
+        samples["prompt_build"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first_token = None
+        async for _ in chain.answer_chain.astream(answer_input):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        samples["first_token"].append(first_token or 0.0)
+        samples["generate"].append(time.perf_counter() - start)
+    return samples
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict) -> dict[str, float]:
+    """Metric name -> value, for comparing runs."""
+    metrics = {}
+    for run in results["ingestion"]:
+        prefix = f"ingestion.{run['pages']}p"
+        for key in ("wall_seconds", "pages_per_sec", "chunks_per_sec"):
+            metrics[f"{prefix}.{key}"] = run[key]
+        for stage, seconds in run["stage_seconds"].items():
+            metrics[f"{prefix}.stage.{stage}_seconds"] = seconds
+    for stage, summary in results["query"].items():
+        for key, value in summary.items():
+            metrics[f"query.{stage}.{key}"] = value
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Prints each metric's change against the baseline; returns the regressions."""
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    print(f"\nAgainst baseline {baseline['meta'].get('commit')}:")
+    for name in sorted(current.keys() & previous.keys()):
+        before, after = previous[name], current[name]
+        if not before:
+            continue
+        change = (after - before) / before
+        # Throughputs should go up; every other metric is a duration.
+        worse = -change if name.endswith("_per_sec") else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        print(f"  {name:55s} {before:10.2f} -> {after:10.2f} ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-tokens", type=int, default=150)
+    parser.add_argument("--token-interval", type=float, default=0.005)
+    parser.add_argument("--api-latency", type=float, default=0.1)
+    parser.add_argument("--partition-workers", type=int, default=2)
+    parser.add_argument(
+        "--real-embeddings",
+        action="store_true",
+        help="Use the configured embedding model instead of a hashing stand-in.",
+    )
+    parser.add_argument("--output", default="pipeline_benchmark.json")
+    parser.add_argument("--baseline", help="Earlier --output file to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    commit = git_commit()
+
+    with tempfile.TemporaryDirectory(prefix="pipeline_bench_") as workspace:
+        # Chroma, the report cache and downloads use paths relative to the cwd.
+        os.chdir(workspace)
+        db.DB_PATH = os.path.join(workspace, "bench.db")
+        db.initialize_database()
+        document_loader.PDF_PARTITION_WORKERS = args.partition_workers
+
+        companies = {pages: f"BENCH{pages}P Steel Works" for pages in args.pages}
+        reports = {
+            company: make_report_pdf(f"fixture_{pages}.pdf", company, pages)
+            for pages, company in companies.items()
+        }
+        install_offline_stubs(
+            reports,
+            FakeChatModel(
+                latency=args.llm_latency,
+                tokens=args.llm_tokens,
+                token_interval=args.token_interval,
+            ),
+            Latency(args.api_latency, args.api_latency, args.api_latency),
+            embeddings=None if args.real_embeddings else OfflineEmbeddings(),
+        )
+
+        timings = StageTimings()
+        syncs = instrument_orchestrator(timings)
+        ingestion, query_samples = [], defaultdict(list)
+        questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.questions)]
+        for pages, company in companies.items():
+            ticker, _ = asyncio.run(afind_best_ticker_match(company))
+            run = run_ingestion(timings, syncs, ticker, company, pages)
+            ingestion.append(run)
+            print(
+                f"ingest {pages:4d} pages: {run['wall_seconds']:6.2f} s, "
+                f"{run['chunks']} chunks, {run['chunks_per_sec']:6.1f} chunks/s "
+                f"({run['status']})"
+            )
+            for stage, samples in asyncio.run(run_queries(company, questions)).items():
+                query_samples[stage].extend(samples)
+        db._pool.close_all()
+
+    query = {stage: summarize(samples) for stage, samples in query_samples.items()}
+    for stage, summary in query.items():
+        print(
+            f"query {stage:13s} p50 {summary['p50_ms']:8.1f} ms  "
+            f"p95 {summary['p95_ms']:8.1f} ms"
+        )
+
+    results = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "ingestion": ingestion,
+        "query": query,
+    }
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(
+                f"{len(regressions)} metric(s) regressed by more than "
+                f"{args.tolerance:.0%}."
+            )
+
+
+if __name__ == "__main__":
+    main_cli()
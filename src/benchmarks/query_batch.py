@@ -0,0 +1,113 @@
+# src/benchmarks/query_batch.py
+"""
+Compares N sequential /query calls with one /query/batch call for N questions.
+
+Ticker search, embedding, vector search and generation are replaced with
+stand-ins of fixed latency, so the result reflects how much work the batch
+endpoint shares (one resolution, one embedding batch, one vector query per
+ticker) and overlaps (concurrent generations).
+
+    python -m src.benchmarks.query_batch --questions 50 --tickers 2 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from src.benchmarks.stubs import StubEmbeddings, install_app_stubs
+
+
+class Latencies:
+    def __init__(self, search: float, embed: float, retrieve: float, generate: float):
+        self.search = search
+        self.embed = embed
+        self.retrieve = retrieve
+        self.generate = generate
+
+
+class StubChain:
+    def __init__(self, latency: Latencies):
+        self.latency = latency
+
+    async def aretrieve(self, question: str, question_vector=None) -> list:
+        await asyncio.sleep(self.latency.retrieve)
+        return []
+
+    async def aanswer(self, question: str, docs: list) -> str:
+        await asyncio.sleep(self.latency.generate)
+        return f"Answer to: {question}"
+
+    async def ainvoke(self, question: str, question_vector=None) -> str:
+        return await self.aanswer(question, await self.aretrieve(question))
+
+
+def install_stubs(latency: Latencies):
+    def retrieve_by_vectors(ticker: str, vectors: list) -> list[list]:
+        time.sleep(latency.retrieve)  # One collection query for all vectors.
+        return [[] for _ in vectors]
+
+    return install_app_stubs(
+        StubChain(latency),
+        embeddings=StubEmbeddings(latency.embed),
+        search_latency=latency.search,
+        retrieve_by_vectors=retrieve_by_vectors,
+    )
+
+
+async def run(
+    main, questions: int, tickers: int, concurrency: int
+) -> tuple[float, float]:
+    items = [
+        {"company_input": f"company{i % tickers}", "question": f"Question {i}?"}
+        for i in range(questions)
+    ]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=600
+    ) as client:
+        start = time.perf_counter()
+        for item in items:
+            (await client.post("/query", json=item)).raise_for_status()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/query/batch", json={"items": items, "max_concurrency": concurrency}
+        )
+        response.raise_for_status()
+        batched = time.perf_counter() - start
+        statuses = {r["status"] for r in response.json()["results"]}
+        assert statuses == {"complete"}, statuses
+    return sequential, batched
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--tickers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--retrieve-latency", type=float, default=0.03)
+    parser.add_argument("--generate-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    main = install_stubs(
+        Latencies(
+            args.search_latency,
+            args.embed_latency,
+            args.retrieve_latency,
+            args.generate_latency,
+        )
+    )
+    sequential, batched = asyncio.run(
+        run(main, args.questions, args.tickers, args.concurrency)
+    )
+    print(f"sequential /query: {sequential:6.2f} s")
+    print(f"/query/batch:      {batched:6.2f} s  ({sequential / batched:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,85 @@
+# src/benchmarks/query_concurrency.py
+"""
+Checks that /query requests overlap instead of serializing on the event loop.
+
+The ticker search, SQLite status lookup and RAG chain are replaced with stand-ins
+that take a fixed amount of time, then batches of requests are fired at the app
+at increasing concurrency. If the handler blocked the loop, throughput would stay
+flat; with the async path it should grow roughly with concurrency.
+
+    python -m src.benchmarks.query_concurrency --requests 64 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from src.benchmarks.stubs import install_app_stubs
+
+
+class SlowChain:
+    """A chain stand-in whose generation takes `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ainvoke(self, question: str, question_vector=None) -> str:
+        await asyncio.sleep(self.latency)
+        return f"Answer to: {question}"
+
+
+def get_company_status(ticker: str):
+    time.sleep(0.005)  # A blocking SQLite-sized call, offloaded to the threadpool.
+    return "indexed"
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, total: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    payload = {"company_input": "AAPL", "question": "Summarize the latest results."}
+
+    async def one():
+        async with semaphore:
+            response = await client.post("/query", json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def run(levels: list[int], total: int, latency: float) -> dict[int, float]:
+    main = install_app_stubs(SlowChain(latency), get_company_status=get_company_status)
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in levels:
+            results[concurrency] = await run_level(client, concurrency, total)
+            print(f"concurrency={concurrency:>3}  throughput={results[concurrency]:8.2f} req/s")
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.levels, args.requests, args.latency))
+
+    # Require at least half of ideal linear scaling at the highest level.
+    base, top = min(args.levels), max(args.levels)
+    speedup = results[top] / results[base]
+    expected = 0.5 * top / base
+    print(f"speedup {base}->{top}: {speedup:.1f}x (expected >= {expected:.1f}x)")
+    if speedup < expected:
+        print("FAIL: /query requests are serializing on the event loop.")
+        sys.exit(1)
+    print("OK: /query throughput scales with concurrency.")
+
+
+if __name__ == "__main__":
+    main_cli()
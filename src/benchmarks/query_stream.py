@@ -0,0 +1,96 @@
+# src/benchmarks/query_stream.py
+"""
+Measures time-to-first-token of /query/stream against the buffered /query.
+
+Retrieval and generation are replaced with a stand-in chain that takes
+`--retrieval` seconds to retrieve and then emits `--tokens` chunks every
+`--token-interval` seconds. The app is served over a real socket by uvicorn so
+that streamed bytes arrive as they are flushed.
+
+    python -m src.benchmarks.query_stream --runs 10 --tokens 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from src.benchmarks.stubs import install_app_stubs, start_server
+
+
+class StreamingChain:
+    """A RagChain stand-in with fixed retrieval latency and token cadence."""
+
+    def __init__(self, retrieval: float, tokens: int, interval: float):
+        self.retrieval = retrieval
+        self.tokens = tokens
+        self.interval = interval
+
+    async def aretrieve(self, question: str, question_vector=None) -> list:
+        await asyncio.sleep(self.retrieval)
+        return []
+
+    async def astream_answer(self, question: str, docs: list):
+        for i in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            yield f"token{i} "
+
+    async def ainvoke(self, question: str, question_vector=None) -> str:
+        docs = await self.aretrieve(question)
+        return "".join([chunk async for chunk in self.astream_answer(question, docs)])
+
+
+async def measure(base_url: str, runs: int) -> dict[str, list[float]]:
+    payload = {"company_input": "AAPL", "question": "Summarize the latest results."}
+    timings = {"buffered_first_byte": [], "stream_status": [], "stream_first_token": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        for _ in range(runs):
+            start = time.perf_counter()
+            response = await client.post("/query", json=payload)
+            response.raise_for_status()
+            timings["buffered_first_byte"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            async with client.stream("POST", "/query/stream", json=payload) as response:
+                seen_token = False
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)["event"]
+                    elapsed = time.perf_counter() - start
+                    if event == "status":
+                        timings["stream_status"].append(elapsed)
+                    elif event == "token" and not seen_token:
+                        timings["stream_first_token"].append(elapsed)
+                        seen_token = True
+    return timings
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--retrieval", type=float, default=0.15)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    install_app_stubs(StreamingChain(args.retrieval, args.tokens, args.token_interval))
+    server, base_url = start_server()
+    try:
+        timings = asyncio.run(measure(base_url, args.runs))
+    finally:
+        server.should_exit = True
+
+    for name, values in timings.items():
+        print(f"{name:<20} p50 {statistics.median(values) * 1000:8.1f} ms")
+    speedup = statistics.median(timings["buffered_first_byte"]) / statistics.median(
+        timings["stream_first_token"]
+    )
+    print(f"time-to-first-token improvement: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
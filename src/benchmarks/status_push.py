@@ -0,0 +1,166 @@
+# src/benchmarks/status_push.py
+"""
+Load-tests ticker completion notifications with many waiting clients.
+
+N clients subscribe to GET /events/{ticker} and sit idle while the backend's
+CPU time and status lookups are measured. The same clients then poll
+GET /status/{ticker} for the same period for comparison. Finally every ticker is
+marked indexed and the time for the completion event to reach all subscribers
+is reported. The app is served by uvicorn on a local socket with SQLite stubbed,
+so the status lookup counts are exact.
+
+    python -m src.benchmarks.status_push --clients 500 --idle 10 --poll-interval 2
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import threading
+import time
+
+import httpx
+
+import src.main as main
+from src.benchmarks.stubs import start_server
+from src.utils.database_handler import notify_status_change
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self):
+        with self._lock:
+            self.value += 1
+
+
+status_lookups = Counter()
+
+
+def install_stubs():
+    def get_company_status(ticker: str):
+        status_lookups.add()
+        return "processing"
+
+    main.get_company_status = get_company_status
+    main.get_latest_ingestion_job = lambda ticker: None
+
+
+def idle_cost(seconds: float) -> tuple[float, int]:
+    """Returns (CPU % of one core, status lookups) used over `seconds`."""
+    lookups, cpu, wall = status_lookups.value, time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu_percent = 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+    return cpu_percent, status_lookups.value - lookups
+
+
+async def subscriber(client: httpx.AsyncClient, ticker: str, ready, received: dict):
+    async with client.stream("GET", f"/events/{ticker}") as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: ") :])
+            if event.get("status") == "processing":
+                ready()
+            elif event.get("status") == "indexed":
+                received[id(asyncio.current_task())] = time.perf_counter()
+                return
+
+
+async def poller(client: httpx.AsyncClient, ticker: str, interval: float, stop):
+    while not stop.is_set():
+        (await client.get(f"/status/{ticker}")).raise_for_status()
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(
+    base_url: str, clients: int, tickers: list[str], idle: float, interval: float
+):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    timeout = httpx.Timeout(60, read=None)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=timeout
+    ) as client:
+        # --- Push: every client holds an open subscription ---
+        connected = 0
+        all_connected = asyncio.Event()
+
+        def ready():
+            nonlocal connected
+            connected += 1
+            if connected == clients:
+                all_connected.set()
+
+        received = {}
+        tasks = [
+            asyncio.create_task(
+                subscriber(client, tickers[i % len(tickers)], ready, received)
+            )
+            for i in range(clients)
+        ]
+        await all_connected.wait()
+        push_cpu, push_lookups = await asyncio.to_thread(idle_cost, idle)
+        print(
+            f"push: {clients} idle subscribers, {push_cpu:5.1f}% CPU, "
+            f"{push_lookups} status lookups in {idle:.0f}s"
+        )
+
+        started = time.perf_counter()
+        for ticker in tickers:
+            await asyncio.to_thread(notify_status_change, ticker, "indexed")
+        await asyncio.gather(*tasks)
+        latencies = sorted(t - started for t in received.values())
+        print(
+            f"push: completion reached all {len(latencies)} subscribers in "
+            f"{latencies[-1] * 1000:.1f} ms "
+            f"(p50 {statistics.median(latencies) * 1000:.1f} ms)"
+        )
+
+        # --- Poll: the same clients polling /status instead ---
+        stop = asyncio.Event()
+        pollers = [
+            asyncio.create_task(
+                poller(client, tickers[i % len(tickers)], interval, stop)
+            )
+            for i in range(clients)
+        ]
+        await asyncio.sleep(interval)  # Let polling reach a steady state.
+        poll_cpu, poll_lookups = await asyncio.to_thread(idle_cost, idle)
+        stop.set()
+        await asyncio.gather(*pollers)
+        print(
+            f"poll: {clients} clients every {interval:.1f}s, {poll_cpu:5.1f}% CPU, "
+            f"{poll_lookups} status lookups in {idle:.0f}s"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--idle", type=float, default=10)
+    parser.add_argument("--poll-interval", type=float, default=2)
+    args = parser.parse_args()
+
+    # Each client needs a socket on both ends of the connection.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, 2 * args.clients + 256))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    install_stubs()
+    server, base_url = start_server()
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    try:
+        asyncio.run(run(base_url, args.clients, tickers, args.idle, args.poll_interval))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,402 @@
+# src/benchmarks/stubs.py
+"""
+Offline stand-ins and server scaffolding shared by the benchmarks.
+
+`install_offline_stubs` swaps the Tavily clients, the Alpha Vantage clients
+and HTTP calls, the PDF download and the Groq LLM for local fakes, so the real
+ingestion and query code runs end to end without API keys or network access.
+Fixture reports are generated with PyMuPDF at whatever size is asked for.
+
+`install_app_stubs` goes further for benchmarks that isolate the API layer: it
+replaces the ticker search, status lookups, embeddings, answer cache and RAG
+chain used by `src.main` directly. `start_server` serves the app with uvicorn
+on a local socket.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+from typing import Any
+
+import fitz  # PyMuPDF
+import httpx
+import uvicorn
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.benchmarks.live_retriever import HashingEmbeddings
+from src.core.answer_cache import SemanticAnswerCache
+
+REPORT_URL = "https://reports.offline.test/{slug}/annual-report.pdf"
+
+_SENTENCES = [
+    "Revenue from operations grew {n}% year on year on higher volumes.",
+    "EBITDA margin was {n}% as input costs eased through the second half.",
+    "Net debt fell by {n} crore after the company prepaid term loans.",
+    "Capital expenditure of {n} crore went mainly to the new rolling mill.",
+    "The board recommended a dividend of {n} per equity share.",
+    "Exports contributed {n}% of sales despite weaker European demand.",
+    "Employee costs rose {n}% reflecting wage revisions and new hires.",
+    "The order book stood at {n} crore, up from the previous quarter.",
+]
+_FURNITURE = "{company} | Integrated Annual Report | Page {page}"
+
+
+# --- Fixture data ---
+
+
+def slug(company_name: str) -> str:
+    return company_name.lower().replace(" ", "-")
+
+
+def news_results(company_name: str, count: int = 5) -> list[dict]:
+    """Canned Tavily search results for a company."""
+    rng = random.Random(company_name)
+    return [
+        {
+            "url": f"https://news.offline.test/{slug(company_name)}/{i}",
+            "title": f"{company_name} results update {i}",
+            "content": " ".join(
+                rng.choice(_SENTENCES).format(n=rng.randint(2, 40)) for _ in range(8)
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+def company_overview(symbol: str) -> dict:
+    """A canned Alpha Vantage OVERVIEW payload."""
+    rng = random.Random(symbol)
+    return {
+        "Symbol": symbol,
+        "Name": f"{symbol} Industries Ltd",
+        "Sector": "MANUFACTURING",
+        "Industry": "STEEL WORKS & BLAST FURNACES",
+        "Currency": "INR",
+        "MarketCapitalization": str(rng.randint(10**10, 10**12)),
+        "RevenueTTM": str(rng.randint(10**9, 10**11)),
+        "ProfitMargin": f"{rng.uniform(0.02, 0.2):.3f}",
+        "OperatingMarginTTM": f"{rng.uniform(0.05, 0.25):.3f}",
+        "EPS": f"{rng.uniform(1, 120):.2f}",
+        "PERatio": f"{rng.uniform(5, 40):.2f}",
+        "QuarterlyRevenueGrowthYOY": f"{rng.uniform(-0.1, 0.3):.3f}",
+        "Beta": f"{rng.uniform(0.5, 1.8):.2f}",
+        "Description": f"{symbol} Industries makes flat and long steel products.",
+    }
+
+
+def symbol_search(keywords: str) -> dict:
+    """A canned SYMBOL_SEARCH payload; the ticker is the name's first word."""
+    first_word = keywords.split()[0] if keywords.split() else "X"
+    symbol = "".join(c for c in first_word.upper() if c.isalnum())[:10].ljust(3, "X")
+    return {
+        "bestMatches": [
+            {"1. symbol": symbol, "2. name": keywords, "4. region": "United States"}
+        ]
+    }
+
+
+def make_report_pdf(path: str, company: str, pages: int, seed: int = 0) -> str:
+    """Writes a text-layer annual report with a running header on every page."""
+    rng = random.Random(f"{company}-{seed}")
+    with fitz.open() as pdf:
+        for number in range(1, pages + 1):
+            page = pdf.new_page()
+            page.insert_text((50, 40), _FURNITURE.format(company=company, page=number))
+            paragraphs = [
+                " ".join(
+                    rng.choice(_SENTENCES).format(n=rng.randint(2, 90))
+                    for _ in range(rng.randint(4, 7))
+                )
+                for _ in range(4)
+            ]
+            page.insert_textbox(fitz.Rect(50, 70, 545, 800), "\n\n".join(paragraphs))
+        pdf.save(path)
+    return path
+
+
+# --- Service stand-ins ---
+
+
+class StubTavilyClient:
+    """Answers news searches with canned articles and report searches with a PDF URL."""
+
+    latency = 0.0
+
+    def __init__(self, api_key: str | None = None):
+        pass
+
+    def _results(self, query: str, max_results: int) -> dict:
+        if "filetype:pdf" in query:
+            company = query.split('"')[1]
+            return {"results": [{"url": REPORT_URL.format(slug=slug(company))}]}
+        company = query.rsplit(" for ", 1)[-1]
+        return {"results": news_results(company, max_results)}
+
+    def search(self, query: str, max_results: int = 5, **kwargs) -> dict:
+        time.sleep(self.latency)
+        return self._results(query, max_results)
+
+
+class StubAsyncTavilyClient(StubTavilyClient):
+    async def search(self, query: str, max_results: int = 5, **kwargs) -> dict:
+        await asyncio.sleep(self.latency)
+        return self._results(query, max_results)
+
+
+class StubFundamentalData:
+    latency = 0.0
+
+    def __init__(self, key: str | None = None, output_format: str = "json"):
+        pass
+
+    def get_company_overview(self, symbol: str):
+        time.sleep(self.latency)
+        return company_overview(symbol), None
+
+
+def alpha_vantage_transport(latency: float = 0.0) -> httpx.AsyncBaseTransport:
+    """An httpx transport serving OVERVIEW and SYMBOL_SEARCH locally."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        params = request.url.params
+        if params.get("function") == "OVERVIEW":
+            return httpx.Response(200, json=company_overview(params["symbol"]))
+        if params.get("function") == "SYMBOL_SEARCH":
+            return httpx.Response(200, json=symbol_search(params["keywords"]))
+        return httpx.Response(400, json={"Error Message": "Unsupported function."})
+
+    return httpx.MockTransport(handler)
+
+
+class StubResponse:
+    def __init__(self, content: bytes = b"", data: Any = None):
+        self.content = content
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+    def iter_content(self, chunk_size: int = 8192):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+class StubRequests:
+    """The subset of `requests` used by the fetchers, served from local fixtures."""
+
+    def __init__(self, reports: dict[str, str], latency: float = 0.0):
+        # Company name -> fixture PDF served as its report; "*" serves any company.
+        self.reports = reports
+        self.latency = latency
+
+    def get(self, url: str, params: dict | None = None, **kwargs) -> StubResponse:
+        time.sleep(self.latency)
+        if params and params.get("function") == "SYMBOL_SEARCH":
+            return StubResponse(data=symbol_search(params["keywords"]))
+        by_slug = {slug(company): path for company, path in self.reports.items()}
+        path = by_slug.get(url.split("/")[-2]) or self.reports["*"]
+        with open(path, "rb") as f:
+            return StubResponse(f.read())
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    A chat model that answers after `latency` seconds, then emits `tokens`
+    chunks `token_interval` seconds apart when streamed.
+    """
+
+    latency: float = 0.5
+    tokens: int = 100
+    token_interval: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-fake"
+
+    def _text(self) -> str:
+        return "".join(f"token{i} " for i in range(self.tokens))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency + self.tokens * self.token_interval)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(self._text()))])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency + self.tokens * self.token_interval)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(self._text()))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=f"token{i} "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class OfflineEmbeddings(HashingEmbeddings):
+    """Hashing embeddings with the extra methods the app calls on the service."""
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    def warmup(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Latency:
+    """Simulated round-trip times (seconds) of the external services."""
+
+    def __init__(
+        self, tavily: float = 0.0, alpha_vantage: float = 0.0, download: float = 0.0
+    ):
+        self.tavily = tavily
+        self.alpha_vantage = alpha_vantage
+        self.download = download
+
+
+def install_offline_stubs(
+    reports: dict[str, str],
+    llm: FakeChatModel,
+    latency: Latency | None = None,
+    embeddings=None,
+):
+    """
+    Points every external dependency at a local fake. `reports` maps company
+    names to the fixture PDFs served as their report downloads. If `embeddings`
+    is given it replaces the shared embedding model (e.g. OfflineEmbeddings).
+    """
+    import src.core.embeddings as embeddings_module
+    import src.core.processing as processing
+    import src.core.qa_agent as qa_agent
+    import src.ingestion.news_fetcher as news_fetcher
+    import src.ingestion.report_fetcher as report_fetcher
+    import src.ingestion.stock_data_fetcher as stock_data_fetcher
+    import src.utils.ticker_checker as ticker_checker
+
+    latency = latency or Latency()
+    for key in ("TAVILY_API_KEY", "ALPHA_VANTAGE_API_KEY", "GROQ_AI_API_KEY"):
+        os.environ.setdefault(key, "offline")
+
+    StubTavilyClient.latency = latency.tavily
+    StubFundamentalData.latency = latency.alpha_vantage
+    transport = alpha_vantage_transport(latency.alpha_vantage)
+
+    class StubHttpx:
+        Response = httpx.Response
+
+        @staticmethod
+        def AsyncClient(**kwargs):
+            return httpx.AsyncClient(transport=transport, **kwargs)
+
+    news_fetcher.TavilyClient = StubTavilyClient
+    news_fetcher.AsyncTavilyClient = StubAsyncTavilyClient
+    report_fetcher.TavilyClient = StubTavilyClient
+    report_fetcher.requests = StubRequests(reports, latency.download)
+    stock_data_fetcher.FundamentalData = StubFundamentalData
+    stock_data_fetcher.httpx = StubHttpx
+    ticker_checker.httpx = StubHttpx
+    ticker_checker.requests = StubRequests(reports, latency.alpha_vantage)
+    qa_agent.get_llm = lambda: llm
+    if embeddings is not None:
+        embeddings_module.get_embedding_service = lambda: embeddings
+        processing.get_embedding_service = lambda: embeddings
+        qa_agent.get_embedding_service = lambda: embeddings
+
+
+# --- API-layer stand-ins ---
+
+
+class StubEmbeddings:
+    """Returns the same question embedding for any text after `latency` seconds."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self.latency)
+        return [1.0, 0.0]
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.latency)
+        return [[1.0, 0.0] for _ in texts]
+
+
+def install_app_stubs(
+    chain=None,
+    status: str = "indexed",
+    embeddings=None,
+    search_latency: float = 0.0,
+    **overrides,
+):
+    """
+    Points `src.main` at stand-ins: ticker search returns the input upper-cased,
+    every ticker has `status`, and answers come from `chain`. The answer cache
+    never hits, since benchmarks repeat questions. `overrides` replace further
+    names in `src.main`. Returns the module.
+    """
+    import src.main as main
+
+    async def afind_best_ticker_match(keywords: str):
+        await asyncio.sleep(search_latency)
+        return keywords.upper(), keywords
+
+    embeddings = embeddings or StubEmbeddings()
+    answer_cache = SemanticAnswerCache(threshold=2.0)
+
+    main.afind_best_ticker_match = afind_best_ticker_match
+    main.get_company_status = lambda ticker: status
+    main.get_company_statuses = lambda tickers: {t: status for t in tickers}
+    main.get_embedding_service = lambda: embeddings
+    main.get_answer_cache = lambda: answer_cache
+    if chain is not None:
+        main.create_persistent_rag_chain = lambda ticker: chain
+    for name, value in overrides.items():
+        setattr(main, name, value)
+    return main
+
+
+def start_server(app=None, on_loop=None, **config) -> tuple[uvicorn.Server, str]:
+    """
+    Serves the app (default `src.main.app`, lifespan off) on a free local port
+    from a background thread. `on_loop`, a coroutine function, runs on the
+    server's event loop alongside it. Returns (server, base URL) once the server
+    accepts connections; set `server.should_exit` to stop it.
+    """
+    if app is None:
+        import src.main as main
+
+        app = main.app
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = {"lifespan": "off", "log_level": "warning", "backlog": 4096, **config}
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, **config))
+
+    async def serve():
+        companion = asyncio.create_task(on_loop()) if on_loop else None
+        try:
+            await server.serve()
+        finally:
+            if companion:
+                companion.cancel()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
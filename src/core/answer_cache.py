@@ -0,0 +1,161 @@
+# src/core/answer_cache.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.utils.database_handler import register_status_listener
+from src.utils.metrics import cache_lookup
+
+# Minimum cosine similarity between two questions for a stored answer to be reused.
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+
+# Upper edges of the best-similarity histogram reported in stats().
+SIMILARITY_BUCKETS = (0.5, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 1.0)
+
+
+class SemanticAnswerCache:
+    """
+    Complete answers for indexed tickers, looked up by question embedding.
+
+    A lookup compares the question's normalized embedding against every stored
+    question for the same ticker and returns the best answer if it clears
+    `threshold`. Entries are evicted least-recently-used once `max_entries` is
+    reached, expire after `ttl` seconds, and are dropped for a ticker whenever
+    its indexing status changes. Only answers from the persistent index belong
+    here; preliminary live answers must never be stored.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl: float = ANSWER_CACHE_TTL,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (ticker, question) -> (vector, answer, expires_at)
+        self._matrices = {}  # ticker -> (keys, stacked vectors), rebuilt on change
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._histogram = [0] * len(SIMILARITY_BUCKETS)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _ticker_matrix(self, ticker: str):
+        cached = self._matrices.get(ticker)
+        if cached is None:
+            keys = [key for key in self._entries if key[0] == ticker]
+            vectors = (
+                np.stack([self._entries[key][0] for key in keys]) if keys else None
+            )
+            cached = self._matrices[ticker] = (keys, vectors)
+        return cached
+
+    def _record_similarity(self, similarity: float):
+        for i, edge in enumerate(SIMILARITY_BUCKETS):
+            if similarity <= edge or i == len(SIMILARITY_BUCKETS) - 1:
+                self._histogram[i] += 1
+                return
+
+    def get(self, ticker: str, question_vector) -> tuple[str, float] | None:
+        """Returns (answer, similarity) for the closest stored question, or None."""
+        cached = self._get(ticker, question_vector)
+        cache_lookup("answers", cached is not None)
+        return cached
+
+    def _get(self, ticker: str, question_vector) -> tuple[str, float] | None:
+        query = self._normalize(question_vector)
+        with self._lock:
+            keys, vectors = self._ticker_matrix(ticker)
+            if vectors is None:
+                self.misses += 1
+                return None
+
+            similarities = vectors @ query
+            self._record_similarity(float(similarities.max()))
+
+            now = time.monotonic()
+            for index in np.argsort(-similarities):
+                similarity = float(similarities[index])
+                if similarity < self.threshold:
+                    break
+                key = keys[index]
+                _, answer, expires_at = self._entries[key]
+                if expires_at <= now:
+                    # Expired; the next closest question may still match.
+                    self._remove(key)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return answer, similarity
+
+            self.misses += 1
+            return None
+
+    def set(self, ticker: str, question: str, question_vector, answer: str):
+        key = (ticker, " ".join(question.lower().split()))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (
+                self._normalize(question_vector),
+                answer,
+                time.monotonic() + self.ttl,
+            )
+            self._matrices.pop(ticker, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrices.pop(key[0], None)
+
+    def invalidate_ticker(self, ticker: str, status: str | None = None) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == ticker]
+            for key in keys:
+                self._remove(key)
+            self._matrices.pop(ticker, None)
+            if keys:
+                self.invalidations += 1
+        if keys:
+            print(f"Dropped {len(keys)} cached answers for '{ticker}' ({status}).")
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            lower_edges = (0.0,) + SIMILARITY_BUCKETS[:-1]
+            return {
+                "size": len(self._entries),
+                "maxsize": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "best_similarity_histogram": {
+                    f"{low:.2f}-{high:.2f}": count
+                    for low, high, count in zip(
+                        lower_edges, SIMILARITY_BUCKETS, self._histogram
+                    )
+                },
+            }
+
+
+_cache = SemanticAnswerCache()
+register_status_listener(_cache.invalidate_ticker)
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    return _cache
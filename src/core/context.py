@@ -0,0 +1,269 @@
+# src/core/context.py
+
+import os
+import re
+import threading
+from functools import lru_cache
+import numpy as np
+from langchain_core.documents import Document
+
+# Tokens available to retrieved excerpts and the company overview in one prompt.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2500"))
+# Candidates fetched per question before dedupe and MMR pick the final set.
+CONTEXT_FETCH_K = int(os.getenv("CONTEXT_FETCH_K", "20"))
+# Candidates at least this similar to an already chosen chunk are dropped.
+CONTEXT_DEDUPE_SIMILARITY = float(os.getenv("CONTEXT_DEDUPE_SIMILARITY", "0.95"))
+# MMR trade-off: 1.0 ranks purely by relevance, lower values favour diversity.
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# Token counts remembered per text, so chunks retrieved again aren't re-tokenized.
+CONTEXT_TOKEN_CACHE_SIZE = int(os.getenv("CONTEXT_TOKEN_CACHE_SIZE", "2048"))
+
+# --- Token counting ---
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken's cl100k_base if it can be loaded, otherwise False."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"tiktoken unavailable, estimating token counts: {e}")
+                    _encoding = False
+    return _encoding
+
+
+def _encode(encoding, text: str) -> list[int]:
+    # Scraped and PDF text can contain special-token strings like <|endoftext|>;
+    # they are encoded as ordinary text instead of raising.
+    return encoding.encode(text, disallowed_special=())
+
+
+@lru_cache(maxsize=CONTEXT_TOKEN_CACHE_SIZE)
+def count_tokens(text: str) -> int:
+    """
+    Counts tokens with a GPT-style BPE, which tracks the served model's tokenizer
+    closely enough for budgeting; falls back to ~4 characters per token.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(_encode(encoding, text))
+    return len(text) // 4 + 1
+
+
+# --- Candidate selection ---
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def select_diverse(
+    query_vector,
+    candidate_vectors,
+    k: int,
+    lambda_mult: float = CONTEXT_MMR_LAMBDA,
+    dedupe_similarity: float = CONTEXT_DEDUPE_SIMILARITY,
+) -> list[int]:
+    """
+    Picks up to k candidate indexes by maximal marginal relevance, skipping any
+    candidate that is a near-duplicate of one already picked.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if candidates.size == 0 or k <= 0:
+        return []
+    candidates = normalize_rows(candidates)
+    query = normalize_rows(np.asarray(query_vector, dtype=np.float32))
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = []
+    available = np.ones(len(candidates), dtype=bool)
+    while len(selected) < k and available.any():
+        if selected:
+            redundancy = similarity[:, selected].max(axis=1)
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        # Near-duplicates of the new pick can never be chosen.
+        available &= similarity[best] < dedupe_similarity
+    return selected
+
+
+# --- Overview projection ---
+
+# Always included when present: identifies the company and its scale.
+_CORE_OVERVIEW_FIELDS = (
+    "Symbol",
+    "Name",
+    "Sector",
+    "Industry",
+    "Currency",
+    "MarketCapitalization",
+    "LatestQuarter",
+)
+
+# Included when no question keyword matches.
+_DEFAULT_OVERVIEW_FIELDS = (
+    "RevenueTTM",
+    "ProfitMargin",
+    "OperatingMarginTTM",
+    "EPS",
+    "PERatio",
+    "QuarterlyRevenueGrowthYOY",
+    "QuarterlyEarningsGrowthYOY",
+)
+
+# Question keyword -> overview fields it makes relevant.
+_OVERVIEW_KEYWORDS = {
+    "revenue": ("RevenueTTM", "RevenuePerShareTTM", "QuarterlyRevenueGrowthYOY"),
+    "sales": ("RevenueTTM", "QuarterlyRevenueGrowthYOY"),
+    "growth": ("QuarterlyRevenueGrowthYOY", "QuarterlyEarningsGrowthYOY"),
+    "margin": ("ProfitMargin", "OperatingMarginTTM", "GrossProfitTTM", "RevenueTTM"),
+    "profit": ("ProfitMargin", "GrossProfitTTM", "EBITDA", "OperatingMarginTTM"),
+    "ebitda": ("EBITDA", "EVToEBITDA"),
+    "earnings": ("EPS", "DilutedEPSTTM", "QuarterlyEarningsGrowthYOY", "PERatio"),
+    "eps": ("EPS", "DilutedEPSTTM"),
+    "valuation": (
+        "PERatio",
+        "ForwardPE",
+        "PEGRatio",
+        "PriceToBookRatio",
+        "PriceToSalesRatioTTM",
+        "EVToRevenue",
+        "EVToEBITDA",
+    ),
+    "pe": ("PERatio", "ForwardPE", "TrailingPE"),
+    "dividend": ("DividendPerShare", "DividendYield", "DividendDate", "ExDividendDate"),
+    "return": ("ReturnOnAssetsTTM", "ReturnOnEquityTTM"),
+    "roe": ("ReturnOnEquityTTM",),
+    "book": ("BookValue", "PriceToBookRatio"),
+    "price": ("52WeekHigh", "52WeekLow", "50DayMovingAverage", "200DayMovingAverage"),
+    "stock": ("52WeekHigh", "52WeekLow", "50DayMovingAverage", "200DayMovingAverage"),
+    "target": ("AnalystTargetPrice",),
+    "analyst": (
+        "AnalystTargetPrice",
+        "AnalystRatingStrongBuy",
+        "AnalystRatingBuy",
+        "AnalystRatingHold",
+        "AnalystRatingSell",
+        "AnalystRatingStrongSell",
+    ),
+    "risk": ("Beta",),
+    "volatility": ("Beta",),
+    "beta": ("Beta",),
+    "shares": ("SharesOutstanding",),
+    "business": ("Description",),
+    "describe": ("Description",),
+    "overview": ("Description",),
+}
+
+
+def project_overview(overview: dict | None, question: str) -> dict:
+    """Keeps the identifying fields plus those relevant to the question."""
+    if not overview:
+        return {}
+    words = set(re.findall(r"[a-z]+", question.lower()))
+    wanted = [
+        field
+        for keyword, fields in _OVERVIEW_KEYWORDS.items()
+        if keyword in words or f"{keyword}s" in words
+        for field in fields
+    ]
+    fields = _CORE_OVERVIEW_FIELDS + tuple(wanted or _DEFAULT_OVERVIEW_FIELDS)
+    return {
+        field: overview[field]
+        for field in dict.fromkeys(fields)
+        if overview.get(field) not in (None, "", "None", "-")
+    }
+
+
+def format_overview(overview: dict) -> str:
+    if not overview:
+        return "Not available."
+    return "\n".join(f"{field}: {value}" for field, value in overview.items())
+
+
+# --- Packing ---
+
+
+def pack_documents(docs: list[Document], token_budget: int) -> tuple[str, int]:
+    """
+    Joins documents in rank order until the budget is spent; the first document
+    that doesn't fit is cut at a token boundary rather than dropped outright.
+    Returns the text and its token count.
+    """
+    parts, used = [], 0
+    for doc in docs:
+        remaining = token_budget - used
+        if remaining <= 0:
+            break
+        tokens = count_tokens(doc.page_content)
+        if tokens <= remaining:
+            parts.append(doc.page_content)
+            used += tokens
+            continue
+        encoding = _get_encoding()
+        if encoding:
+            truncated = encoding.decode(_encode(encoding, doc.page_content)[:remaining])
+        else:
+            truncated = doc.page_content[: remaining * 4]
+        if remaining >= 50:  # Shorter fragments add little but noise.
+            parts.append(truncated + " ...")
+            used += remaining
+        break
+    return "\n\n".join(parts), used
+
+
+class PromptStats:
+    """Running totals of prompt sizes, against what unpacked prompts would cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.unpacked_tokens = 0
+        self.last = None
+
+    def record(self, prompt_tokens: int, unpacked_tokens: int):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.unpacked_tokens += unpacked_tokens
+            self.last = {"prompt_tokens": prompt_tokens, "unpacked_tokens": unpacked_tokens}
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = max(1, self.requests)
+            return {
+                "requests": self.requests,
+                "avg_prompt_tokens": self.prompt_tokens / requests,
+                "avg_unpacked_tokens": self.unpacked_tokens / requests,
+                "token_savings": (
+                    1 - self.prompt_tokens / self.unpacked_tokens
+                    if self.unpacked_tokens
+                    else 0.0
+                ),
+                "last": self.last,
+            }
+
+
+_prompt_stats = PromptStats()
+
+
+def get_prompt_stats() -> PromptStats:
+    return _prompt_stats
@@ -0,0 +1,206 @@
+# src/core/embeddings.py
+
+import os
+import queue
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+# "torch" (sentence-transformers), "onnx" (ONNX Runtime) or "onnx-int8"
+# (ONNX Runtime with int8 dynamically quantized weights).
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Queries are served ahead of bulk ingestion work that is already queued.
+QUERY_PRIORITY = 0
+DOCUMENT_PRIORITY = 1
+
+
+def load_embedding_model(model_name: str, backend: str, batch_size: int):
+    """Loads the model behind the service; it exposes embed_documents/embed_query."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}'; expected one of "
+            f"{', '.join(EMBEDDING_BACKENDS)}."
+        )
+    print(f"Loading embedding model '{model_name}' ({backend})...")
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(
+            model_name=model_name, encode_kwargs={"batch_size": batch_size}
+        )
+
+    # The ONNX backend tunes its own forward-pass batch size.
+    from src.core.onnx_embeddings import OnnxEmbeddingModel
+
+    return OnnxEmbeddingModel(model_name, quantize=backend == "onnx-int8")
+
+
+class EmbeddingService(Embeddings):
+    """
+    A process-wide embedding model shared by the query path and ingestion.
+
+    Concurrent embed calls are queued and coalesced by a single worker thread
+    into one forward pass of up to `max_batch_size` texts. The worker waits at
+    most `batch_window_ms` after the first pending request for others to join.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        batch_window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        backend: str = EMBEDDING_BACKEND,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = max(0.0, batch_window_ms) / 1000.0
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._requests = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stopped = False
+
+    # --- Model lifecycle ---
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = load_embedding_model(
+                        self.model_name, self.backend, self.max_batch_size
+                    )
+        return self._model
+
+    def warmup(self):
+        """Loads the model weights and runs one forward pass."""
+        self.embed_query("warmup")
+        print("Embedding service is warm.")
+
+    def close(self):
+        """Stops the batching worker. Pending requests are still answered."""
+        self._stopped = True
+        self._requests.put((DOCUMENT_PRIORITY + 1, next(self._sequence), None))
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    # --- Batching worker ---
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._stopped = False
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-service", daemon=True
+                    )
+                    self._worker.start()
+
+    def _submit(self, texts: list[str], priority: int) -> list[Future]:
+        self._ensure_worker()
+        futures = []
+        for start in range(0, len(texts), self.max_batch_size):
+            future = Future()
+            batch = texts[start : start + self.max_batch_size]
+            self._requests.put((priority, next(self._sequence), (batch, future)))
+            futures.append(future)
+        return futures
+
+    def _run(self):
+        carried = None
+        while True:
+            item = carried or self._requests.get()
+            carried = None
+            if item[2] is None:
+                if self._stopped:
+                    return
+                continue
+
+            pending = [item[2]]
+            size = len(item[2][0])
+            deadline = time.monotonic() + self.batch_window
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    nxt = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if nxt[2] is None or size + len(nxt[2][0]) > self.max_batch_size:
+                    carried = nxt
+                    break
+                pending.append(nxt[2])
+                size += len(nxt[2][0])
+
+            self._embed_pending(pending)
+
+    def _embed_pending(self, pending: list[tuple[list[str], Future]]):
+        texts = [text for batch, _ in pending for text in batch]
+        try:
+            vectors = self._get_model().embed_documents(texts)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for batch, future in pending:
+            future.set_result(vectors[offset : offset + len(batch)])
+            offset += len(batch)
+
+    # --- Embeddings interface ---
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        futures = self._submit(list(texts), DOCUMENT_PRIORITY)
+        return [vector for future in futures for vector in future.result()]
+
+    def embed_query(self, text: str) -> list[float]:
+        (future,) = self._submit([text], QUERY_PRIORITY)
+        return future.result()[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        futures = self._submit(list(texts), DOCUMENT_PRIORITY)
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        return [vector for batch in results for vector in batch]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        (future,) = self._submit([text], QUERY_PRIORITY)
+        return (await asyncio.wrap_future(future))[0]
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embeds several queries at query priority, batched like documents."""
+        if not texts:
+            return []
+        futures = self._submit(list(texts), QUERY_PRIORITY)
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        return [vector for batch in results for vector in batch]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Returns the process-wide embedding service, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
@@ -0,0 +1,193 @@
+# src/core/onnx_embeddings.py
+
+import os
+import json
+import time
+import threading
+import numpy as np
+
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "data/onnx_models")
+# ONNX Runtime intra-op threads per model; 0 lets the runtime use every core.
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+# Texts per forward pass, or "auto" to measure the fastest size on this machine.
+EMBEDDING_ONNX_BATCH_SIZE = os.getenv("EMBEDDING_ONNX_BATCH_SIZE", "auto")
+
+# sentence-transformers truncates all-MiniLM-L6-v2 inputs at 256 tokens.
+MAX_SEQUENCE_LENGTH = 256
+AUTOTUNE_BATCH_SIZES = (8, 16, 32, 64, 128)
+# Roughly one ingestion chunk (1024 characters) of filing prose.
+_AUTOTUNE_TEXT = (
+    "Revenue from operations grew on higher volumes and improved realisations, "
+    "while finance costs declined as the company reduced its borrowings. "
+) * 7
+
+_export_lock = threading.Lock()
+
+
+def _model_dir(model_name: str) -> str:
+    return os.path.join(EMBEDDING_ONNX_DIR, model_name.replace("/", "__"))
+
+
+def export_onnx_model(model_name: str, quantize: bool) -> str:
+    """
+    Exports the Hugging Face encoder to ONNX (once per model) and, if asked,
+    writes an int8 dynamically quantized copy. Returns the model file to load.
+    """
+    directory = _model_dir(model_name)
+    fp32_path = os.path.join(directory, "model.onnx")
+    int8_path = os.path.join(directory, "model.int8.onnx")
+    path = int8_path if quantize else fp32_path
+    with _export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(fp32_path):
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            print(f"Exporting '{model_name}' to ONNX...")
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModel.from_pretrained(model_name)
+            model.config.return_dict = False
+            model.eval()
+            sample = tokenizer(["export"], return_tensors="pt")
+            input_names = ["input_ids", "attention_mask", "token_type_ids"]
+            axes = {0: "batch", 1: "sequence"}
+            # Written under a temporary name so a concurrent worker never loads
+            # a half-written file.
+            tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+            with torch.no_grad():
+                torch.onnx.export(
+                    model,
+                    tuple(sample[name] for name in input_names),
+                    tmp_path,
+                    input_names=input_names,
+                    output_names=["last_hidden_state", "pooler_output"],
+                    dynamic_axes={name: axes for name in input_names}
+                    | {"last_hidden_state": axes},
+                    opset_version=17,
+                    dynamo=False,
+                )
+            os.replace(tmp_path, fp32_path)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"Quantizing '{model_name}' to int8...")
+            tmp_path = f"{int8_path}.{os.getpid()}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+    return path
+
+
+class OnnxEmbeddingModel:
+    """
+    Mean-pooled, L2-normalized sentence embeddings from an ONNX export of a
+    sentence-transformers model, run with ONNX Runtime on the CPU. Produces the
+    same vectors as the PyTorch model up to numerical (or int8) error.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        threads: int = EMBEDDING_ONNX_THREADS,
+        batch_size: int | str = EMBEDDING_ONNX_BATCH_SIZE,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.model_path = export_onnx_model(model_name, quantize)
+        self.threads = threads
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            self.model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        if str(batch_size) == "auto":
+            self.batch_size = self._tuned_batch_size()
+        else:
+            self.batch_size = max(1, int(batch_size))
+        print(
+            f"ONNX embedding model ready: {os.path.basename(self.model_path)}, "
+            f"batch size {self.batch_size}, threads {threads or 'auto'}."
+        )
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=MAX_SEQUENCE_LENGTH,
+            return_tensors="np",
+        )
+        feed = {
+            name: inputs[name].astype(np.int64)
+            for name in self._input_names
+            if name in inputs
+        }
+        (hidden,) = self.session.run(["last_hidden_state"], feed)
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: list[str], batch_size: int | None = None):
+        """Embeds texts in length-sorted batches, so each batch pads little."""
+        batch_size = batch_size or self.batch_size
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            indexes = order[start : start + batch_size]
+            encoded = self._encode([texts[i] for i in indexes])
+            for i, vector in zip(indexes, encoded):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    # --- Batch size autotuning ---
+
+    def autotune_batch_size(
+        self, candidates: tuple[int, ...] = AUTOTUNE_BATCH_SIZES, texts: int = 128
+    ) -> int:
+        """Times chunk-sized inputs at each candidate size; returns the fastest."""
+        sample = [_AUTOTUNE_TEXT] * texts
+        self._encode(sample[:8])  # Warm up the session's allocations.
+        best, best_rate = candidates[0], 0.0
+        for batch_size in candidates:
+            start = time.perf_counter()
+            self.embed_documents(sample, batch_size)
+            rate = texts / (time.perf_counter() - start)
+            if rate > best_rate:
+                best, best_rate = batch_size, rate
+        print(f"Autotuned ONNX embedding batch size: {best} ({best_rate:.0f} texts/s).")
+        return best
+
+    def _tuned_batch_size(self) -> int:
+        """Reuses a size tuned earlier for this model file, thread count and CPU."""
+        tuning_path = os.path.join(os.path.dirname(self.model_path), "batch_sizes.json")
+        key = f"{os.path.basename(self.model_path)}:{self.threads}:{os.cpu_count()}"
+        try:
+            with open(tuning_path) as f:
+                tuned = json.load(f)
+        except (OSError, ValueError):
+            tuned = {}
+        if key not in tuned:
+            tuned[key] = self.autotune_batch_size()
+            tmp_path = f"{tuning_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(tuned, f)
+            os.replace(tmp_path, tuning_path)
+        return tuned[key]
@@ -1,12 +1,150 @@
 # src/core/processing.py
 
-# CHANGED: Corrected the typo in HuggingFaceEmbeddings
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+import os
+import hashlib
+from typing import Iterable, Iterator
+import chromadb
 from langchain_core.documents import Document
 from langchain_community.vectorstores.utils import filter_complex_metadata
+from src.core.embeddings import get_embedding_service
+from src.utils.metrics import span
 
 CHROMA_DB_PATH = "chroma_db"
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+
+def get_chroma_client():
+    """The persistent Chroma client; chromadb reuses one instance per path."""
+    return chromadb.PersistentClient(path=CHROMA_DB_PATH)
+
+
+def get_chroma_collection(ticker: str):
+    """Opens (or creates) the persistent Chroma collection for a ticker."""
+    client = get_chroma_client()
+    # Embeddings are always supplied by us, matching how LangChain's Chroma
+    # wrapper creates collections.
+    return client.get_or_create_collection(
+        name=ticker.lower(), embedding_function=None
+    )
+
+
+def batch_chunks(
+    chunks: Iterable[Document], batch_size: int = EMBED_BATCH_SIZE
+) -> Iterator[list[Document]]:
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(
+    batches: Iterable[list[Document]],
+) -> Iterator[tuple[list[Document], list[list[float]]]]:
+    """Embeds each batch of chunks, yielding (chunks, vectors) pairs."""
+    embedding_model = get_embedding_service()
+    for batch in batches:
+        filtered = filter_complex_metadata(batch)
+        with span("embed"):
+            vectors = embedding_model.embed_documents(
+                [c.page_content for c in filtered]
+            )
+        yield filtered, vectors
+
+
+def chunk_source(chunk: Document) -> tuple[str, str]:
+    """Returns the (kind, identifier) of the document a chunk was cut from."""
+    metadata = chunk.metadata or {}
+    if metadata.get("url"):
+        return "news", metadata["url"]
+    return "report", metadata.get("source_file") or "unknown"
+
+
+def chunk_id(chunk: Document) -> str:
+    """A stable ID derived from the chunk's source and a hash of its content."""
+    kind, source = chunk_source(chunk)
+    content_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+    key = f"{kind}\x00{source}\x00{content_hash}".encode("utf-8")
+    return hashlib.sha256(key).hexdigest()[:32]
+
+
+class CollectionSync:
+    """
+    Makes re-ingesting a ticker idempotent. Chunks get deterministic IDs, those
+    already stored are skipped before embedding, and after a full refresh
+    `sweep()` deletes stored chunks that no longer appear in their source.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.collection = get_chroma_collection(ticker)
+        self.seen_ids = set()
+        self.refreshed_kinds = set()
+        self.skipped = 0
+        self.stored = 0
+
+    def skip_unchanged(
+        self, batches: Iterable[list[Document]]
+    ) -> Iterator[list[Document]]:
+        """Tags chunks with their IDs and drops ones already in the collection."""
+        for batch in batches:
+            tagged = {}
+            for chunk in batch:
+                kind, _ = chunk_source(chunk)
+                cid = chunk_id(chunk)
+                self.refreshed_kinds.add(kind)
+                if cid in self.seen_ids:
+                    continue  # Identical chunk from the same source.
+                self.seen_ids.add(cid)
+                chunk.metadata = {**chunk.metadata, "chunk_id": cid, "source_kind": kind}
+                tagged[cid] = chunk
+
+            if not tagged:
+                continue
+            existing = set(self.collection.get(ids=list(tagged), include=[])["ids"])
+            self.skipped += len(existing)
+            new_chunks = [chunk for cid, chunk in tagged.items() if cid not in existing]
+            if new_chunks:
+                yield new_chunks
+
+    def upsert(
+        self, embedded: Iterable[tuple[list[Document], list[list[float]]]]
+    ) -> Iterator[int]:
+        """Writes embedded batches to the collection, yielding each batch size."""
+        for chunks, vectors in embedded:
+            with span("chroma_write"):
+                self.collection.upsert(
+                    ids=[c.metadata["chunk_id"] for c in chunks],
+                    embeddings=vectors,
+                    documents=[c.page_content for c in chunks],
+                    metadatas=[c.metadata for c in chunks],
+                )
+            self.stored += len(chunks)
+            yield len(chunks)
+
+    def sweep(self) -> int:
+        """
+        Deletes chunks of every refreshed source kind that weren't seen in this
+        run, plus untagged chunks from before IDs were deterministic. Kinds that
+        produced nothing this run (e.g. a failed report download) are kept.
+        """
+        stored = self.collection.get(include=["metadatas"])
+        stale = [
+            cid
+            for cid, metadata in zip(stored["ids"], stored["metadatas"])
+            if cid not in self.seen_ids
+            and (
+                not metadata
+                or metadata.get("source_kind") is None
+                or metadata.get("source_kind") in self.refreshed_kinds
+            )
+        ]
+        for start in range(0, len(stale), 1000):
+            self.collection.delete(ids=stale[start : start + 1000])
+        return len(stale)
 
 
 def create_and_store_embeddings(ticker: str, all_chunks: list[Document]):
@@ -18,21 +156,14 @@ def create_and_store_embeddings(ticker: str, all_chunks: list[Document]):
         print(f"No chunks provided for {ticker}. Aborting embedding process.")
         return
 
-    filtered_chunks = filter_complex_metadata(all_chunks)
+    print(f"Creating and storing embeddings for {len(all_chunks)} chunks for {ticker}...")
 
-    print(
-        f"Creating and storing embeddings for {len(filtered_chunks)} chunks for {ticker}..."
-    )
+    sync = CollectionSync(ticker)
+    batches = sync.skip_unchanged(batch_chunks(all_chunks))
+    for _ in sync.upsert(embed_batches(batches)):
+        pass
 
-    embedding_model = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
-
-    Chroma.from_documents(
-        documents=filtered_chunks,
-        embedding=embedding_model,
-        collection_name=ticker.lower(),
-        persist_directory=CHROMA_DB_PATH,
+    print(
+        f"Successfully stored {sync.stored} new embeddings for {ticker} "
+        f"({sync.skipped} unchanged chunks skipped)."
     )
-
-    print(f"Successfully stored embeddings for {ticker}.")
@@ -3,26 +3,64 @@
 import os
 import json
 from dotenv import load_dotenv
-from langchain_chroma import Chroma
 from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from src.utils.database_handler import get_cached_stock_overview
+from src.utils.database_handler import (
+    get_cached_stock_overview,
+    register_status_listener,
+)
+from src.utils.cache import LRUCache
+from src.core.embeddings import get_embedding_service
+from src.core.retrievers import (
+    ChromaCollectionRetriever,
+    InMemoryVectorRetriever,
+    search_collection,
+)
+from src.core.context import (
+    CONTEXT_TOKEN_BUDGET,
+    count_tokens,
+    format_overview,
+    get_prompt_stats,
+    pack_documents,
+    project_overview,
+)
+from src.core.processing import get_chroma_collection
+from src.utils.metrics import cache_lookup, span
 
 # NEW: Load environment variables to access API keys
 load_dotenv()
-CHROMA_DB_PATH = "chroma_db"
+RAG_CHAIN_CACHE_SIZE = int(os.getenv("RAG_CHAIN_CACHE_SIZE", "32"))
+RAG_CHAIN_CACHE_TTL = float(os.getenv("RAG_CHAIN_CACHE_TTL", "3600"))
+RETRIEVAL_K = 5
+# Chunks retrieved per company for comparative questions, and the token budget
+# their combined context (excerpts plus overviews) must fit in.
+COMPARE_RETRIEVAL_K = int(os.getenv("COMPARE_RETRIEVAL_K", "6"))
+COMPARE_CONTEXT_TOKENS = int(os.getenv("COMPARE_CONTEXT_TOKENS", "6000"))
+
+# Assembled (chain, collection) pairs for indexed tickers, keyed by ticker.
+_rag_chain_cache = LRUCache(maxsize=RAG_CHAIN_CACHE_SIZE, ttl=RAG_CHAIN_CACHE_TTL)
+
+
+def invalidate_rag_chain(ticker: str, status: str | None = None):
+    """Drops the cached chain for a ticker whose indexing state has changed."""
+    if _rag_chain_cache.invalidate(ticker):
+        print(f"Invalidated cached RAG chain for '{ticker}' ({status}).")
+
+
+def get_rag_chain_cache_stats() -> dict:
+    return _rag_chain_cache.stats()
+
+
+register_status_listener(invalidate_rag_chain)
 
 
 def get_base_rag_components(ticker: str):
     """Helper function to get the components common to both RAG chains."""
-    embedding_model = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    embedding_model = get_embedding_service()
 
     template = """
     You are an expert financial analyst. Your task is to provide clear, concise, and detailed answers based on the following context.
@@ -41,82 +79,245 @@ def get_base_rag_components(ticker: str):
     """
     prompt = ChatPromptTemplate.from_template(template)
 
+    return embedding_model, prompt, get_llm()
+
+
+def get_llm():
     # NEW: Securely get the API key and validate it
     groq_api_key = os.getenv("GROQ_AI_API_KEY")
     if not groq_api_key:
         raise ValueError("GROQ_API_KEY not found in environment variables.")
 
     # UPDATED: Pass the API key directly to the ChatGroq constructor
-    llm = ChatGroq(
+    return ChatGroq(
         groq_api_key=groq_api_key, model_name="gemma2-9b-it", temperature=0.1
     )
 
-    return embedding_model, prompt, llm
+
+def format_docs(docs: list[Document]) -> str:
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+class RagChain:
+    """
+    Retrieval followed by generation. `ainvoke` behaves like the equivalent LCEL
+    chain; `aretrieve` and `astream_answer` expose the two steps separately so
+    callers can report the retrieved sources before streaming the answer.
+
+    The prompt is packed per question: the overview is projected to the fields
+    the question needs and the excerpts fill the rest of `token_budget`.
+    """
+
+    def __init__(
+        self,
+        retriever,
+        prompt,
+        llm,
+        stock_overview: dict | None,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+    ):
+        self.retriever = retriever
+        self.prompt = prompt
+        self.stock_overview = stock_overview
+        self.token_budget = token_budget
+        self.answer_chain = prompt | llm | StrOutputParser()
+        # Fixed parts of the prompt-size statistics, counted once per chain.
+        self._template_tokens = count_tokens(
+            prompt.format(context="", stock_data="", question="")
+        )
+        self._full_overview_tokens = count_tokens(
+            json.dumps(stock_overview, indent=2) if stock_overview else "Not available."
+        )
+
+    def pack(self, question: str, docs: list[Document]) -> tuple[dict, int]:
+        """Builds the prompt inputs for a question. Returns (inputs, prompt tokens)."""
+        stock_data = format_overview(project_overview(self.stock_overview, question))
+        overview_tokens = count_tokens(stock_data)
+        context, context_tokens = pack_documents(
+            docs, self.token_budget - overview_tokens
+        )
+        answer_input = {"context": context, "stock_data": stock_data, "question": question}
+
+        # Estimate what the verbatim prompt (all excerpts, full overview) would
+        # have cost from per-text counts; excerpt counts are cached from packing.
+        fixed_tokens = self._template_tokens + count_tokens(question)
+        prompt_tokens = fixed_tokens + overview_tokens + context_tokens
+        unpacked_tokens = (
+            fixed_tokens
+            + self._full_overview_tokens
+            + sum(count_tokens(doc.page_content) for doc in docs)
+        )
+        get_prompt_stats().record(prompt_tokens, unpacked_tokens)
+        return answer_input, prompt_tokens
+
+    def invoke(self, question: str) -> str:
+        with span("retrieval"):
+            docs = self.retriever.invoke(question)
+        answer_input, _ = self.pack(question, docs)
+        with span("llm_generation"):
+            return self.answer_chain.invoke(answer_input)
+
+    async def ainvoke(self, question: str, question_vector=None) -> str:
+        docs = await self.aretrieve(question, question_vector)
+        return await self.aanswer(question, docs)
+
+    async def aanswer(self, question: str, docs: list[Document]) -> str:
+        answer_input, _ = self.pack(question, docs)
+        with span("llm_generation"):
+            return await self.answer_chain.ainvoke(answer_input)
+
+    async def aretrieve(self, question: str, question_vector=None) -> list[Document]:
+        """Retrieves excerpts, reusing `question_vector` if it was already embedded."""
+        with span("retrieval"):
+            if question_vector is not None:
+                return await self.retriever.asearch_vector(question_vector)
+            return await self.retriever.ainvoke(question)
+
+    async def astream_answer(self, question: str, docs: list[Document]):
+        """Yields the answer's text chunks as the LLM generates them."""
+        answer_input, _ = self.pack(question, docs)
+        with span("llm_generation"):
+            async for chunk in self.answer_chain.astream(answer_input):
+                yield chunk
 
 
 def create_persistent_rag_chain(ticker: str):
-    """Creates a RAG chain that queries the persistent, cached ChromaDB."""
-    embedding_model, prompt, llm = get_base_rag_components(ticker)
+    """
+    Returns the RAG chain that queries the persistent, cached ChromaDB.
+    Chains are cached per ticker until the ticker is re-indexed or the TTL expires.
+    """
+    cached = _rag_chain_cache.get(ticker)
+    cache_lookup("rag_chains", cached is not None)
+    if cached is not None:
+        rag_chain, _ = cached
+        return rag_chain
 
-    vector_store = Chroma(
-        persist_directory=CHROMA_DB_PATH,
-        embedding_function=embedding_model,
-        collection_name=ticker.lower(),
-    )
-    retriever = vector_store.as_retriever(search_kwargs={"k": 5})
+    embedding_model, prompt, llm = get_base_rag_components(ticker)
 
-    stock_overview_data = get_cached_stock_overview(ticker)
-    stock_data_str = (
-        json.dumps(stock_overview_data, indent=2)
-        if stock_overview_data
-        else "Not available."
+    collection = get_chroma_collection(ticker)
+    retriever = ChromaCollectionRetriever(
+        embedding=embedding_model, collection=collection, k=RETRIEVAL_K
     )
 
-    def format_docs(docs):
-        return "\n\n".join(doc.page_content for doc in docs)
-
-    rag_chain = (
-        {
-            "context": retriever | format_docs,
-            "stock_data": lambda x: stock_data_str,
-            "question": RunnablePassthrough(),
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
+    rag_chain = RagChain(retriever, prompt, llm, get_cached_stock_overview(ticker))
 
+    _rag_chain_cache.set(ticker, (rag_chain, collection))
     return rag_chain
 
 
+def split_live_documents(documents: list[Document]) -> list[Document]:
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100)
+    return text_splitter.split_documents(documents)
+
+
 def create_live_rag_chain(documents: list[Document], stock_overview: dict):
     """
     Creates a temporary, in-memory RAG chain from live-fetched documents.
+    The chunks are embedded in one batch and searched as a NumPy matrix, so no
+    vector store is created (or left behind) per request.
     """
     embedding_model, prompt, llm = get_base_rag_components("live")
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100)
-    chunks = text_splitter.split_documents(documents)
+    chunks = split_live_documents(documents)
+
+    retriever = InMemoryVectorRetriever.from_documents(
+        chunks, embedding_model, k=RETRIEVAL_K
+    )
+
+    return RagChain(retriever, prompt, llm, stock_overview)
+
+
+def retrieve_by_vectors(
+    ticker: str, vectors: list[list[float]], k: int = RETRIEVAL_K
+) -> list[list[Document]]:
+    """Runs several similarity searches against a ticker's collection in one query."""
+    with span("retrieval"):
+        return search_collection(get_chroma_collection(ticker), vectors, k)
 
-    vector_store = Chroma.from_documents(chunks, embedding_model)
-    retriever = vector_store.as_retriever(search_kwargs={"k": 5})
 
-    stock_data_str = (
-        json.dumps(stock_overview, indent=2) if stock_overview else "Not available."
+async def _generate_answer(job: tuple) -> str:
+    rag_chain, question, docs = job
+    return await rag_chain.aanswer(question, docs)
+
+
+async def abatch_answers(
+    jobs: list[tuple["RagChain", str, list[Document]]], max_concurrency: int
+) -> list:
+    """
+    Generates answers for (rag_chain, question, docs) jobs with at most
+    `max_concurrency` LLM calls in flight. Failed items come back as exceptions.
+    """
+    return await RunnableLambda(_generate_answer).abatch(
+        jobs, config={"max_concurrency": max_concurrency}, return_exceptions=True
     )
 
-    def format_docs(docs):
-        return "\n\n".join(doc.page_content for doc in docs)
-
-    rag_chain = (
-        {
-            "context": retriever | format_docs,
-            "stock_data": lambda x: stock_data_str,
-            "question": RunnablePassthrough(),
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
+
+# --- Comparative questions ---
+
+COMPARISON_TEMPLATE = """
+    You are an expert financial analyst. Compare the companies below to answer the question.
+    Use only the context given for each company, state figures with the company they belong to,
+    and say so when a company's context lacks the information needed.
+
+    {context}
+
+    QUESTION:
+    {question}
+
+    COMPARISON:
+    """
+
+
+def retrieve_indexed(
+    ticker: str, vector: list[float], k: int = COMPARE_RETRIEVAL_K
+) -> list[Document]:
+    """Top-k chunks of an indexed ticker's collection for one question vector."""
+    return retrieve_by_vectors(ticker, [vector], k)[0]
+
+
+def retrieve_live(
+    documents: list[Document], question: str, k: int = COMPARE_RETRIEVAL_K
+) -> list[Document]:
+    """Top-k chunks of freshly fetched documents, without building a vector store."""
+    chunks = split_live_documents(documents)
+    retriever = InMemoryVectorRetriever.from_documents(
+        chunks, get_embedding_service(), k=k
     )
+    with span("retrieval"):
+        return retriever.invoke(question)
 
-    return rag_chain
+
+def build_comparison_context(
+    sections: list[dict], question: str, token_budget: int = COMPARE_CONTEXT_TOKENS
+) -> str:
+    """
+    Renders one block per company from dicts with ticker, company_name, source,
+    overview and docs (best first). The budget is split evenly so every company
+    is represented; each block keeps the overview fields the question needs and
+    as many excerpts as fit.
+    """
+    share = token_budget // max(1, len(sections))
+    blocks = []
+    for section in sections:
+        overview = project_overview(section.get("overview"), question)
+        header = (
+            f"### {section['company_name']} ({section['ticker']}), "
+            f"from {section['source']}\n"
+            "STRUCTURED FINANCIAL DATA:\n"
+            + format_overview(overview)
+            + "\nEXCERPTS:"
+        )
+        excerpts, _ = pack_documents(
+            section.get("docs", []), share - count_tokens(header)
+        )
+        blocks.append("\n".join([header, excerpts or "None."]))
+    return "\n\n".join(blocks)
+
+
+async def acompare_companies(question: str, sections: list[dict]) -> str:
+    """Answers a comparative question about several companies with one LLM call."""
+    prompt = ChatPromptTemplate.from_template(COMPARISON_TEMPLATE)
+    chain = prompt | get_llm() | StrOutputParser()
+    context = build_comparison_context(sections, question)
+    with span("llm_generation"):
+        return await chain.ainvoke({"context": context, "question": question})
@@ -0,0 +1,128 @@
+# src/core/retrievers.py
+
+import asyncio
+from typing import Any
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from src.core.context import CONTEXT_FETCH_K, normalize_rows, select_diverse
+
+
+class InMemoryVectorRetriever(BaseRetriever):
+    """
+    Top-k cosine retrieval over a small, fixed set of documents held as a single
+    NumPy matrix. Used for the preliminary answer path, where the corpus is a
+    handful of news chunks and building a vector store would cost more than the
+    search itself. The best `fetch_k` matches are narrowed to k by dedupe + MMR.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embedding: Embeddings
+    documents: list[Document]
+    vectors: np.ndarray  # one L2-normalized row per document
+    k: int = 5
+    fetch_k: int = CONTEXT_FETCH_K
+
+    @classmethod
+    def from_documents(
+        cls, documents: list[Document], embedding: Embeddings, k: int = 5
+    ) -> "InMemoryVectorRetriever":
+        """Embeds all documents in one batch and returns a retriever over them."""
+        texts = [doc.page_content for doc in documents]
+        vectors = embedding.embed_documents(texts) if texts else []
+        return cls(
+            embedding=embedding,
+            documents=documents,
+            vectors=normalize_rows(np.asarray(vectors, dtype=np.float32)),
+            k=k,
+        )
+
+    def _top_k(self, query_vector: list[float]) -> list[Document]:
+        if not self.documents:
+            return []
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32))
+        scores = self.vectors @ query
+        fetch_k = min(max(self.k, self.fetch_k), len(scores))
+        # argpartition finds the top candidates in O(n); only those are sorted.
+        top = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+        top = top[np.argsort(-scores[top])]
+        chosen = select_diverse(query, self.vectors[top], self.k)
+        return [self.documents[top[i]] for i in chosen]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._top_k(self.embedding.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._top_k(await self.embedding.aembed_query(query))
+
+    async def asearch_vector(self, query_vector: list[float]) -> list[Document]:
+        """Retrieves for an already embedded question."""
+        return self._top_k(query_vector)
+
+
+def search_collection(
+    collection, query_vectors: list, k: int, fetch_k: int = CONTEXT_FETCH_K
+) -> list[list[Document]]:
+    """
+    Runs one Chroma query for several query vectors, fetching `fetch_k`
+    candidates each with their embeddings and narrowing them to k by dedupe + MMR.
+    """
+    if not len(query_vectors):
+        return []
+    result = collection.query(
+        query_embeddings=list(query_vectors),
+        n_results=max(k, fetch_k),
+        include=["documents", "metadatas", "embeddings"],
+    )
+    matches = []
+    for query_vector, texts, metadatas, embeddings in zip(
+        query_vectors, result["documents"], result["metadatas"], result["embeddings"]
+    ):
+        chosen = select_diverse(query_vector, embeddings, k) if len(texts) else []
+        matches.append(
+            [
+                Document(page_content=texts[i], metadata=metadatas[i] or {})
+                for i in chosen
+            ]
+        )
+    return matches
+
+
+class ChromaCollectionRetriever(BaseRetriever):
+    """Retrieves from a persistent Chroma collection, deduplicated and diversified."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embedding: Embeddings
+    collection: Any
+    k: int = 5
+    fetch_k: int = CONTEXT_FETCH_K
+
+    def _search(self, query_vector: list[float]) -> list[Document]:
+        return search_collection(self.collection, [query_vector], self.k, self.fetch_k)[0]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._search(self.embedding.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return await self.asearch_vector(await self.embedding.aembed_query(query))
+
+    async def asearch_vector(self, query_vector: list[float]) -> list[Document]:
+        """Retrieves for an already embedded question."""
+        # The Chroma client is synchronous; keep it off the event loop.
+        return await asyncio.to_thread(self._search, query_vector)
@@ -0,0 +1,176 @@
+# src/ingestion/dedupe.py
+
+import os
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+from typing import Iterable, Iterator
+import numpy as np
+from langchain_core.documents import Document
+
+# Chunks whose estimated Jaccard similarity to a kept chunk reaches this are dropped.
+CHUNK_DEDUPE_SIMILARITY = float(os.getenv("CHUNK_DEDUPE_SIMILARITY", "0.85"))
+# A report line seen on this many distinct pages is page furniture (0 disables).
+CHUNK_BOILERPLATE_MIN_PAGES = int(os.getenv("CHUNK_BOILERPLATE_MIN_PAGES", "3"))
+# Chunks left shorter than this after stripping furniture are dropped.
+CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", "40"))
+
+SHINGLE_WORDS = 5
+# 32 bands of 4 rows: chunks above ~0.42 similarity usually share a bucket, and
+# every candidate is then checked against the threshold on the full signature.
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+# Lines longer than this are paragraphs, not furniture; they're left to MinHash.
+_MAX_FURNITURE_CHARS = 300
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+
+
+def _normalize_line(line: str) -> str:
+    """Lowercased, whitespace-collapsed, with numbers masked ("Page 3 of 40")."""
+    return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+
+class ChunkDeduplicator:
+    """
+    Drops repeated content from the chunk stream before it is embedded.
+
+    Report chunks first lose lines that recur across pages of the same file
+    (running headers, footers, disclaimers, repeated captions). Every chunk is
+    then checked for exact and near-duplicates (MinHash over word shingles,
+    with LSH buckets to find candidates) of chunks already kept; the first
+    occurrence wins. A line only counts as furniture from its
+    CHUNK_BOILERPLATE_MIN_PAGES-th page on, so its first few copies survive.
+    """
+
+    def __init__(
+        self,
+        similarity: float = CHUNK_DEDUPE_SIMILARITY,
+        boilerplate_min_pages: int = CHUNK_BOILERPLATE_MIN_PAGES,
+        min_chars: int = CHUNK_MIN_CHARS,
+        permutations: int = MINHASH_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+    ):
+        self.similarity = similarity
+        self.boilerplate_min_pages = boilerplate_min_pages
+        self.min_chars = min_chars
+        self.bands = bands
+        self.rows = permutations // bands
+        rng = np.random.default_rng(1)  # Fixed so signatures are reproducible.
+        self._a = rng.integers(1, _MERSENNE_PRIME, permutations, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, permutations, dtype=np.uint64)
+
+        self._line_pages = defaultdict(set)  # (source file, line) -> pages seen on
+        self._exact = set()
+        self._signatures = []
+        self._buckets = defaultdict(list)  # (band, band bytes) -> signature indexes
+
+        self.chunks_in = 0
+        self.chunks_out = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.boilerplate_chunks = 0
+        self.boilerplate_lines = 0
+
+    def filter(self, chunks: Iterable[Document]) -> Iterator[Document]:
+        """Pipeline stage: yields the chunks worth embedding, in order."""
+        for chunk in chunks:
+            self.chunks_in += 1
+            chunk = self._strip_furniture(chunk)
+            if len(chunk.page_content.strip()) < self.min_chars:
+                self.boilerplate_chunks += 1
+                continue
+            if self._is_duplicate(chunk.page_content):
+                continue
+            self.chunks_out += 1
+            yield chunk
+
+    @property
+    def removed(self) -> int:
+        return self.chunks_in - self.chunks_out
+
+    def stats(self) -> dict:
+        return {
+            "chunks_in": self.chunks_in,
+            "chunks_out": self.chunks_out,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "boilerplate_chunks": self.boilerplate_chunks,
+            "boilerplate_lines": self.boilerplate_lines,
+        }
+
+    # --- Page furniture ---
+
+    def _strip_furniture(self, chunk: Document) -> Document:
+        metadata = chunk.metadata or {}
+        page = metadata.get("page_number")
+        # Tables are left whole: their row labels legitimately recur on many
+        # pages, and a repeated table is caught as a duplicate instead.
+        if (
+            self.boilerplate_min_pages <= 0
+            or page is None
+            or chunk.page_content.startswith("Table:")
+        ):
+            return chunk
+
+        source = metadata.get("source_file")
+        kept = []
+        for line in chunk.page_content.splitlines():
+            key = _normalize_line(line)
+            if not key or len(key) > _MAX_FURNITURE_CHARS:
+                kept.append(line)
+                continue
+            pages = self._line_pages[(source, key)]
+            pages.add(page)
+            if len(pages) >= self.boilerplate_min_pages:
+                self.boilerplate_lines += 1
+            else:
+                kept.append(line)
+        text = "\n".join(kept).strip()
+        if text == chunk.page_content.strip():
+            return chunk
+        return Document(page_content=text, metadata=metadata)
+
+    # --- Duplicates ---
+
+    def _signature(self, words: list[str]) -> np.ndarray:
+        shingles = {
+            " ".join(words[i : i + SHINGLE_WORDS])
+            for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # One (a*x + b) mod p hash per row (a*x wraps at 64 bits, as in datasketch);
+        # the row's value is its minimum over the shingles.
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _is_duplicate(self, text: str) -> bool:
+        words = _WORD.findall(text.lower())
+        exact_key = hashlib.sha1(" ".join(words).encode("utf-8")).digest()
+        if exact_key in self._exact:
+            self.exact_duplicates += 1
+            return True
+
+        signature = self._signature(words)
+        keys = [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+        candidates = {index for key in keys for index in self._buckets.get(key, ())}
+        for index in candidates:
+            if np.mean(self._signatures[index] == signature) >= self.similarity:
+                self.near_duplicates += 1
+                return True
+
+        self._exact.add(exact_key)
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets[key].append(index)
+        return False
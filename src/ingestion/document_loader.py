@@ -1,55 +1,319 @@
 # src/ingestion/document_loader.py
 
 import os
+import io
+import json
+import hashlib
+import multiprocessing
+from collections import Counter, deque
+from itertools import islice
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+import fitz  # PyMuPDF
 from langchain_core.documents import Document
 from unstructured.partition.pdf import partition_pdf
 from unstructured.documents.elements import Table, NarrativeText
+from unstructured.staging.base import elements_to_dicts, elements_from_dicts
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.ingestion.report_cache import get_report_cache
+from src.utils.metrics import cache_lookup, span, timed
 
+# Each ingestion worker process runs its own partition pool, so by default
+# the cores are shared between them rather than oversubscribed.
+PDF_PARTITION_WORKERS = int(
+    os.getenv(
+        "PDF_PARTITION_WORKERS",
+        str(max(1, (os.cpu_count() or 1) // int(os.getenv("INGESTION_WORKERS", "2")))),
+    )
+)
+PDF_SHARD_PAGES = int(os.getenv("PDF_SHARD_PAGES", "10"))
+# "triage" sends only pages that need it through hi_res/OCR; "hi_res" sends every page.
+PDF_PARTITION_MODE = os.getenv("PDF_PARTITION_MODE", "triage")
+PDF_TRIAGE_MIN_CHARS = int(os.getenv("PDF_TRIAGE_MIN_CHARS", "200"))
+PDF_TRIAGE_MAX_IMAGE_COVERAGE = float(os.getenv("PDF_TRIAGE_MAX_IMAGE_COVERAGE", "0.5"))
 
-def load_and_chunk_pdfs(directory_path: str) -> list[Document]:
+# Triage routes and the unstructured strategy used for each.
+ROUTE_TEXT = "text"  # Embedded text layer, no tables: cheap pdfminer extraction.
+ROUTE_TABLE = "hi_res"  # Text layer with tables: layout model for table structure.
+ROUTE_OCR = "ocr"  # Scanned or image-dominated: layout model plus Tesseract.
+ROUTE_STRATEGIES = {ROUTE_TEXT: "fast", ROUTE_TABLE: "hi_res", ROUTE_OCR: "hi_res"}
+
+
+def classify_page(page) -> str:
+    """Decides which partitioning route a PyMuPDF page needs."""
+    text_chars = len(page.get_text("text").strip())
+    if text_chars < PDF_TRIAGE_MIN_CHARS:
+        return ROUTE_OCR
+
+    page_area = abs(page.rect) or 1.0
+    image_area = sum(abs(fitz.Rect(info["bbox"])) for info in page.get_image_info())
+    if image_area / page_area > PDF_TRIAGE_MAX_IMAGE_COVERAGE:
+        return ROUTE_OCR
+
+    if page.find_tables().tables:
+        return ROUTE_TABLE
+    return ROUTE_TEXT
+
+
+def _partition_variant(mode: str, shard_pages: int) -> str:
     """
-    Loads PDFs from a directory, applies a hierarchical chunking strategy,
-    and returns a list of processed Document chunks.
+    Names the cached partition of a report. Output depends on the mode, the
+    triage thresholds and the shard boundaries, so all of them are in the key.
+    """
+    params = json.dumps(
+        [mode, PDF_TRIAGE_MIN_CHARS, PDF_TRIAGE_MAX_IMAGE_COVERAGE, max(1, shard_pages)]
+    )
+    return f"{mode}-{hashlib.sha256(params.encode()).hexdigest()[:12]}"
+
+
+def _page_ranges(start: int, end: int, shard_pages: int) -> list[tuple[int, int]]:
+    """Splits [start, end) into consecutive page ranges of at most `shard_pages`."""
+    shard_pages = max(1, shard_pages)
+    return [
+        (first, min(first + shard_pages, end))
+        for first in range(start, end, shard_pages)
+    ]
+
+
+def _plan_shards(
+    file_path: str, mode: str, shard_pages: int
+) -> tuple[list[tuple[int, int, str]], dict[int, str]]:
     """
-    all_chunks = []
+    Returns the (start, end, strategy) shards for a PDF in page order, and the
+    route chosen for each 1-based page number.
+    """
+    with fitz.open(file_path) as pdf:
+        if mode == "triage":
+            routes = [classify_page(page) for page in pdf]
+        else:
+            routes = [ROUTE_TABLE] * pdf.page_count
+
+    # Group consecutive pages that share a route, then cap each run's size.
+    shards, run_start = [], 0
+    for index in range(1, len(routes) + 1):
+        if index == len(routes) or routes[index] != routes[run_start]:
+            strategy = ROUTE_STRATEGIES[routes[run_start]]
+            shards.extend(
+                (start, end, strategy)
+                for start, end in _page_ranges(run_start, index, shard_pages)
+            )
+            run_start = index
+
+    page_routes = {number + 1: route for number, route in enumerate(routes)}
+    return shards, page_routes
+
+
+def _partition_shard(file_path: str, start: int, end: int, strategy: str) -> list[dict]:
+    """
+    Partitions pages [start, end) of a PDF. May run in a worker process, so the
+    elements are returned in their serialized form.
+    """
+    with fitz.open(file_path) as source, fitz.open() as shard:
+        shard.insert_pdf(source, from_page=start, to_page=end - 1)
+        shard_bytes = shard.tobytes()
+
+    elements = partition_pdf(
+        file=io.BytesIO(shard_bytes),
+        strategy=strategy,
+        # Keep page numbers and file metadata as if the whole PDF were parsed.
+        starting_page_number=start + 1,
+        metadata_filename=file_path,
+    )
+    return elements_to_dicts(elements)
+
+
+@timed("chunk")
+def _elements_to_chunks(
+    elements,
+    filename: str,
+    text_splitter: RecursiveCharacterTextSplitter,
+    page_routes: dict[int, str] | None = None,
+) -> list[Document]:
+    page_routes = page_routes or {}
+
+    def element_metadata(element) -> dict:
+        metadata = element.metadata.to_dict()
+        metadata["source_file"] = filename
+        route = page_routes.get(metadata.get("page_number"))
+        if route:
+            # Records which partitioning path produced the chunk, for auditing.
+            metadata["partition_route"] = route
+        return metadata
+
+    chunks = []
+    for element in elements:
+        if isinstance(element, Table):
+            # Treat entire tables as single chunks
+            table_html = getattr(element, "text_as_html", None) or ""
+            if table_html:
+                table_md = f"Table:\n\n{element.text}\n\n"
+                metadata = element_metadata(element)
+                chunks.append(Document(page_content=table_md, metadata=metadata))
+        elif isinstance(element, NarrativeText):
+            # Chunk the normal text paragraphs
+            metadata = element_metadata(element)
+            split_chunks = text_splitter.create_documents(
+                [element.text], metadatas=[metadata]
+            )
+            chunks.extend(split_chunks)
+    return chunks
+
+
+def _iter_shard_dicts(executor, file_path: str, shards, window: int) -> Iterator:
+    """
+    Yields serialized elements shard by shard in page order, keeping at most
+    `window` shards in flight so finished-but-unconsumed results stay bounded.
+    """
+    if executor is None:
+        for shard in shards:
+            with span("partition"):
+                shard_dicts = _partition_shard(file_path, *shard)
+            yield shard_dicts
+        return
+
+    pending, remaining = deque(), iter(shards)
+    try:
+        for shard in islice(remaining, window):
+            pending.append(executor.submit(_partition_shard, file_path, *shard))
+        while pending:
+            # Shards partition in parallel, so this times the wait for each one.
+            with span("partition"):
+                shard_dicts = pending.popleft().result()
+            for shard in islice(remaining, 1):
+                pending.append(executor.submit(_partition_shard, file_path, *shard))
+            yield shard_dicts
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _iter_file_chunks(
+    executor,
+    file_path: str,
+    filename: str,
+    text_splitter: RecursiveCharacterTextSplitter,
+    mode: str,
+    shard_pages: int,
+    window: int,
+    stop_requested=None,
+) -> Iterator[Document]:
+    """
+    Streams one PDF's chunks. Partition output is cached by the PDF's content
+    hash and the partition settings, so a previously seen file skips
+    partitioning entirely. If `stop_requested()` turns true between shards,
+    the partial partition is discarded and the file ends early.
+    """
+    cache = get_report_cache()
+    digest = cache.put_report(file_path)
+    variant = _partition_variant(mode, shard_pages)
+
+    cached = cache.read_partition(digest, variant)
+    cache_lookup("report_partitions", cached is not None)
+    if cached is not None:
+        header = next(cached)
+        page_routes = {int(page): route for page, route in header["page_routes"].items()}
+        for record in cached:
+            yield from _elements_to_chunks(
+                elements_from_dicts(record["elements"]), filename, text_splitter, page_routes
+            )
+        print(f"Loaded cached partition for {filename} ({digest[:12]}).")
+        return
+
+    shards, page_routes = _plan_shards(file_path, mode, shard_pages)
+    writer = cache.write_partition(digest, variant)
+    try:
+        writer.write({"page_routes": page_routes})
+        for shard_dicts in _iter_shard_dicts(executor, file_path, shards, window):
+            if stop_requested and stop_requested():
+                print(f"Stopped partitioning {filename}: a stop was requested.")
+                writer.abort()
+                return
+            writer.write({"elements": shard_dicts})
+            yield from _elements_to_chunks(
+                elements_from_dicts(shard_dicts), filename, text_splitter, page_routes
+            )
+    except BaseException:
+        writer.abort()
+        raise
+    writer.commit()
+
+    route_counts = Counter(page_routes.values())
+    print(
+        f"Successfully processed and chunked {filename} "
+        f"({len(shards)} shards, pages by route: {dict(route_counts)})"
+    )
+
+
+def iter_pdf_chunks(
+    directory_path: str,
+    workers: int | None = None,
+    shard_pages: int | None = None,
+    mode: str | None = None,
+    stop_requested=None,
+) -> Iterator[Document]:
+    """
+    Streams Document chunks from the PDFs in a directory as each page shard
+    finishes partitioning, in page order. `stop_requested`, if given, is
+    polled per shard; once it returns True no further shards or files are read.
+
+    Each PDF is split into shards of up to `shard_pages` pages that are
+    partitioned across `workers` processes. In "triage" mode, pages with a
+    usable text layer and no tables skip hi_res/OCR; every chunk records the
+    route its page took in `partition_route`. If a shard fails, the rest of
+    that file is skipped.
+    """
+    workers = workers or PDF_PARTITION_WORKERS
+    shard_pages = shard_pages or PDF_SHARD_PAGES
+    mode = mode or PDF_PARTITION_MODE
     print(f"Loading and chunking documents from: {directory_path}")
 
     if not os.path.isdir(directory_path):
         print(f"Error: Directory '{directory_path}' not found.")
-        return all_chunks
+        return
 
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100)
+    filenames = [f for f in os.listdir(directory_path) if f.lower().endswith(".pdf")]
 
-    for filename in os.listdir(directory_path):
-        if filename.lower().endswith(".pdf"):
+    # 'spawn', because this runs in a pipeline thread of an ingestion worker that
+    # already has other threads (embedding, Chroma); forking it could copy held locks.
+    executor = (
+        ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        if workers > 1
+        else None
+    )
+    try:
+        for filename in filenames:
+            if stop_requested and stop_requested():
+                return
             file_path = os.path.join(directory_path, filename)
             try:
-                # Use unstructured to partition the PDF into elements
-                elements = partition_pdf(filename=file_path, strategy="hi_res")
-
-                for element in elements:
-                    if isinstance(element, Table):
-                        # Treat entire tables as single chunks
-                        table_html = getattr(element, "text_as_html", None) or ""
-                        if table_html:
-                            table_md = f"Table:\n\n{element.text}\n\n"
-                            metadata = element.metadata.to_dict()
-                            metadata["source_file"] = filename
-                            all_chunks.append(
-                                Document(page_content=table_md, metadata=metadata)
-                            )
-                    elif isinstance(element, NarrativeText):
-                        # Chunk the normal text paragraphs
-                        metadata = element.metadata.to_dict()
-                        metadata["source_file"] = filename
-                        split_chunks = text_splitter.create_documents(
-                            [element.text], metadatas=[metadata]
-                        )
-                        all_chunks.extend(split_chunks)
-
-                print(f"Successfully processed and chunked {filename}")
+                yield from _iter_file_chunks(
+                    executor,
+                    file_path,
+                    filename,
+                    text_splitter,
+                    mode,
+                    shard_pages,
+                    window=2 * workers,
+                    stop_requested=stop_requested,
+                )
             except Exception as e:
                 print(f"Error processing file {filename}: {e}")
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
 
-    return all_chunks
+def load_and_chunk_pdfs(
+    directory_path: str,
+    workers: int | None = None,
+    shard_pages: int | None = None,
+    mode: str | None = None,
+) -> list[Document]:
+    """
+    Loads PDFs from a directory, applies a hierarchical chunking strategy,
+    and returns a list of processed Document chunks. See `iter_pdf_chunks`.
+    """
+    return list(iter_pdf_chunks(directory_path, workers, shard_pages, mode))
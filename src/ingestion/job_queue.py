@@ -0,0 +1,236 @@
+# src/ingestion/job_queue.py
+
+import os
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.database_handler import (
+    claim_next_ingestion_job,
+    enqueue_ingestion_job,
+    finish_ingestion_job,
+    get_company_status,
+    is_ingestion_job_cancel_requested,
+    mark_company_as_cancelled,
+    mark_company_as_failed,
+    notify_progress,
+    notify_status_change,
+    requeue_interrupted_ingestion_jobs,
+    update_ingestion_job_progress,
+)
+from src.utils.metrics import (
+    current_trace_id,
+    get_metrics_registry,
+    span,
+    use_trace,
+)
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+MAX_CONCURRENT_INGESTIONS = int(
+    os.getenv("MAX_CONCURRENT_INGESTIONS", str(INGESTION_WORKERS))
+)
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", "2"))
+
+# Ingestions triggered by a user's query jump ahead of scheduled ones.
+QUERY_INGESTION_PRIORITY = 10
+
+# Set in each worker process: a queue carrying progress back to the web process.
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def run_ingestion_job(
+    job_id: int, ticker: str, company_name: str, trace_id: str | None = None
+) -> tuple[str, dict]:
+    """
+    Entry point executed inside a worker process. Runs the job's stages under
+    `trace_id` and returns the ticker's final status together with the metrics
+    recorded meanwhile, which the web process merges into its own.
+    """
+    with use_trace(trace_id), span("ingestion"):
+        status = _run_ingestion(job_id, ticker, company_name)
+    return status, get_metrics_registry().drain()
+
+
+def _run_ingestion(job_id: int, ticker: str, company_name: str) -> str:
+    # Imported here so the web process never loads the parsing/embedding stack.
+    from src.ingestion.orchestrator import (
+        IngestionCancelled,
+        process_company_data_background,
+    )
+
+    def report_progress(stage: str, progress: float):
+        cancel_requested = update_ingestion_job_progress(job_id, stage, progress)
+        if _progress_queue is not None:
+            _progress_queue.put((ticker, stage, progress))
+        if cancel_requested:
+            raise IngestionCancelled(f"Ingestion for {ticker} was cancelled.")
+
+    def cancel_requested() -> bool:
+        return is_ingestion_job_cancel_requested(job_id)
+
+    try:
+        process_company_data_background(
+            ticker, company_name, report_progress, cancel_requested
+        )
+    except IngestionCancelled:
+        mark_company_as_cancelled(ticker)
+        finish_ingestion_job(job_id, "cancelled")
+        return "cancelled"
+    except Exception as e:
+        mark_company_as_failed(ticker)
+        finish_ingestion_job(job_id, "failed", str(e))
+        return "failed"
+
+    status = get_company_status(ticker)
+    finish_ingestion_job(job_id, "succeeded" if status == "indexed" else "failed")
+    return status
+
+
+class IngestionWorkerPool:
+    """
+    Drains the `ingestion_jobs` table into a pool of worker processes so that
+    PDF parsing and embedding never compete with the web process for the GIL.
+    """
+
+    def __init__(
+        self,
+        workers: int = INGESTION_WORKERS,
+        max_concurrent: int = MAX_CONCURRENT_INGESTIONS,
+        poll_interval: float = INGESTION_POLL_INTERVAL,
+    ):
+        self.workers = max(1, workers)
+        self.max_concurrent = max(1, min(max_concurrent, self.workers))
+        self.poll_interval = poll_interval
+        self._executor = None
+        self._dispatcher = None
+        self._progress_queue = None
+        self._progress_forwarder = None
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        requeued = requeue_interrupted_ingestion_jobs()
+        if requeued:
+            print(f"Re-queued {requeued} interrupted ingestion job(s).")
+        # 'spawn' keeps workers from inheriting the server's threads and sockets.
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,),
+        )
+        self._stopped.clear()
+        self._progress_forwarder = threading.Thread(
+            target=self._forward_progress, name="ingestion-progress", daemon=True
+        )
+        self._progress_forwarder.start()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name="ingestion-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+        print(
+            f"Ingestion pool started with {self.workers} worker(s), "
+            f"max {self.max_concurrent} concurrent."
+        )
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        if self._progress_forwarder is not None:
+            self._progress_queue.put(None)
+            self._progress_forwarder.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, ticker: str, company_name: str, priority: int = 0) -> int:
+        job_id = enqueue_ingestion_job(
+            ticker, company_name, priority, current_trace_id()
+        )
+        self._wake.set()
+        return job_id
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def _dispatch_loop(self):
+        while not self._stopped.is_set():
+            while self._has_free_slot():
+                try:
+                    job = claim_next_ingestion_job()
+                except Exception as e:
+                    print(f"Failed to claim ingestion job: {e}")
+                    job = None
+                if not job:
+                    break
+                self._launch(job)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _forward_progress(self):
+        """Replays workers' progress reports to listeners in this process."""
+        while True:
+            try:
+                item = self._progress_queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            notify_progress(*item)
+
+    def _has_free_slot(self) -> bool:
+        with self._lock:
+            return self._running < self.max_concurrent
+
+    def _launch(self, job: dict):
+        with self._lock:
+            self._running += 1
+        print(f"Dispatching ingestion job {job['id']} for {job['ticker']}.")
+        future = self._executor.submit(
+            run_ingestion_job,
+            job["id"],
+            job["ticker"],
+            job["company_name"],
+            job["trace_id"],
+        )
+        future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+    def _on_done(self, job: dict, future):
+        with self._lock:
+            self._running -= 1
+        try:
+            status, worker_metrics = future.result()
+        except Exception as e:
+            # The worker process itself died (e.g. out of memory during OCR).
+            print(f"Ingestion job {job['id']} for {job['ticker']} crashed: {e}")
+            finish_ingestion_job(job["id"], "failed", str(e))
+            mark_company_as_failed(job["ticker"])
+        else:
+            get_metrics_registry().merge(worker_metrics)
+            # Listeners registered in this process (e.g. chain caches) never saw
+            # the worker's database writes, so replay the final state change here.
+            notify_status_change(job["ticker"], status)
+        self._wake.set()
+
+
+_pool = None
+
+
+def get_ingestion_pool() -> IngestionWorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = IngestionWorkerPool()
+    return _pool
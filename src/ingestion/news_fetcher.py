@@ -1,13 +1,18 @@
 # src/ingestion/news_fetcher.py
 
 import os
-from tavily import TavilyClient
+from tavily import TavilyClient, AsyncTavilyClient
 from dotenv import load_dotenv
 from langchain_core.documents import Document
+from src.utils.response_cache import get_response_cache
+from src.utils.metrics import timed
 
 load_dotenv()
 
+NEWS_ENDPOINT = "tavily_news"
 
+
+@timed("news_fetch")
 def fetch_company_news(company_name: str, max_results: int = 5) -> list[Document]:
     try:
         tavily_api_key = os.getenv("TAVILY_API_KEY")
@@ -17,20 +22,66 @@ def fetch_company_news(company_name: str, max_results: int = 5) -> list[Document
         client = TavilyClient(api_key=tavily_api_key)
         search_query = f"latest financial news and analysis for {company_name}"
 
-        response = client.search(
-            query=search_query,
-            search_depth="advanced",
-            max_results=max_results,
+        def search():
+            response = client.search(
+                query=search_query,
+                search_depth="advanced",
+                max_results=max_results,
+            )
+            return _news_results(response)
+
+        results = get_response_cache().get_or_fetch(
+            NEWS_ENDPOINT, f"{search_query} max={max_results}", search
         )
+        return _to_news_documents(results)
+    except Exception as e:
+        print(f"An error occurred while fetching news: {e}")
+        return []
 
-        news_documents = [
-            Document(
-                page_content=result["content"],
-                metadata={"url": result["url"], "title": result["title"]},
+
+@timed("news_fetch")
+async def afetch_company_news(
+    company_name: str, max_results: int = 5
+) -> list[Document]:
+    """Async variant of `fetch_company_news` for use on the request path."""
+    try:
+        tavily_api_key = os.getenv("TAVILY_API_KEY")
+        if not tavily_api_key:
+            raise ValueError("Tavily API key not found in environment variables.")
+
+        client = AsyncTavilyClient(api_key=tavily_api_key)
+        search_query = f"latest financial news and analysis for {company_name}"
+
+        async def search():
+            response = await client.search(
+                query=search_query,
+                search_depth="advanced",
+                max_results=max_results,
             )
-            for result in response["results"]
-        ]
-        return news_documents
+            return _news_results(response)
+
+        results = await get_response_cache().aget_or_fetch(
+            NEWS_ENDPOINT, f"{search_query} max={max_results}", search
+        )
+        return _to_news_documents(results)
     except Exception as e:
         print(f"An error occurred while fetching news: {e}")
         return []
+
+
+def _news_results(response: dict) -> list[dict]:
+    """Keeps only the fields we use, so cached responses stay small."""
+    return [
+        {"url": r["url"], "title": r["title"], "content": r["content"]}
+        for r in response["results"]
+    ]
+
+
+def _to_news_documents(results: list[dict]) -> list[Document]:
+    return [
+        Document(
+            page_content=result["content"],
+            metadata={"url": result["url"], "title": result["title"]},
+        )
+        for result in results
+    ]
@@ -1,54 +1,132 @@
 # src/ingestion/orchestrator.py
 import os
 import shutil
+import contextlib
 from src.ingestion.report_fetcher import find_and_download_report
-from src.ingestion.document_loader import load_and_chunk_pdfs
+from src.ingestion.document_loader import iter_pdf_chunks
 from src.ingestion.news_fetcher import fetch_company_news
 from src.ingestion.stock_data_fetcher import get_company_overview
 
 # CHANGED: Import the new 'mark_company_as_failed' function
 from src.utils.database_handler import mark_company_as_indexed, mark_company_as_failed
-from src.core.processing import create_and_store_embeddings
+from src.core.processing import CollectionSync, batch_chunks, embed_batches
+from src.ingestion.pipeline import run_pipeline
+from src.ingestion.dedupe import ChunkDeduplicator
+from src.utils.metrics import span
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
-def process_company_data_background(ticker: str, company_name: str):
+class IngestionCancelled(Exception):
+    """Raised by a progress callback to stop an ingestion between stages."""
+
+
+def process_company_data_background(
+    ticker: str, company_name: str, report_progress=None, cancel_requested=None
+):
+    """
+    Runs the full ingestion for a ticker. `report_progress(stage, progress)` is
+    called at each stage boundary and may raise IngestionCancelled to stop early.
+    `cancel_requested()` is polled per page shard and per embedded batch, so a
+    cancel also stops partitioning and embedding midway.
+    """
+
+    def progress(stage: str, fraction: float):
+        if report_progress:
+            report_progress(stage, fraction)
+
+    def checkpoint():
+        if cancel_requested and cancel_requested():
+            raise IngestionCancelled(f"Ingestion for {ticker} was cancelled.")
+
     print(f"BACKGROUND TASK: Starting ingestion for {ticker}.")
-    report_dir = None
+    downloaded_dirs = []
     try:
-        all_chunks = []
+        news_chunks = []
         stock_overview = {}
 
         # --- Step 1: Fetch Fast, Live Data ---
+        progress("news", 0.05)
         news_docs = fetch_company_news(company_name)
         if news_docs:
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=1024, chunk_overlap=100
             )
-            news_chunks = text_splitter.split_documents(news_docs)
-            all_chunks.extend(news_chunks)
+            with span("chunk"):
+                news_chunks = text_splitter.split_documents(news_docs)
 
+        progress("overview", 0.1)
         stock_overview = get_company_overview(ticker) or get_company_overview(
             f"{ticker}.BSE"
         )
 
-        # --- Step 2: Fetch Slow, Document Data ---
-        report_dir = find_and_download_report(company_name, ticker)
-        if report_dir:
-            pdf_chunks = load_and_chunk_pdfs(report_dir)
-            all_chunks.extend(pdf_chunks)
+        # --- Step 2: Stream Document Data into the Vector Store ---
+        # download -> partition/chunk -> batch -> embed -> upsert, each stage in
+        # its own thread with bounded queues between them, so memory stays flat
+        # and news chunks are embedded while the report is still downloading.
+        def download_stage():
+            progress("report_download", 0.15)
+            report_dir = find_and_download_report(company_name, ticker)
+            if report_dir:
+                downloaded_dirs.append(report_dir)
+                yield report_dir
 
-        if not all_chunks:
+        def chunk_stage(report_dirs):
+            yield from news_chunks
+            for report_dir in report_dirs:
+                progress("partition", 0.3)
+                yield from iter_pdf_chunks(report_dir, stop_requested=cancel_requested)
+
+        # Page furniture and near-duplicate chunks are dropped, and unchanged
+        # chunks are skipped, before embedding, so a refresh only pays for
+        # distinct content that changed.
+        dedupe = ChunkDeduplicator()
+        sync = CollectionSync(ticker)
+        embedded_batches = run_pipeline(
+            download_stage(),
+            [
+                chunk_stage,
+                dedupe.filter,
+                batch_chunks,
+                sync.skip_unchanged,
+                embed_batches,
+            ],
+        )
+        # Closing the pipeline on the way out stops every stage promptly.
+        with contextlib.closing(embedded_batches):
+            for _ in sync.upsert(embedded_batches):
+                checkpoint()
+
+        # Last chance to cancel: past this point the ticker is marked indexed.
+        progress("finalizing", 0.95)
+        if not sync.seen_ids:
             raise ValueError("Failed to gather any processable text data.")
 
-        create_and_store_embeddings(ticker, all_chunks)
+        removed = sync.sweep()
+        print(
+            f"Deduplicated {dedupe.chunks_in} chunks for {ticker}: {dedupe.removed} "
+            f"removed ({dedupe.exact_duplicates} exact, {dedupe.near_duplicates} near "
+            f"duplicates, {dedupe.boilerplate_chunks} boilerplate-only; "
+            f"{dedupe.boilerplate_lines} furniture lines stripped)."
+        )
+        print(
+            f"Synced {len(sync.seen_ids)} chunks for {ticker}: {sync.stored} new, "
+            f"{sync.skipped} unchanged, {removed} removed."
+        )
         mark_company_as_indexed(ticker, stock_overview)
+        try:
+            progress("done", 1.0)
+        except IngestionCancelled:
+            pass  # The cancel arrived after the data was already committed.
         print(f"BACKGROUND TASK: Successfully finished ingestion for {ticker}.")
 
+    except IngestionCancelled:
+        print(f"BACKGROUND TASK CANCELLED for {ticker}.")
+        raise
     except Exception as e:
         # NEW: Catch any exception and mark the task as failed
         print(f"BACKGROUND TASK FAILED for {ticker}. Error: {e}")
         mark_company_as_failed(ticker)
     finally:
-        if report_dir and os.path.exists(report_dir):
-            shutil.rmtree(report_dir)
+        for report_dir in downloaded_dirs:
+            if os.path.exists(report_dir):
+                shutil.rmtree(report_dir)
@@ -0,0 +1,98 @@
+# src/ingestion/pipeline.py
+
+import os
+import queue
+import contextvars
+import threading
+from typing import Callable, Iterable, Iterator
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+_END = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: list[Callable[[Iterator], Iterator]],
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> Iterator:
+    """
+    Chains generator stages, each running in its own thread, with a bounded
+    queue between every pair. A slow stage applies backpressure upstream, so
+    at most `queue_size` items per hop are ever held in memory.
+
+    Each stage is a function that takes an iterator and yields results. The
+    returned iterator yields the last stage's output; an exception raised in
+    any stage is re-raised from it, and abandoning it stops every stage.
+    """
+    stop = threading.Event()
+
+    def put(q: queue.Queue, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Cancelled()
+
+    def drain(q: queue.Queue) -> Iterator:
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    raise _Cancelled()
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+
+    def run_stage(produce: Callable[[], Iterator], outbox: queue.Queue):
+        try:
+            for item in produce():
+                put(outbox, item)
+            put(outbox, _END)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            try:
+                put(outbox, _StageError(e))
+            except _Cancelled:
+                pass
+
+    def stage_thread(produce: Callable[[], Iterator], outbox: queue.Queue):
+        # Stages see the caller's context variables (e.g. the current trace).
+        return threading.Thread(
+            target=contextvars.copy_context().run, args=(run_stage, produce, outbox)
+        )
+
+    threads = []
+    outbox = queue.Queue(maxsize=queue_size)
+    threads.append(stage_thread(lambda: iter(source), outbox))
+    for stage in stages:
+        inbox, outbox = outbox, queue.Queue(maxsize=queue_size)
+        produce = lambda stage=stage, inbox=inbox: stage(drain(inbox))
+        threads.append(stage_thread(produce, outbox))
+
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        yield from drain(outbox)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
@@ -0,0 +1,209 @@
+# src/ingestion/report_cache.py
+
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import Iterator
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "data/report_cache")
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(2 * 1024**3)))
+# How long a report URL is trusted to still serve the same file.
+REPORT_URL_TTL = float(os.getenv("REPORT_URL_TTL", str(24 * 3600)))
+
+REPORT_FILENAME = "report.pdf"
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ReportCache:
+    """
+    A content-addressed, size-capped store for downloaded reports and their
+    partitioned elements, keyed by the SHA-256 of the PDF bytes.
+
+    Entries live in `<root>/objects/<sha>/` and are evicted least-recently-used
+    first (by directory mtime, which every read refreshes) once the store
+    exceeds `max_bytes`. The files are plain and written atomically, so several
+    worker processes can share one store.
+    """
+
+    def __init__(self, root: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    # --- Layout ---
+
+    def _entry_dir(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest)
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(
+            self.root, "urls", hashlib.sha256(url.encode()).hexdigest()
+        )
+
+    def _partition_path(self, digest: str, variant: str) -> str:
+        return os.path.join(self._entry_dir(digest), f"partition-{variant}.jsonl.gz")
+
+    def _touch(self, digest: str):
+        try:
+            os.utime(self._entry_dir(digest))
+        except OSError:
+            pass
+
+    # --- Raw reports ---
+
+    def put_report(self, path: str) -> str:
+        """Adds a PDF to the store and returns its content hash."""
+        digest = hash_file(path)
+        target = os.path.join(self._entry_dir(digest), REPORT_FILENAME)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+            self.evict()
+        self._touch(digest)
+        return digest
+
+    def get_report(self, digest: str) -> str | None:
+        path = os.path.join(self._entry_dir(digest), REPORT_FILENAME)
+        if os.path.exists(path):
+            self._touch(digest)
+            return path
+        return None
+
+    def remember_url(self, url: str, digest: str):
+        _atomic_write(self._url_path(url), digest.encode())
+
+    def lookup_url(self, url: str) -> str | None:
+        """Returns the content hash last downloaded from `url`, if still fresh."""
+        path = self._url_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > REPORT_URL_TTL:
+                return None
+            with open(path) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def materialize(self, digest: str, destination: str) -> bool:
+        """Links (or copies) a cached report to `destination`."""
+        source = self.get_report(digest)
+        if not source:
+            return False
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+        return True
+
+    # --- Partitioned elements ---
+
+    def read_partition(self, digest: str, variant: str) -> Iterator[dict] | None:
+        """
+        Returns an iterator over a cached partition's records, or None on a miss.
+        The first record is the header passed to `write_partition`.
+        """
+        path = self._partition_path(digest, variant)
+        if not os.path.exists(path):
+            return None
+        self._touch(digest)
+
+        def records():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+        return records()
+
+    def write_partition(self, digest: str, variant: str) -> "PartitionWriter":
+        return PartitionWriter(self, digest, variant)
+
+    # --- Eviction ---
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        objects_dir = os.path.join(self.root, "objects")
+        if not os.path.isdir(objects_dir):
+            return []
+        entries = []
+        for digest in os.listdir(objects_dir):
+            entry_dir = os.path.join(objects_dir, digest)
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, name))
+                    for name in os.listdir(entry_dir)
+                )
+                entries.append((os.path.getmtime(entry_dir), entry_dir, size))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, entry_dir, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            print(f"Evicted cached report {os.path.basename(entry_dir)[:12]}.")
+
+
+class PartitionWriter:
+    """Streams partition records to a temp file and publishes it on commit."""
+
+    def __init__(self, cache: ReportCache, digest: str, variant: str):
+        self.cache = cache
+        self.digest = digest
+        self.path = cache._partition_path(digest, variant)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record) + "\n")
+
+    def commit(self):
+        self._file.close()
+        try:
+            os.replace(self._tmp_path, self.path)
+        except OSError as e:
+            # The entry was evicted while we were writing; the cache is best-effort.
+            print(f"Could not cache partition for {self.digest[:12]}: {e}")
+            return
+        self.cache.evict()
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    global _cache
+    if _cache is None:
+        _cache = ReportCache()
+    return _cache
@@ -5,10 +5,14 @@ import requests
 import shutil
 from tavily import TavilyClient
 from dotenv import load_dotenv
+from src.ingestion.report_cache import get_report_cache
+from src.utils.response_cache import get_response_cache
+from src.utils.metrics import cache_lookup, record_api_error, span
 
 load_dotenv()
 
 TEMP_STORAGE_PATH = "data/TEMP"
+REPORT_SEARCH_ENDPOINT = "tavily_report_search"
 
 
 def find_and_download_report(company_name: str, ticker: str) -> str | None:
@@ -35,16 +39,23 @@ def find_and_download_report(company_name: str, ticker: str) -> str | None:
             f'"{company_name}" investor relations latest quarterly report filetype:pdf'
         )
 
-        response = client.search(
-            query=query,
-            search_depth="advanced",
-            max_results=5,  # Check the top 5 results
-        )
+        def search():
+            response = client.search(
+                query=query,
+                search_depth="advanced",
+                max_results=5,  # Check the top 5 results
+            )
+            return [result.get("url", "") for result in response.get("results", [])]
+
+        with span("report_search"):
+            result_urls = get_response_cache().get_or_fetch(
+                REPORT_SEARCH_ENDPOINT, query, search
+            )
 
         pdf_url = None
-        for result in response.get("results", []):
-            if result.get("url", "").lower().endswith(".pdf"):
-                pdf_url = result["url"]
+        for url in result_urls:
+            if url.lower().endswith(".pdf"):
+                pdf_url = url
                 break
 
         if not pdf_url:
@@ -54,13 +65,6 @@ def find_and_download_report(company_name: str, ticker: str) -> str | None:
             return None
 
         print(f"Found report URL: {pdf_url}")
-        print("Downloading report...")
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        pdf_response = requests.get(pdf_url, headers=headers, stream=True, timeout=30)
-        pdf_response.raise_for_status()
 
         report_dir = os.path.join(TEMP_STORAGE_PATH, ticker)
         if os.path.exists(report_dir):
@@ -69,10 +73,35 @@ def find_and_download_report(company_name: str, ticker: str) -> str | None:
 
         file_path = os.path.join(report_dir, "downloaded_report.pdf")
 
-        with open(file_path, "wb") as f:
-            for chunk in pdf_response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Reuse a recent download of the same URL (e.g. X and X.BSE) if cached.
+        cache = get_report_cache()
+        cached_digest = cache.lookup_url(pdf_url)
+        if cached_digest and cache.materialize(cached_digest, file_path):
+            cache_lookup("report_downloads", True)
+            print(f"Using cached report {cached_digest[:12]} for {pdf_url}")
+            return report_dir
+        cache_lookup("report_downloads", False)
+
+        print("Downloading report...")
 
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+        with span("report_download"):
+            try:
+                pdf_response = requests.get(
+                    pdf_url, headers=headers, stream=True, timeout=30
+                )
+                pdf_response.raise_for_status()
+
+                with open(file_path, "wb") as f:
+                    for chunk in pdf_response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+            except Exception as e:
+                record_api_error("report_download", e)
+                raise
+
+        cache.remember_url(pdf_url, cache.put_report(file_path))
         print(f"Report successfully downloaded to: {file_path}")
         return report_dir
 
@@ -1,13 +1,20 @@
 # src/ingestion/stock_data_fetcher.py
 
 import os
+import httpx
 from alpha_vantage.fundamentaldata import FundamentalData
 from alpha_vantage.timeseries import TimeSeries
 from dotenv import load_dotenv
+from src.utils.response_cache import get_response_cache
+from src.utils.metrics import timed
 
 load_dotenv()
 
+ALPHA_VANTAGE_QUERY_URL = "https://www.alphavantage.co/query"
+OVERVIEW_ENDPOINT = "alpha_vantage_overview"
 
+
+@timed("overview_fetch")
 def get_company_overview(symbol: str) -> dict:
     try:
         alpha_vantage_key = os.getenv("ALPHA_VANTAGE_API_KEY")
@@ -15,8 +22,46 @@ def get_company_overview(symbol: str) -> dict:
             raise ValueError("Alpha Vantage API key not found.")
 
         fd = FundamentalData(key=alpha_vantage_key, output_format="json")
-        overview, _ = fd.get_company_overview(symbol=symbol)
-        return overview
+
+        def fetch():
+            overview, _ = fd.get_company_overview(symbol=symbol)
+            return overview
+
+        return get_response_cache().get_or_fetch(OVERVIEW_ENDPOINT, symbol, fetch)
+    except Exception as e:
+        print(f"An error occurred fetching company overview for {symbol}: {e}")
+        return {}
+
+
+@timed("overview_fetch")
+async def aget_company_overview(symbol: str) -> dict:
+    """
+    Async variant of `get_company_overview`. Calls the OVERVIEW endpoint directly
+    so the request path doesn't block on the synchronous alpha_vantage client.
+    """
+    try:
+        alpha_vantage_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+        if not alpha_vantage_key:
+            raise ValueError("Alpha Vantage API key not found.")
+
+        params = {"function": "OVERVIEW", "symbol": symbol, "apikey": alpha_vantage_key}
+
+        async def fetch():
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(ALPHA_VANTAGE_QUERY_URL, params=params)
+            response.raise_for_status()
+            overview = response.json()
+
+            # Mirror the alpha_vantage client, which raises on these error payloads
+            # (and keeps rate-limit notes out of the response cache).
+            for key in ("Error Message", "Information", "Note"):
+                if key in overview:
+                    raise ValueError(overview[key])
+            return overview
+
+        return await get_response_cache().aget_or_fetch(
+            OVERVIEW_ENDPOINT, symbol, fetch
+        )
     except Exception as e:
         print(f"An error occurred fetching company overview for {symbol}: {e}")
         return {}
@@ -1,28 +1,131 @@
 # src/main.py
 
-from fastapi import FastAPI, BackgroundTasks
+import os
+import json
+import time
+import asyncio
+import importlib
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from typing import Optional
 
 from src.utils.database_handler import (
     get_company_status,
+    get_company_statuses,
+    mark_companies_as_processing,
+    get_cached_stock_overview,
+    get_latest_ingestion_job,
     mark_company_as_processing,
     initialize_database,
+    mark_company_as_cancelled,
+    request_ingestion_job_cancel,
 )
-from src.ingestion.orchestrator import process_company_data_background
-from src.ingestion.news_fetcher import fetch_company_news
-from src.ingestion.stock_data_fetcher import get_company_overview
-from src.core.qa_agent import create_persistent_rag_chain, create_live_rag_chain
-from src.utils.ticker_checker import find_best_ticker_match
+from src.ingestion.job_queue import get_ingestion_pool, QUERY_INGESTION_PRIORITY
+from src.utils.ticker_index import get_ticker_index
+from src.utils.response_cache import get_response_cache
+from src.utils.ticker_events import TERMINAL_STATUSES, get_ticker_event_hub
+from src.utils.metrics import (
+    METRICS_ENABLED,
+    PROMETHEUS_CONTENT_TYPE,
+    format_traceparent,
+    observe_request,
+    parse_traceparent,
+    render_metrics,
+    use_trace,
+)
+
+# Idle subscribers get a comment line this often so proxies keep the stream open.
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+BATCH_QUERY_CONCURRENCY = int(os.getenv("BATCH_QUERY_CONCURRENCY", "8"))
+BATCH_QUERY_MAX_ITEMS = int(os.getenv("BATCH_QUERY_MAX_ITEMS", "200"))
+COMPARE_MAX_COMPANIES = int(os.getenv("COMPARE_MAX_COMPANIES", "5"))
+
+
+def _lazy(module: str, name: str):
+    """
+    Stands in for `from module import name`, importing the module on first
+    call. Keeps LangChain, Chroma, the LLM client and the data-provider SDKs
+    out of the import of this module, so the server accepts connections
+    before they are loaded.
+    """
+
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    call.__name__ = name
+    return call
+
+
+QA_AGENT = "src.core.qa_agent"
+create_persistent_rag_chain = _lazy(QA_AGENT, "create_persistent_rag_chain")
+create_live_rag_chain = _lazy(QA_AGENT, "create_live_rag_chain")
+get_rag_chain_cache_stats = _lazy(QA_AGENT, "get_rag_chain_cache_stats")
+retrieve_by_vectors = _lazy(QA_AGENT, "retrieve_by_vectors")
+abatch_answers = _lazy(QA_AGENT, "abatch_answers")
+retrieve_indexed = _lazy(QA_AGENT, "retrieve_indexed")
+retrieve_live = _lazy(QA_AGENT, "retrieve_live")
+acompare_companies = _lazy(QA_AGENT, "acompare_companies")
+afetch_company_news = _lazy("src.ingestion.news_fetcher", "afetch_company_news")
+aget_company_overview = _lazy(
+    "src.ingestion.stock_data_fetcher", "aget_company_overview"
+)
+afind_best_ticker_match = _lazy(
+    "src.utils.ticker_checker", "afind_best_ticker_match"
+)
+get_embedding_service = _lazy("src.core.embeddings", "get_embedding_service")
+get_prompt_stats = _lazy("src.core.context", "get_prompt_stats")
+get_answer_cache = _lazy("src.core.answer_cache", "get_answer_cache")
+
+
+def _warm_chroma():
+    from src.core.processing import get_chroma_client
+
+    get_chroma_client().heartbeat()
+
+
+# Warmed in order after startup; GET /ready reports 503 until all have finished.
+STARTUP_STAGES = (
+    ("ticker_index", get_ticker_index),
+    ("query_stack", lambda: importlib.import_module(QA_AGENT)),
+    ("embedding_model", lambda: get_embedding_service().warmup()),
+    ("chroma", _warm_chroma),
+)
+# Stage name -> seconds it took, once finished.
+_startup_stages = {}
+_startup_error = None
+
+
+async def _warm_up():
+    """Loads models and clients in the background so the first query doesn't pay."""
+    global _startup_error
+    for stage, step in STARTUP_STAGES:
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(step)
+        except Exception as e:
+            _startup_error = f"{stage}: {e}"
+            print(f"Startup stage '{stage}' failed: {e}")
+            return
+        _startup_stages[stage] = round(time.perf_counter() - start, 3)
+        print(f"Startup stage '{stage}' ready in {_startup_stages[stage]:.2f}s.")
+    print("Application is ready.")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Application starting up...")
     initialize_database()
+    get_ingestion_pool().start()
+    warmup = asyncio.create_task(_warm_up())
     yield
     print("Application shutting down...")
+    warmup.cancel()
+    get_ingestion_pool().stop()
+    if "embedding_model" in _startup_stages:
+        get_embedding_service().close()
 
 
 class QueryRequest(BaseModel):
@@ -32,97 +135,629 @@ class QueryRequest(BaseModel):
     exact_ticker: Optional[str] = None
 
 
+class BatchQueryRequest(BaseModel):
+    items: list[QueryRequest]
+    # Max LLM generations in flight for this batch; defaults to BATCH_QUERY_CONCURRENCY.
+    max_concurrency: Optional[int] = None
+
+
+class CompareRequest(BaseModel):
+    # Company names or tickers, resolved like QueryRequest.company_input.
+    company_inputs: list[str] = []
+    # Exact tickers, used as-is.
+    exact_tickers: list[str] = []
+    question: str
+
+
+class IngestionRequest(BaseModel):
+    ticker: str
+    company_name: Optional[str] = None
+    priority: int = 0
+
+
 app = FastAPI(title="Financial Analyst AI Agent", lifespan=lifespan)
 
 
-@app.post("/query")
-async def handle_query(request: QueryRequest, background_tasks: BackgroundTasks):
-    question = request.question
+def _route_label(request: Request) -> str:
+    """The matched route's path template, which keeps label values bounded."""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+async def record_request_metrics(request: Request, call_next):
+    """
+    Times each request and runs it under the caller's W3C `traceparent` trace
+    (or a new one), which ingestion jobs it queues inherit.
+    """
+    trace_id = parse_traceparent(request.headers.get("traceparent"))
+    with use_trace(trace_id) as trace_id:
+        started = time.perf_counter()
+        response = await call_next(request)
+        observe_request(
+            request.method,
+            _route_label(request),
+            response.status_code,
+            time.perf_counter() - started,
+        )
+    response.headers["traceparent"] = format_traceparent(trace_id)
+    return response
+
+
+if METRICS_ENABLED:
+    app.middleware("http")(record_request_metrics)
+
 
+PRELIMINARY_DISCLAIMER = (
+    "\n\n*Disclaimer: This is a preliminary answer based on live news. "
+    "The full financial report is now being processed in the background. "
+    "This page will automatically update with the complete analysis when ready.*"
+)
+
+
+def _source_info(doc) -> dict:
+    metadata = doc.metadata
+    return {
+        key: metadata[key]
+        for key in ("title", "url", "source_file", "page_number")
+        if metadata.get(key) is not None
+    }
+
+
+async def _generate(
+    rag_chain, question: str, stream: bool, parts: list[str], question_vector=None
+):
+    """
+    Runs a RAG chain, appending the answer text to `parts`. When streaming, the
+    retrieved sources and then each generated chunk are yielded as events.
+    A `question_vector` computed earlier is reused for retrieval.
+    """
+    if not stream:
+        parts.append(await rag_chain.ainvoke(question, question_vector))
+        return
+
+    started = time.perf_counter()
+    docs = await rag_chain.aretrieve(question, question_vector)
+    yield {
+        "event": "sources",
+        "sources": [_source_info(doc) for doc in docs],
+        "retrieval_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    async for chunk in rag_chain.astream_answer(question, docs):
+        parts.append(chunk)
+        yield {"event": "token", "text": chunk}
+
+
+async def _resolve_ticker(request: QueryRequest):
+    """
+    Returns (ticker, company_name, error). `error` is a ready-made response body
+    when the company couldn't be resolved, otherwise None.
+    """
     # --- [MODIFIED] Handle direct ticker input or perform search ---
     if request.exact_ticker:
         # If the user provides an exact ticker, use it directly
         ticker = request.exact_ticker.upper()
         # We might not have the full company name, so we use the ticker as a fallback
-        company_name = ticker
-    else:
-        # Otherwise, use the intelligent search
-        company_input = request.company_input
-        # NOTE: This assumes `find_best_ticker_match` is modified to return
-        # (None, "API_LIMIT_REACHED") when the Alpha Vantage limit is hit.
-        ticker, company_name = find_best_ticker_match(company_input)
-
-        # [NEW] Check for the specific API limit error signal
-        if company_name == "API_LIMIT_REACHED":
-            return {
-                "status": "api_limit_exceeded",
-                "message": "The automatic ticker search has reached its daily limit. Please provide an exact ticker.",
-            }
+        return ticker, ticker, None
 
-        if not ticker or not company_name:
-            return {
-                "status": "error",
-                "message": f"Could not find a valid stock ticker for '{company_input}'. Please be more specific.",
-            }
-    # --- End of modification ---
+    # Otherwise, use the intelligent search
+    company_input = request.company_input
+    # NOTE: This assumes `find_best_ticker_match` is modified to return
+    # (None, "API_LIMIT_REACHED") when the Alpha Vantage limit is hit.
+    ticker, company_name = await afind_best_ticker_match(company_input)
 
-    status = get_company_status(ticker)
+    # [NEW] Check for the specific API limit error signal
+    if company_name == "API_LIMIT_REACHED":
+        return None, None, {
+            "status": "api_limit_exceeded",
+            "message": "The automatic ticker search has reached its daily limit. Please provide an exact ticker.",
+        }
+
+    if not ticker or not company_name:
+        return None, None, {
+            "status": "error",
+            "message": f"Could not find a valid stock ticker for '{company_input}'. Please be more specific.",
+        }
+    return ticker, company_name, None
+
+
+async def _query_events(request: QueryRequest, stream: bool):
+    """
+    The /query flow as a sequence of events. The last event is always a
+    "result" whose remaining fields are the /query response body.
+    """
+    question = request.question
+
+    ticker, company_name, error = await _resolve_ticker(request)
+    if error:
+        yield {"event": "result", **error}
+        return
+
+    # SQLite and chain setup are blocking, so they run in the threadpool.
+    status = await asyncio.to_thread(get_company_status, ticker)
 
     if status == "indexed":
-        rag_chain = create_persistent_rag_chain(ticker)
-        answer = rag_chain.invoke(question)
-        return {"status": "complete", "answer": answer, "ticker": ticker}
+        if stream:
+            yield {"event": "status", "status": "complete", "ticker": ticker}
+
+        # Only complete answers from the persistent index are cached; the
+        # preliminary live path below never reads or writes this cache.
+        answer_cache = get_answer_cache()
+        question_vector = await get_embedding_service().aembed_query(question)
+        cached = answer_cache.get(ticker, question_vector)
+        if cached:
+            answer, _ = cached
+            yield {
+                "event": "result",
+                "status": "complete",
+                "answer": answer,
+                "ticker": ticker,
+            }
+            return
+
+        rag_chain = await asyncio.to_thread(create_persistent_rag_chain, ticker)
+        parts = []
+        async for event in _generate(
+            rag_chain, question, stream, parts, question_vector
+        ):
+            yield event
+        answer = "".join(parts)
+        answer_cache.set(ticker, question, question_vector, answer)
+        yield {
+            "event": "result",
+            "status": "complete",
+            "answer": answer,
+            "ticker": ticker,
+        }
 
     elif status == "processing":
-        return {
+        yield {
+            "event": "result",
             "status": "processing",
             "message": f"Analysis for {company_name} ({ticker}) is already underway.",
             "ticker": ticker,
         }
 
     elif status == "failed":
-        return {
+        yield {
+            "event": "result",
             "status": "failed",
             "message": f"Data processing failed for {company_name} ({ticker}). This may be due to a lack of available online documents.",
             "ticker": ticker,
         }
 
     else:  # Status is None (not found)
-        mark_company_as_processing(ticker)
-        background_tasks.add_task(process_company_data_background, ticker, company_name)
+        await asyncio.to_thread(mark_company_as_processing, ticker)
+        await asyncio.to_thread(
+            get_ingestion_pool().submit, ticker, company_name, QUERY_INGESTION_PRIORITY
+        )
+        if stream:
+            yield {
+                "event": "status",
+                "status": "complete_preliminary",
+                "ticker": ticker,
+            }
 
-        live_news_docs = fetch_company_news(company_name)
-        live_stock_overview = get_company_overview(ticker)
+        live_news_docs, live_stock_overview = await asyncio.gather(
+            afetch_company_news(company_name), aget_company_overview(ticker)
+        )
 
         if not live_news_docs:
-            return {
+            yield {
+                "event": "result",
                 "status": "processing",
                 "message": "Could not fetch live news data. Background indexing has started.",
                 "ticker": ticker,
             }
+            return
 
-        live_rag_chain = create_live_rag_chain(live_news_docs, live_stock_overview)
-        initial_answer = live_rag_chain.invoke(question)
-
-        final_answer = (
-            f"{initial_answer}\n\n"
-            f"*Disclaimer: This is a preliminary answer based on live news. "
-            f"The full financial report is now being processed in the background. "
-            f"This page will automatically update with the complete analysis when ready.*"
+        live_rag_chain = await asyncio.to_thread(
+            create_live_rag_chain, live_news_docs, live_stock_overview
         )
-        return {
+        parts = []
+        async for event in _generate(live_rag_chain, question, stream, parts):
+            yield event
+        if stream:
+            yield {"event": "token", "text": PRELIMINARY_DISCLAIMER}
+
+        yield {
+            "event": "result",
             "status": "complete_preliminary",
-            "answer": final_answer,
+            "answer": "".join(parts) + PRELIMINARY_DISCLAIMER,
             "ticker": ticker,
         }
 
 
+@app.post("/query")
+async def handle_query(request: QueryRequest):
+    async for event in _query_events(request, stream=False):
+        if event["event"] == "result":
+            return {key: value for key, value in event.items() if key != "event"}
+
+
+@app.post("/query/stream")
+async def handle_query_stream(request: QueryRequest):
+    """
+    Streams the /query flow as newline-delimited JSON events: a "status" event as
+    soon as the answer path is known, the retrieved "sources", one "token" event
+    per generated chunk, and a final "result" matching the /query response.
+    """
+
+    async def ndjson():
+        try:
+            async for event in _query_events(request, stream=True):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            print(f"Streaming query failed: {e}")
+            yield json.dumps({"event": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.get("/status/{ticker}")
 def get_status(ticker: str):
     status = get_company_status(ticker)
-    return {"ticker": ticker, "status": status}
+    job = get_latest_ingestion_job(ticker)
+    job_info = (
+        {
+            "id": job["id"],
+            "state": job["status"],
+            "stage": job["stage"],
+            "progress": job["progress"],
+            "priority": job["priority"],
+            "error": job["error"],
+            "trace_id": job["trace_id"],
+        }
+        if job
+        else None
+    )
+    return {"ticker": ticker, "status": status, "job": job_info}
+
+
+@app.post("/query/batch")
+async def handle_query_batch(request: BatchQueryRequest):
+    """
+    Answers many questions, across one or more companies, in a single request.
+    Each company is resolved once, all questions are embedded in one batch,
+    each ticker's collection is searched once for all of its questions, and the
+    generations run concurrently. Results are returned in request order, each
+    with its own status. Tickers that aren't indexed yet are scheduled for
+    ingestion; batches don't produce preliminary answers.
+    """
+    items = request.items
+    if len(items) > BATCH_QUERY_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {BATCH_QUERY_MAX_ITEMS} questions.",
+        )
+    max_concurrency = max(1, request.max_concurrency or BATCH_QUERY_CONCURRENCY)
+    results = [None] * len(items)
+
+    # Resolve each distinct company once.
+    def company_key(item: QueryRequest) -> str:
+        if item.exact_ticker:
+            return "ticker:" + item.exact_ticker.upper()
+        return "name:" + " ".join(item.company_input.lower().split())
+
+    keys = [company_key(item) for item in items]
+    first_item = {}
+    for key, item in zip(keys, items):
+        first_item.setdefault(key, item)
+    resolved = dict(
+        zip(
+            first_item,
+            await asyncio.gather(*(_resolve_ticker(i) for i in first_item.values())),
+        )
+    )
+
+    names = {}
+    for index, key in enumerate(keys):
+        ticker, company_name, error = resolved[key]
+        if error:
+            results[index] = dict(error)
+        else:
+            names.setdefault(ticker, company_name)
+
+    statuses = await asyncio.to_thread(get_company_statuses, list(names))
+    new_tickers = [
+        ticker
+        for ticker, status in statuses.items()
+        if status not in ("indexed", "processing", "failed")
+    ]
+    if new_tickers:
+        await asyncio.to_thread(mark_companies_as_processing, new_tickers)
+        pool = get_ingestion_pool()
+        for ticker in new_tickers:
+            await asyncio.to_thread(
+                pool.submit, ticker, names[ticker], QUERY_INGESTION_PRIORITY
+            )
+
+    pending = []  # indexes of items to answer from the persistent index
+    for index, key in enumerate(keys):
+        if results[index] is not None:
+            continue
+        ticker = resolved[key][0]
+        status = "processing" if ticker in new_tickers else statuses[ticker]
+        if status == "indexed":
+            pending.append(index)
+        elif status == "failed":
+            results[index] = {
+                "status": "failed",
+                "message": f"Data processing failed for {names[ticker]} ({ticker}).",
+                "ticker": ticker,
+            }
+        else:
+            results[index] = {
+                "status": "processing",
+                "message": f"Analysis for {names[ticker]} ({ticker}) is underway.",
+                "ticker": ticker,
+            }
+
+    # One embedding batch for every question, then the answer cache.
+    questions = [items[index].question for index in pending]
+    vectors = await get_embedding_service().aembed_queries(questions)
+    answer_cache = get_answer_cache()
+    by_ticker = {}
+    for index, question, vector in zip(pending, questions, vectors):
+        ticker = resolved[keys[index]][0]
+        cached = answer_cache.get(ticker, vector)
+        if cached:
+            answer, _ = cached
+            results[index] = {"status": "complete", "answer": answer, "ticker": ticker}
+        else:
+            by_ticker.setdefault(ticker, []).append((index, question, vector))
+
+    # One vector query per collection, then all generations together.
+    async def prepare(ticker: str, group: list):
+        rag_chain, docs = await asyncio.gather(
+            asyncio.to_thread(create_persistent_rag_chain, ticker),
+            asyncio.to_thread(
+                retrieve_by_vectors, ticker, [vector for _, _, vector in group]
+            ),
+        )
+        return [
+            (index, ticker, vector, (rag_chain, question, item_docs))
+            for (index, question, vector), item_docs in zip(group, docs)
+        ]
+
+    prepared = await asyncio.gather(
+        *(prepare(ticker, group) for ticker, group in by_ticker.items()),
+        return_exceptions=True,
+    )
+    jobs = []
+    for (ticker, group), outcome in zip(by_ticker.items(), prepared):
+        if isinstance(outcome, Exception):
+            for index, _, _ in group:
+                results[index] = {
+                    "status": "error",
+                    "message": str(outcome),
+                    "ticker": ticker,
+                }
+        else:
+            jobs.extend(outcome)
+
+    answers = await abatch_answers([job for *_, job in jobs], max_concurrency)
+    for (index, ticker, vector, (_, question, _)), answer in zip(jobs, answers):
+        if isinstance(answer, Exception):
+            results[index] = {
+                "status": "error",
+                "message": str(answer),
+                "ticker": ticker,
+            }
+        else:
+            answer_cache.set(ticker, question, vector, answer)
+            results[index] = {"status": "complete", "answer": answer, "ticker": ticker}
+
+    return {
+        "results": [
+            {"question": item.question, **result}
+            for item, result in zip(items, results)
+        ]
+    }
+
+
+@app.post("/query/compare")
+async def handle_query_compare(request: CompareRequest):
+    """
+    Answers one question across several companies with a single LLM call.
+    Every company is resolved and retrieved concurrently: indexed tickers are
+    searched in their Chroma collections with one shared question embedding and
+    use their cached overviews, while the rest are scheduled for ingestion and
+    answered from live news in the meantime (a preliminary comparison).
+    """
+    lookups = [
+        QueryRequest(
+            company_input=ticker, question=request.question, exact_ticker=ticker
+        )
+        for ticker in request.exact_tickers
+    ] + [
+        QueryRequest(company_input=company, question=request.question)
+        for company in request.company_inputs
+    ]
+    if not 2 <= len(lookups) <= COMPARE_MAX_COMPANIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Compare between 2 and {COMPARE_MAX_COMPANIES} companies.",
+        )
+
+    resolved = await asyncio.gather(*(_resolve_ticker(lookup) for lookup in lookups))
+    names, unresolved = {}, []
+    for lookup, (ticker, company_name, error) in zip(lookups, resolved):
+        if error:
+            unresolved.append({"company_input": lookup.company_input, **error})
+        else:
+            names.setdefault(ticker, company_name)
+    if not names:
+        return {"status": "error", "answer": None, "unresolved": unresolved}
+
+    statuses = await asyncio.to_thread(get_company_statuses, list(names))
+    live = [ticker for ticker, status in statuses.items() if status != "indexed"]
+    new_tickers = [t for t in live if statuses[t] not in ("processing", "failed")]
+    if new_tickers:
+        await asyncio.to_thread(mark_companies_as_processing, new_tickers)
+        pool = get_ingestion_pool()
+        await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    pool.submit, ticker, names[ticker], QUERY_INGESTION_PRIORITY
+                )
+                for ticker in new_tickers
+            )
+        )
+
+    question = request.question
+    question_vector = None
+    if len(live) < len(names):
+        question_vector = await get_embedding_service().aembed_query(question)
+
+    async def indexed_section(ticker: str) -> dict:
+        docs, overview = await asyncio.gather(
+            asyncio.to_thread(retrieve_indexed, ticker, question_vector),
+            asyncio.to_thread(get_cached_stock_overview, ticker),
+        )
+        return {"docs": docs, "overview": overview, "source": "indexed reports"}
+
+    async def live_section(ticker: str) -> dict:
+        news, overview = await asyncio.gather(
+            afetch_company_news(names[ticker]), aget_company_overview(ticker)
+        )
+        docs = await asyncio.to_thread(retrieve_live, news, question) if news else []
+        return {"docs": docs, "overview": overview, "source": "live news"}
+
+    tickers = list(names)
+    sections = await asyncio.gather(
+        *(
+            live_section(ticker) if ticker in live else indexed_section(ticker)
+            for ticker in tickers
+        )
+    )
+    for ticker, section in zip(tickers, sections):
+        section.update(ticker=ticker, company_name=names[ticker])
+
+    answer = await acompare_companies(question, sections)
+    if live:
+        answer += (
+            f"\n\n*Disclaimer: {', '.join(live)} "
+            f"{'is' if len(live) == 1 else 'are'} not fully indexed yet, so "
+            f"{'its' if len(live) == 1 else 'their'} part of this comparison is "
+            f"based on live news only.*"
+        )
+    return {
+        "status": "complete_preliminary" if live else "complete",
+        "answer": answer,
+        "tickers": tickers,
+        "preliminary_tickers": live,
+        "unresolved": unresolved,
+    }
+
+
+@app.get("/events/{ticker}")
+async def stream_ticker_events(ticker: str):
+    """
+    Server-sent events for a ticker: its current status first, then ingestion
+    progress as it happens, ending with the final indexed/failed/cancelled
+    status. Replaces polling GET /status/{ticker}.
+    """
+    ticker = ticker.upper()
+    hub = get_ticker_event_hub()
+    # Subscribe before reading the status so a transition in between isn't lost.
+    events = hub.subscribe(ticker)
+    try:
+        status = await asyncio.to_thread(get_company_status, ticker)
+    except Exception:
+        hub.unsubscribe(ticker, events)
+        raise
+
+    def sse(event: dict) -> str:
+        return f"data: {json.dumps(event)}\n\n"
+
+    async def event_stream():
+        try:
+            yield sse({"event": "status", "ticker": ticker, "status": status})
+            if status != "processing":
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        events.get(), EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse(event)
+                if event["event"] == "status" and event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            hub.unsubscribe(ticker, events)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/ingestion")
+def schedule_ingestion(request: IngestionRequest):
+    ticker = request.ticker.upper()
+    if get_company_status(ticker) != "processing":
+        mark_company_as_processing(ticker)
+    job_id = get_ingestion_pool().submit(
+        ticker, request.company_name or ticker, request.priority
+    )
+    return {"ticker": ticker, "job_id": job_id, "status": "processing"}
+
+
+@app.post("/ingestion/{ticker}/cancel")
+def cancel_ingestion(ticker: str):
+    ticker = ticker.upper()
+    state = request_ingestion_job_cancel(ticker)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"No pending ingestion for {ticker}.")
+    if state == "cancelled":
+        mark_company_as_cancelled(ticker)
+    return {"ticker": ticker, "job": state}
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return {
+        "rag_chains": get_rag_chain_cache_stats(),
+        "api_responses": get_response_cache().stats(),
+        "answers": get_answer_cache().stats(),
+    }
+
+
+@app.get("/stats/prompts")
+def get_prompt_token_stats():
+    """Average packed prompt size per answer, and the saving over verbatim prompts."""
+    return get_prompt_stats().stats()
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Stage timings, request latencies and counters in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/ready")
+def read_ready():
+    """Readiness: 200 once startup warmup has finished, 503 until then."""
+    body = {
+        "stages": {stage: _startup_stages.get(stage) for stage, _ in STARTUP_STAGES}
+    }
+    if _startup_error:
+        return JSONResponse({"status": "failed", "error": _startup_error, **body}, 503)
+    if len(_startup_stages) < len(STARTUP_STAGES):
+        return JSONResponse({"status": "starting", **body}, 503)
+    return {"status": "ready", **body}
 
 
 @app.get("/")
 def read_root():
+    """Liveness: answers as soon as the server accepts connections."""
     return {"message": "Financial Analyst AI Agent is running."}
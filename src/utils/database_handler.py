@@ -1,111 +1,612 @@
 # src/utils/database_handler.py
 
+import os
 import sqlite3
 import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DB_PATH = PROJECT_ROOT / "company_data.db"
 
+# Connections kept open per process. 0 disables pooling (connect per call).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+# Seconds a caller waits for a pooled connection before giving up.
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# How long a statement waits on another writer's lock before failing.
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# Extra attempts for a write transaction that still hits "database is locked".
+DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "3"))
+
+# Callbacks invoked as callback(ticker, status) whenever a ticker changes state.
+_status_listeners = []
+
+
+def register_status_listener(callback):
+    """Registers a callback to be notified when a ticker's status changes."""
+    if callback not in _status_listeners:
+        _status_listeners.append(callback)
+
+
+def notify_status_change(ticker: str, status: str):
+    for callback in list(_status_listeners):
+        try:
+            callback(ticker, status)
+        except Exception as e:
+            print(f"Status listener failed for '{ticker}' ({status}): {e}")
+
+
+# Callbacks invoked as callback(ticker, stage, progress) as an ingestion advances.
+_progress_listeners = []
+
+
+def register_progress_listener(callback):
+    """Registers a callback to be notified of ingestion stage progress."""
+    if callback not in _progress_listeners:
+        _progress_listeners.append(callback)
+
+
+def notify_progress(ticker: str, stage: str, progress: float):
+    for callback in list(_progress_listeners):
+        try:
+            callback(ticker, stage, progress)
+        except Exception as e:
+            print(f"Progress listener failed for '{ticker}' ({stage}): {e}")
+
+
+# --- Connection pool ---
+
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    """Opens a new connection configured for concurrent readers and writers."""
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        # Transactions are managed explicitly; reads run in autocommit mode.
+        isolation_level=None,
+        # Per-connection prepared statement cache, reused across calls.
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    # WAL lets readers proceed while a writer holds the lock.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
     return conn
 
 
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections shared by the threads of one process.
+    When every connection is busy, callers queue and are handed connections in
+    arrival order, so a burst of fast readers can't starve a waiting writer.
+    A forked child detects the PID change and starts with a fresh pool, since
+    SQLite connections must not cross a fork.
+    """
+
+    def __init__(self, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._waiters = deque()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self):
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._idle, self._waiters = [], deque()
+            self._created = 0
+            self._pid = os.getpid()
+
+    def acquire(self) -> sqlite3.Connection:
+        self._reset_after_fork()
+        if self.size <= 0:
+            return get_db_connection()
+        with self._lock:
+            if self._idle and not self._waiters:
+                return self._idle.pop()
+            if self._created < self.size:
+                self._created += 1
+                waiter = None
+            else:
+                waiter = [threading.Event(), None]
+                self._waiters.append(waiter)
+        if waiter is None:
+            return self._connect()
+        if not waiter[0].wait(self.timeout):
+            with self._lock:
+                if not waiter[0].is_set():
+                    self._waiters.remove(waiter)
+                    raise sqlite3.OperationalError(
+                        f"no database connection free after {self.timeout:g}s"
+                    )
+        # Handed either a connection or, if its opener failed, the slot itself.
+        return waiter[1] if waiter[1] is not None else self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a connection for a slot already counted in `_created`."""
+        try:
+            return get_db_connection()
+        except BaseException:
+            with self._lock:
+                if self._waiters:
+                    self._waiters.popleft()[0].set()  # It opens its own.
+                else:
+                    self._created -= 1
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        if self.size <= 0 or self._pid != os.getpid():
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = conn
+                waiter[0].set()
+            else:
+                self._idle.append(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            conn.close()
+
+
+_pool = ConnectionPool()
+
+
+@contextmanager
+def _connection():
+    conn = _pool.acquire()
+    try:
+        yield conn
+    finally:
+        _pool.release(conn)
+
+
+@contextmanager
+def _transaction(immediate: bool = True):
+    """
+    Runs a write transaction. BEGIN IMMEDIATE takes the write lock up front, so
+    a read-then-write transaction can't fail halfway on a lock upgrade.
+    """
+    with _connection() as conn:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def _retry_locked(func):
+    """Retries a write with backoff when the busy timeout alone wasn't enough."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == DB_WRITE_RETRIES:
+                    raise
+                time.sleep(0.05 * 2**attempt)
+
+    return wrapper
+
+
+@_retry_locked
+def execute_batch(statements: list[tuple[str, tuple]]):
+    """Runs several write statements in one transaction (one fsync, one lock)."""
+    with _transaction() as conn:
+        for sql, params in statements:
+            conn.execute(sql, params)
+
+
+# --- Companies ---
+
+
 def initialize_database():
-    # ... (no changes here)
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
+    with _transaction() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS indexed_companies (
+                ticker TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                indexed_at TIMESTAMP NOT NULL,
+                stock_overview_json TEXT
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                company_name TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TIMESTAMP NOT NULL,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                trace_id TEXT
+            )
+        """
+        )
+        job_columns = {
+            row["name"] for row in conn.execute("PRAGMA table_info(ingestion_jobs)")
+        }
+        if "trace_id" not in job_columns:
+            # Databases created before jobs carried the trace that queued them.
+            conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN trace_id TEXT")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_queue
+            ON ingestion_jobs (status, priority DESC, id)
+        """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_ticker
+            ON ingestion_jobs (ticker, id DESC)
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS api_responses (
+                endpoint TEXT NOT NULL,
+                query_key TEXT NOT NULL,
+                payload_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (endpoint, query_key)
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_api_responses_access
+            ON api_responses (last_access)
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ticker_symbols (
+                symbol TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                exchange TEXT,
+                source TEXT NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
         """
-        CREATE TABLE IF NOT EXISTS indexed_companies (
-            ticker TEXT PRIMARY KEY,
-            status TEXT NOT NULL,
-            indexed_at TIMESTAMP NOT NULL,
-            stock_overview_json TEXT
         )
-    """
-    )
-    conn.commit()
-    conn.close()
 
 
 def get_company_status(ticker: str) -> str | None:
-    # ... (no changes here)
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT status FROM indexed_companies WHERE ticker = ?", (ticker,))
-    result = cursor.fetchone()
-    conn.close()
+    with _connection() as conn:
+        result = conn.execute(
+            "SELECT status FROM indexed_companies WHERE ticker = ?", (ticker,)
+        ).fetchone()
     return result["status"] if result else None
 
 
+def get_company_statuses(tickers: list[str]) -> dict[str, str | None]:
+    """Looks up several tickers in one query."""
+    if not tickers:
+        return {}
+    placeholders = ",".join("?" for _ in tickers)
+    with _connection() as conn:
+        rows = conn.execute(
+            f"SELECT ticker, status FROM indexed_companies WHERE ticker IN ({placeholders})",
+            tuple(tickers),
+        ).fetchall()
+    statuses = {row["ticker"]: row["status"] for row in rows}
+    return {ticker: statuses.get(ticker) for ticker in tickers}
+
+
+_MARK_PROCESSING_SQL = """
+    INSERT OR REPLACE INTO indexed_companies (ticker, status, indexed_at, stock_overview_json)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+@_retry_locked
 def mark_company_as_processing(ticker: str):
-    # ... (no changes here)
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    timestamp = datetime.now()
-    cursor.execute(
-        """
-        INSERT OR REPLACE INTO indexed_companies (ticker, status, indexed_at, stock_overview_json)
-        VALUES (?, ?, ?, ?)
-    """,
-        (ticker, "processing", timestamp, None),
-    )
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(_MARK_PROCESSING_SQL, (ticker, "processing", datetime.now(), None))
     print(f"Marked ticker '{ticker}' as processing in the database.")
 
 
-def mark_company_as_indexed(ticker: str, stock_overview: dict | None):
-    # ... (no changes here)
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@_retry_locked
+def mark_companies_as_processing(tickers: list[str]):
+    """Batched `mark_company_as_processing` for several tickers in one transaction."""
     timestamp = datetime.now()
+    with _transaction() as conn:
+        conn.executemany(
+            _MARK_PROCESSING_SQL,
+            [(ticker, "processing", timestamp, None) for ticker in tickers],
+        )
+    print(f"Marked tickers {tickers} as processing in the database.")
+
+
+@_retry_locked
+def mark_company_as_indexed(ticker: str, stock_overview: dict | None):
     overview_json = json.dumps(stock_overview) if stock_overview else None
-    cursor.execute(
-        """
-        UPDATE indexed_companies SET status = ?, indexed_at = ?, stock_overview_json = ? WHERE ticker = ?
-    """,
-        ("indexed", timestamp, overview_json, ticker),
-    )
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(
+            """
+            UPDATE indexed_companies SET status = ?, indexed_at = ?, stock_overview_json = ? WHERE ticker = ?
+        """,
+            ("indexed", datetime.now(), overview_json, ticker),
+        )
     print(f"Marked ticker '{ticker}' as indexed in the database.")
+    notify_status_change(ticker, "indexed")
+
+
+@_retry_locked
+def _set_company_status(ticker: str, status: str):
+    with _transaction() as conn:
+        conn.execute(
+            """
+            UPDATE indexed_companies SET status = ?, indexed_at = ? WHERE ticker = ?
+        """,
+            (status, datetime.now(), ticker),
+        )
 
 
 def mark_company_as_failed(ticker: str):
     # NEW: Marks a company's ingestion as failed
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    timestamp = datetime.now()
-    cursor.execute(
-        """
-        UPDATE indexed_companies SET status = ?, indexed_at = ? WHERE ticker = ?
-    """,
-        ("failed", timestamp, ticker),
-    )
-    conn.commit()
-    conn.close()
+    _set_company_status(ticker, "failed")
     print(f"Marked ticker '{ticker}' as failed in the database.")
+    notify_status_change(ticker, "failed")
+
+
+def mark_company_as_cancelled(ticker: str):
+    # Cancelled tickers fall through to a fresh ingestion on the next query.
+    _set_company_status(ticker, "cancelled")
+    print(f"Marked ticker '{ticker}' as cancelled in the database.")
+    notify_status_change(ticker, "cancelled")
 
 
 def get_cached_stock_overview(ticker: str) -> dict | None:
-    # ... (no changes here)
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT stock_overview_json FROM indexed_companies WHERE ticker = ?", (ticker,)
-    )
-    result = cursor.fetchone()
-    conn.close()
+    with _connection() as conn:
+        result = conn.execute(
+            "SELECT stock_overview_json FROM indexed_companies WHERE ticker = ?",
+            (ticker,),
+        ).fetchone()
     if result and result["stock_overview_json"]:
         return json.loads(result["stock_overview_json"])
     return None
 
 
+# --- Ingestion job queue ---
+
+
+@_retry_locked
+def enqueue_ingestion_job(
+    ticker: str, company_name: str, priority: int = 0, trace_id: str | None = None
+) -> int:
+    """
+    Queues an ingestion job, or returns the id of the ticker's already pending job.
+    Re-queuing a pending ticker raises its priority if the new one is higher.
+    `trace_id` records the request that queued the job, for tracing its stages.
+    """
+    with _transaction() as conn:
+        existing = conn.execute(
+            "SELECT id FROM ingestion_jobs WHERE ticker = ? AND status IN ('queued', 'running')",
+            (ticker,),
+        ).fetchone()
+        if existing:
+            job_id = existing["id"]
+            conn.execute(
+                "UPDATE ingestion_jobs SET priority = MAX(priority, ?) WHERE id = ?",
+                (priority, job_id),
+            )
+        else:
+            cursor = conn.execute(
+                """
+                INSERT INTO ingestion_jobs
+                    (ticker, company_name, priority, status, stage, created_at, trace_id)
+                VALUES (?, ?, ?, 'queued', 'queued', ?, ?)
+            """,
+                (ticker, company_name, priority, datetime.now(), trace_id),
+            )
+            job_id = cursor.lastrowid
+    return job_id
+
+
+@_retry_locked
+def claim_next_ingestion_job() -> dict | None:
+    """Atomically moves the highest-priority queued job to 'running' and returns it."""
+    with _transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT * FROM ingestion_jobs WHERE status = 'queued'
+            ORDER BY priority DESC, id LIMIT 1
+        """
+        ).fetchone()
+        if row:
+            conn.execute(
+                """
+                UPDATE ingestion_jobs SET status = 'running', stage = 'starting', started_at = ?
+                WHERE id = ?
+            """,
+                (datetime.now(), row["id"]),
+            )
+    return dict(row) if row else None
+
+
+@_retry_locked
+def update_ingestion_job_progress(job_id: int, stage: str, progress: float) -> bool:
+    """Records a job's current stage. Returns True if cancellation was requested."""
+    with _transaction() as conn:
+        conn.execute(
+            "UPDATE ingestion_jobs SET stage = ?, progress = ? WHERE id = ?",
+            (stage, progress, job_id),
+        )
+        result = conn.execute(
+            "SELECT cancel_requested FROM ingestion_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+    return bool(result and result["cancel_requested"])
+
+
+def is_ingestion_job_cancel_requested(job_id: int) -> bool:
+    """Read-only cancellation check, cheap enough to run per shard or batch."""
+    with _connection() as conn:
+        result = conn.execute(
+            "SELECT cancel_requested FROM ingestion_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+    return bool(result and result["cancel_requested"])
+
+
+@_retry_locked
+def finish_ingestion_job(job_id: int, status: str, error: str | None = None):
+    with _transaction() as conn:
+        conn.execute(
+            """
+            UPDATE ingestion_jobs SET status = ?, error = ?, finished_at = ?,
+                progress = CASE WHEN ? = 'succeeded' THEN 1.0 ELSE progress END
+            WHERE id = ?
+        """,
+            (status, error, datetime.now(), status, job_id),
+        )
+
+
+@_retry_locked
+def request_ingestion_job_cancel(ticker: str) -> str | None:
+    """
+    Cancels a ticker's pending job. Queued jobs are cancelled immediately and
+    running jobs stop at their next page shard, embedding batch or stage.
+    Returns the job's new state.
+    """
+    with _transaction() as conn:
+        row = conn.execute(
+            "SELECT id, status FROM ingestion_jobs WHERE ticker = ? AND status IN ('queued', 'running')",
+            (ticker,),
+        ).fetchone()
+        if not row:
+            return None
+        if row["status"] == "queued":
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'cancelled', stage = 'cancelled', finished_at = ? WHERE id = ?",
+                (datetime.now(), row["id"]),
+            )
+            return "cancelled"
+        conn.execute(
+            "UPDATE ingestion_jobs SET cancel_requested = 1 WHERE id = ?", (row["id"],)
+        )
+        return "cancelling"
+
+
+def get_latest_ingestion_job(ticker: str) -> dict | None:
+    with _connection() as conn:
+        result = conn.execute(
+            "SELECT * FROM ingestion_jobs WHERE ticker = ? ORDER BY id DESC LIMIT 1",
+            (ticker,),
+        ).fetchone()
+    return dict(result) if result else None
+
+
+@_retry_locked
+def requeue_interrupted_ingestion_jobs() -> int:
+    """Puts jobs left 'running' by a previous, crashed server back in the queue."""
+    with _transaction() as conn:
+        cursor = conn.execute(
+            "UPDATE ingestion_jobs SET status = 'queued', stage = 'queued' WHERE status = 'running'"
+        )
+        return cursor.rowcount
+
+
+# --- Ticker symbols ---
+
+
+def load_ticker_symbols() -> list[dict]:
+    with _connection() as conn:
+        # Oldest first, so listing-file symbols rank ahead of ones learned later.
+        rows = conn.execute(
+            "SELECT symbol, name, exchange FROM ticker_symbols ORDER BY updated_at"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@_retry_locked
+def upsert_ticker_symbols(symbols: list[dict], source: str):
+    """Stores (symbol, name, exchange) rows learned from a listing file or the API."""
+    timestamp = datetime.now()
+    with _transaction() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO ticker_symbols (symbol, name, exchange, source, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            [
+                (s["symbol"], s["name"], s.get("exchange"), source, timestamp)
+                for s in symbols
+            ],
+        )
+
+
+# --- External API response cache ---
+
+
+def get_api_response(endpoint: str, query_key: str) -> tuple[str, float] | None:
+    """Returns (payload_json, fetched_at) for a cached response, or None."""
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT payload_json, fetched_at FROM api_responses WHERE endpoint = ? AND query_key = ?",
+            (endpoint, query_key),
+        ).fetchone()
+        if row:
+            # Autocommit write; losing one under contention only skews eviction order.
+            try:
+                conn.execute(
+                    "UPDATE api_responses SET last_access = ? WHERE endpoint = ? AND query_key = ?",
+                    (time.time(), endpoint, query_key),
+                )
+            except sqlite3.OperationalError:
+                pass
+    return (row["payload_json"], row["fetched_at"]) if row else None
+
+
+@_retry_locked
+def put_api_response(endpoint: str, query_key: str, payload_json: str, max_entries: int):
+    """Stores a response and evicts the least recently used ones beyond `max_entries`."""
+    now = time.time()
+    with _transaction() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO api_responses (endpoint, query_key, payload_json, fetched_at, last_access)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (endpoint, query_key, payload_json, now, now),
+        )
+        conn.execute(
+            """
+            DELETE FROM api_responses WHERE rowid IN (
+                SELECT rowid FROM api_responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """,
+            (max_entries,),
+        )
+
+
 if __name__ == "__main__":
     initialize_database()
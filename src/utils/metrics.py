@@ -0,0 +1,283 @@
+# src/utils/metrics.py
+
+import os
+import time
+import uuid
+import inspect
+import threading
+import functools
+import contextvars
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Prints every finished span with the trace it belongs to.
+TRACE_LOG = os.getenv("TRACE_LOG", "false").lower() in ("1", "true", "yes")
+METRICS_BUCKETS = tuple(
+    float(edge)
+    for edge in os.getenv(
+        "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120,300"
+    ).split(",")
+)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = "analyst_stage_duration_seconds"
+REQUEST_SECONDS = "analyst_http_request_duration_seconds"
+CACHE_LOOKUPS = "analyst_cache_lookups_total"
+API_ERRORS = "analyst_external_api_errors_total"
+API_RATE_LIMITED = "analyst_external_api_rate_limited_total"
+
+HELP = {
+    STAGE_SECONDS: "Time spent in each ingestion and query stage.",
+    REQUEST_SECONDS: "Time until the response headers were sent, per route.",
+    CACHE_LOOKUPS: "Cache lookups by cache and result (hit or miss).",
+    API_ERRORS: "Failed calls to external APIs, by service.",
+    API_RATE_LIMITED: "External API calls rejected by a rate or usage limit.",
+}
+
+# Substrings of the errors (or response notes) the providers return when throttling.
+_RATE_LIMIT_MARKERS = (
+    "rate limit",
+    "call frequency",
+    "too many requests",
+    "usage limit",
+    "usagelimit",
+)
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe histograms and counters keyed by metric name and label pairs.
+    Histograms share one set of bucket edges; `drain` and `merge` move values
+    recorded in ingestion worker processes into the web process.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # name -> labels -> [count per bucket..., count above the last edge, sum]
+        self._histograms = defaultdict(dict)
+        self._counters = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms[name].get(labels)
+            if series is None:
+                series = self._histograms[name][labels] = [0] * (len(self.buckets) + 1)
+                series.append(0.0)
+            series[index] += 1
+            series[-1] += value
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._counters[name][labels] += amount
+
+    def drain(self) -> dict:
+        """Returns everything recorded so far and resets the registry."""
+        with self._lock:
+            snapshot = {
+                "histograms": {name: dict(s) for name, s in self._histograms.items()},
+                "counters": {name: dict(s) for name, s in self._counters.items()},
+            }
+            self._histograms.clear()
+            self._counters.clear()
+        return snapshot
+
+    def merge(self, snapshot: dict):
+        """Adds a snapshot from `drain` (e.g. from another process)."""
+        with self._lock:
+            for name, series in snapshot.get("histograms", {}).items():
+                for labels, values in series.items():
+                    current = self._histograms[name].get(labels)
+                    if current is None:
+                        self._histograms[name][labels] = list(values)
+                    else:
+                        for i, value in enumerate(values):
+                            current[i] += value
+            for name, series in snapshot.get("counters", {}).items():
+                for labels, value in series.items():
+                    self._counters[name][labels] += value
+
+    def render(self) -> str:
+        """The registry in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {
+                name: {labels: list(values) for labels, values in series.items()}
+                for name, series in self._histograms.items()
+            }
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        lines = []
+        for name in sorted(histograms):
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, series in sorted(histograms[name].items()):
+                cumulative = 0
+                for edge, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = _format_labels(labels + (("le", f"{edge:g}"),))
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                total = cumulative + series[len(self.buckets)]
+                le = _format_labels(labels + (("le", "+Inf"),))
+                lines.append(f"{name}_bucket{le} {total}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {series[-1]:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {total}")
+        for name in sorted(counters):
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+# --- Spans ---
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        _registry.observe(STAGE_SECONDS, elapsed, (("stage", self.stage),))
+        if TRACE_LOG:
+            outcome = "failed" if exc_type else "ok"
+            print(
+                f"[trace {_trace_id.get() or '-'}] {self.stage} {outcome} "
+                f"in {elapsed * 1000:.1f} ms"
+            )
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(stage: str):
+    """Times the enclosed block as one run of `stage`. A no-op when disabled."""
+    return _Span(stage) if METRICS_ENABLED else _NO_SPAN
+
+
+def timed(stage: str):
+    """Decorator form of `span` for sync and async functions."""
+
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _Span(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float):
+    if METRICS_ENABLED:
+        labels = (("method", method), ("route", route), ("status", str(status_code)))
+        _registry.observe(REQUEST_SECONDS, seconds, labels)
+
+
+# --- Counters ---
+
+
+def cache_lookup(cache: str, hit: bool):
+    if METRICS_ENABLED:
+        labels = (("cache", cache), ("result", "hit" if hit else "miss"))
+        _registry.inc(CACHE_LOOKUPS, labels)
+
+
+def is_rate_limited(error) -> bool:
+    """Whether an exception (or an API's error note) signals throttling."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+
+def record_api_error(service: str, error):
+    """Counts a failed external call, and separately whether it was rate limited."""
+    if not METRICS_ENABLED:
+        return
+    _registry.inc(API_ERRORS, (("service", service),))
+    if is_rate_limited(error):
+        _registry.inc(API_RATE_LIMITED, (("service", service),))
+
+
+# --- Trace context ---
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> str | None:
+    return _trace_id.get()
+
+
+@contextmanager
+def use_trace(trace_id: str | None = None):
+    """Attributes spans in the enclosed block (and tasks it starts) to a trace."""
+    token = _trace_id.set(trace_id or new_trace_id())
+    try:
+        yield _trace_id.get()
+    finally:
+        _trace_id.reset(token)
+
+
+def parse_traceparent(header: str | None) -> str | None:
+    """The trace id of a W3C `traceparent` header, or None if it's malformed."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or parts[1] == "0" * 32:
+        return None
+    try:
+        int(parts[1], 16)
+    except ValueError:
+        return None
+    return parts[1].lower()
+
+
+def format_traceparent(trace_id: str) -> str:
+    return f"00-{trace_id}-{uuid.uuid4().hex[:16]}-01"
+
+
+def render_metrics() -> str:
+    return _registry.render()
@@ -0,0 +1,239 @@
+# src/utils/response_cache.py
+
+import os
+import json
+import time
+import asyncio
+import threading
+from src.utils.database_handler import get_api_response, put_api_response
+from src.utils.metrics import cache_lookup, record_api_error
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+# How long an empty result (unknown symbol, no news) is trusted.
+RESPONSE_CACHE_NEGATIVE_TTL = float(os.getenv("RESPONSE_CACHE_NEGATIVE_TTL", "600"))
+
+
+def _ttl(name: str, default: float) -> float:
+    return float(os.getenv(f"RESPONSE_CACHE_TTL_{name.upper()}", str(default)))
+
+
+# endpoint -> (fresh TTL, extra stale-while-revalidate window), in seconds.
+SOURCE_TTLS = {
+    "tavily_news": (_ttl("tavily_news", 900), _ttl("tavily_news_stale", 3600)),
+    "tavily_report_search": (
+        _ttl("tavily_report_search", 86400),
+        _ttl("tavily_report_search_stale", 6 * 86400),
+    ),
+    "alpha_vantage_overview": (
+        _ttl("alpha_vantage_overview", 86400),
+        _ttl("alpha_vantage_overview_stale", 6 * 86400),
+    ),
+}
+DEFAULT_TTL = (300.0, 0.0)
+# Counters that are cache lookups, and whether each one was a hit.
+_LOOKUP_COUNTERS = {
+    "hits": True,
+    "stale_hits": True,
+    "negative_hits": True,
+    "misses": False,
+}
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ResponseCache:
+    """
+    A persistent cache of external API responses keyed by (endpoint, query).
+
+    Fresh entries are served directly. Entries past their TTL but inside the
+    stale window are served immediately while a single background refresh runs.
+    Empty results are cached for a shorter negative TTL, and fetch errors are
+    never cached. Entries live in SQLite, so the web process and ingestion
+    workers share them.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> threading.Event for synchronous fetches
+        self._async_inflight = {}  # key -> asyncio.Task for async fetches
+        self._background = set()
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "errors": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+        if name in _LOOKUP_COUNTERS:
+            cache_lookup("api_responses", _LOOKUP_COUNTERS[name])
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        served = counters["hits"] + counters["stale_hits"] + counters["negative_hits"]
+        lookups = served + counters["misses"]
+        counters["hit_rate"] = served / lookups if lookups else 0.0
+        return counters
+
+    # --- Storage ---
+
+    def _lookup(self, endpoint: str, key: str, count: bool = True):
+        """Returns (state, payload) where state is fresh, stale or miss."""
+        cached = get_api_response(endpoint, key)
+        if not cached:
+            return "miss", None
+        payload_json, fetched_at = cached
+        payload = json.loads(payload_json)
+        ttl, stale_window = SOURCE_TTLS.get(endpoint, DEFAULT_TTL)
+        if not payload:
+            ttl, stale_window = min(ttl, RESPONSE_CACHE_NEGATIVE_TTL), 0.0
+        age = time.time() - fetched_at
+        if age < ttl:
+            if count:
+                self._count("hits" if payload else "negative_hits")
+            return "fresh", payload
+        if age < ttl + stale_window:
+            if count:
+                self._count("stale_hits")
+            return "stale", payload
+        return "miss", None
+
+    def _store(self, endpoint: str, key: str, payload):
+        try:
+            put_api_response(endpoint, key, json.dumps(payload), self.max_entries)
+        except Exception as e:
+            print(f"Could not cache {endpoint} response: {e}")
+
+    # --- Synchronous API ---
+
+    def get_or_fetch(self, endpoint: str, query: str, fetch):
+        """Returns the cached response for `query`, calling `fetch()` when needed."""
+        key = normalize_query(query)
+        state, payload = self._lookup(endpoint, key)
+        if state == "fresh":
+            return payload
+        if state == "stale":
+            self._revalidate_in_thread(endpoint, key, fetch)
+            return payload
+
+        self._count("misses")
+        return self._fetch_once(endpoint, key, fetch)
+
+    def _fetch_once(self, endpoint: str, key: str, fetch):
+        """Fetches and stores a response; concurrent callers share one fetch."""
+        with self._lock:
+            event = self._inflight.get((endpoint, key))
+            leader = event is None
+            if leader:
+                event = self._inflight[(endpoint, key)] = threading.Event()
+        if not leader:
+            event.wait()
+            state, payload = self._lookup(endpoint, key, count=False)
+            if state != "miss":
+                return payload
+        try:
+            return self._fetch_and_store(endpoint, key, fetch)
+        finally:
+            if leader:
+                self._release(endpoint, key, event)
+
+    def _fetch_and_store(self, endpoint: str, key: str, fetch):
+        try:
+            payload = fetch()
+        except Exception as e:
+            self._count("errors")
+            record_api_error(endpoint, e)
+            raise
+        self._store(endpoint, key, payload)
+        return payload
+
+    def _release(self, endpoint: str, key: str, event: threading.Event):
+        with self._lock:
+            self._inflight.pop((endpoint, key), None)
+        event.set()
+
+    def _revalidate_in_thread(self, endpoint: str, key: str, fetch):
+        # The key is claimed before the thread starts, so stale hits arriving
+        # in the meantime don't start refreshes of their own.
+        with self._lock:
+            if (endpoint, key) in self._inflight:
+                return
+            event = self._inflight[(endpoint, key)] = threading.Event()
+            self.counters["revalidations"] += 1
+
+        def refresh():
+            try:
+                self._fetch_and_store(endpoint, key, fetch)
+            except Exception as e:
+                print(f"Background refresh of {endpoint} '{key}' failed: {e}")
+            finally:
+                self._release(endpoint, key, event)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    # --- Async API ---
+
+    async def aget_or_fetch(self, endpoint: str, query: str, afetch):
+        """Async variant of `get_or_fetch`; `afetch` is a coroutine function."""
+        key = normalize_query(query)
+        state, payload = await asyncio.to_thread(self._lookup, endpoint, key)
+        if state == "fresh":
+            return payload
+        if state == "stale":
+            if (endpoint, key) not in self._async_inflight:
+                self._count("revalidations")
+                task = self._start_afetch(endpoint, key, afetch)
+                self._background.add(task)
+                task.add_done_callback(self._finish_background)
+            return payload
+
+        self._count("misses")
+        return await asyncio.shield(self._start_afetch(endpoint, key, afetch))
+
+    def _start_afetch(self, endpoint: str, key: str, afetch) -> asyncio.Task:
+        """
+        Returns the in-flight fetch for a key, starting one if there is none.
+        Synchronous, so the task is registered before any other coroutine runs.
+        """
+        task = self._async_inflight.get((endpoint, key))
+        if task is None:
+
+            async def fetch_and_store():
+                try:
+                    payload = await afetch()
+                except Exception as e:
+                    self._count("errors")
+                    record_api_error(endpoint, e)
+                    raise
+                await asyncio.to_thread(self._store, endpoint, key, payload)
+                return payload
+
+            task = asyncio.ensure_future(fetch_and_store())
+            self._async_inflight[(endpoint, key)] = task
+            task.add_done_callback(
+                lambda _: self._async_inflight.pop((endpoint, key), None)
+            )
+        return task
+
+    def _finish_background(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Background refresh failed: {task.exception()}")
+
+
+_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -1,54 +1,132 @@
 # src/utils/ticker_checker.py
 
 import os
+import asyncio
+import httpx
 import requests
 from dotenv import load_dotenv
+from src.utils.ticker_index import get_ticker_index, remember_symbols
+from src.utils.metrics import record_api_error, timed
 
 load_dotenv()
 
+ALPHA_VANTAGE_QUERY_URL = "https://www.alphavantage.co/query"
+SYMBOL_SEARCH_SERVICE = "alpha_vantage_symbol_search"
 
+
+@timed("resolve")
 def find_best_ticker_match(keywords: str) -> tuple[str | None, str | None]:
     """
-    Searches Alpha Vantage for a ticker and returns the best match.
+    Resolves a ticker from the local symbol index, falling back to an Alpha
+    Vantage search whose results are added to the index for next time.
     Now includes better error handling for API rate limits.
     """
+    local_match = _resolve_locally(keywords)
+    if local_match:
+        return local_match
+
     api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
     if not api_key:
         print("Error: ALPHA_VANTAGE_API_KEY not found.")
         return None, None
 
-    url = f"https://www.alphavantage.co/query?function=SYMBOL_SEARCH&keywords={keywords}&apikey={api_key}"
+    params = {"function": "SYMBOL_SEARCH", "keywords": keywords, "apikey": api_key}
 
     try:
-        response = requests.get(url, timeout=30)
+        response = requests.get(ALPHA_VANTAGE_QUERY_URL, params=params, timeout=30)
         response.raise_for_status()
         data = response.json()
+        match = _parse_symbol_search(data, keywords)
+        _learn_match(data, match)
+        return match
+
+    except Exception as e:
+        record_api_error(SYMBOL_SEARCH_SERVICE, e)
+        print(f"An error occurred during ticker search: {e}")
+        return None, None
 
-        # NEW: Check for the rate limit note from the API
-        if "Note" in data:
-            print(
-                f"Alpha Vantage API rate limit likely exceeded. Response: {data['Note']}"
-            )
-            return None, None
 
-        if "bestMatches" in data and data["bestMatches"]:
-            best_match = data["bestMatches"][0]
-            symbol = best_match.get("1. symbol")
-            name = best_match.get("2. name")
+@timed("resolve")
+async def afind_best_ticker_match(keywords: str) -> tuple[str | None, str | None]:
+    """Async variant of `find_best_ticker_match` that doesn't block the event loop."""
+    # The first lookup loads the index from SQLite, so it runs off the loop.
+    local_match = await asyncio.to_thread(_resolve_locally, keywords)
+    if local_match:
+        return local_match
 
-            if not symbol or not name:
-                return None, None
+    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    if not api_key:
+        print("Error: ALPHA_VANTAGE_API_KEY not found.")
+        return None, None
 
-            cleaned_symbol = "".join(e for e in symbol if e.isalnum() or e in ".-_")
+    params = {"function": "SYMBOL_SEARCH", "keywords": keywords, "apikey": api_key}
 
-            if 3 <= len(cleaned_symbol) <= 63:
-                return cleaned_symbol, name
-            else:
-                return None, None
-        else:
-            print(f"No matches found for '{keywords}'. API response: {data}")
-            return None, None
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.get(ALPHA_VANTAGE_QUERY_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        match = _parse_symbol_search(data, keywords)
+        await asyncio.to_thread(_learn_match, data, match)
+        return match
 
     except Exception as e:
+        record_api_error(SYMBOL_SEARCH_SERVICE, e)
         print(f"An error occurred during ticker search: {e}")
         return None, None
+
+
+def _clean_symbol(symbol: str) -> str | None:
+    cleaned_symbol = "".join(e for e in symbol if e.isalnum() or e in ".-_")
+    # The ticker doubles as a Chroma collection name, which must be 3-63 chars.
+    return cleaned_symbol if 3 <= len(cleaned_symbol) <= 63 else None
+
+
+def _resolve_locally(keywords: str) -> tuple[str, str] | None:
+    match = get_ticker_index().lookup(keywords)
+    if not match:
+        return None
+    symbol, name, _ = match
+    cleaned_symbol = _clean_symbol(symbol)
+    return (cleaned_symbol, name) if cleaned_symbol else None
+
+
+def _learn_match(data: dict, match: tuple[str | None, str | None]):
+    """
+    Persists the match a SYMBOL_SEARCH resolved to into the local index. The
+    other results are often foreign listings of the same company, which would
+    compete with the primary listing for later name lookups.
+    """
+    symbol, name = match
+    if not symbol:
+        return
+    region = data["bestMatches"][0].get("4. region")
+    try:
+        remember_symbols([{"symbol": symbol, "name": name, "exchange": region}])
+    except Exception as e:
+        print(f"Could not store ticker search results locally: {e}")
+
+
+def _parse_symbol_search(data: dict, keywords: str) -> tuple[str | None, str | None]:
+    # NEW: Check for the rate limit note from the API
+    if "Note" in data:
+        record_api_error(SYMBOL_SEARCH_SERVICE, data["Note"])
+        print(f"Alpha Vantage API rate limit likely exceeded. Response: {data['Note']}")
+        return None, None
+
+    if "bestMatches" in data and data["bestMatches"]:
+        best_match = data["bestMatches"][0]
+        symbol = best_match.get("1. symbol")
+        name = best_match.get("2. name")
+
+        if not symbol or not name:
+            return None, None
+
+        cleaned_symbol = _clean_symbol(symbol)
+        if cleaned_symbol:
+            return cleaned_symbol, name
+        else:
+            return None, None
+    else:
+        print(f"No matches found for '{keywords}'. API response: {data}")
+        return None, None
@@ -0,0 +1,76 @@
+# src/utils/ticker_events.py
+
+import asyncio
+import threading
+from collections import defaultdict
+from src.utils.database_handler import (
+    register_progress_listener,
+    register_status_listener,
+)
+
+# States after which a ticker's ingestion produces no further events.
+TERMINAL_STATUSES = ("indexed", "failed", "cancelled")
+
+
+class TickerEventHub:
+    """
+    Fans ticker status changes and ingestion progress out to waiting clients.
+
+    Each subscriber owns an asyncio.Queue on its event loop. Publishing only
+    schedules a put on those loops, so it is safe from any thread (the ingestion
+    dispatcher, the threadpool) and a waiting subscriber costs nothing until an
+    event for its ticker arrives.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(dict)  # ticker -> {queue: loop}
+        self.published = 0
+
+    def subscribe(self, ticker: str) -> asyncio.Queue:
+        """Must be called from a running event loop."""
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[ticker.upper()][queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, ticker: str, queue: asyncio.Queue):
+        ticker = ticker.upper()
+        with self._lock:
+            subscribers = self._subscribers.get(ticker)
+            if subscribers is None:
+                return
+            subscribers.pop(queue, None)
+            if not subscribers:
+                del self._subscribers[ticker]
+
+    def publish(self, ticker: str, event: dict):
+        with self._lock:
+            targets = list(self._subscribers.get(ticker.upper(), {}).items())
+            self.published += 1
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # The subscriber's loop has already closed.
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def on_status_change(self, ticker: str, status: str):
+        self.publish(ticker, {"event": "status", "ticker": ticker, "status": status})
+
+    def on_progress(self, ticker: str, stage: str, progress: float):
+        event = {"event": "progress", "ticker": ticker, "stage": stage}
+        event["progress"] = progress
+        self.publish(ticker, event)
+
+
+_hub = TickerEventHub()
+register_status_listener(_hub.on_status_change)
+register_progress_listener(_hub.on_progress)
+
+
+def get_ticker_event_hub() -> TickerEventHub:
+    return _hub
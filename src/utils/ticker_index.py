@@ -0,0 +1,196 @@
+# src/utils/ticker_index.py
+
+import os
+import re
+import csv
+import argparse
+import bisect
+import threading
+from collections import Counter, defaultdict
+from src.utils.database_handler import (
+    initialize_database,
+    load_ticker_symbols,
+    upsert_ticker_symbols,
+)
+
+# Optional listing CSV (Alpha Vantage LISTING_STATUS format) imported on first use.
+TICKER_LISTING_PATH = os.getenv("TICKER_LISTING_PATH", "data/listing_status.csv")
+# Minimum trigram similarity for a fuzzy name match to be trusted locally.
+TICKER_FUZZY_THRESHOLD = float(os.getenv("TICKER_FUZZY_THRESHOLD", "0.6"))
+# A prefix name match is trusted only for queries of at least this many
+# characters that end on a word boundary or cover this share of the name.
+TICKER_PREFIX_MIN_CHARS = int(os.getenv("TICKER_PREFIX_MIN_CHARS", "3"))
+TICKER_PREFIX_MIN_COVERAGE = float(os.getenv("TICKER_PREFIX_MIN_COVERAGE", "0.5"))
+
+# Corporate suffixes that users routinely leave out ("Apple" vs "Apple Inc").
+_NAME_SUFFIXES = set(
+    "inc incorporated corp corporation co company ltd limited plc llc lp sa ag "
+    "nv se the class common stock shares ordinary".split()
+)
+
+
+def normalize_name(name: str) -> str:
+    words = re.sub(r"[^a-z0-9 ]+", " ", name.lower()).split()
+    kept = [w for w in words if w not in _NAME_SUFFIXES]
+    return " ".join(kept or words)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TickerIndex:
+    """
+    An in-process symbol index answering ticker lookups without an API call.
+
+    Exact symbols and exact or prefix name matches are served from sorted key
+    lists searched with bisect (a compact stand-in for a trie); misspellings
+    fall back to a trigram inverted index scored by Dice similarity. Ties
+    between equally good matches go to the symbol that was added first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # symbol -> (symbol, name)
+        self._names = []  # sorted (normalized name, symbol)
+        self._trigram_postings = defaultdict(set)  # trigram -> symbols
+        self._trigram_counts = {}  # symbol -> number of trigrams in its name
+        self._ranks = {}  # symbol -> order it was first added, for tie-breaks
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, symbol: str, name: str):
+        symbol = symbol.upper()
+        normalized = normalize_name(name)
+        with self._lock:
+            previous = self._entries.get(symbol)
+            if previous:
+                self._remove_name(symbol, normalize_name(previous[1]))
+            self._entries[symbol] = (symbol, name)
+            self._ranks.setdefault(symbol, len(self._ranks))
+            bisect.insort(self._names, (normalized, symbol))
+            grams = _trigrams(normalized)
+            for gram in grams:
+                self._trigram_postings[gram].add(symbol)
+            self._trigram_counts[symbol] = len(grams)
+
+    def _remove_name(self, symbol: str, normalized: str):
+        position = bisect.bisect_left(self._names, (normalized, symbol))
+        if position < len(self._names) and self._names[position] == (normalized, symbol):
+            del self._names[position]
+        for gram in _trigrams(normalized):
+            self._trigram_postings[gram].discard(symbol)
+
+    def lookup(self, query: str) -> tuple[str, str, float] | None:
+        """
+        Returns (symbol, name, score) for the best local match, or None.
+        An upper-case query is tried as a symbol first; otherwise names win, so
+        "ford" finds Ford Motor rather than the unrelated symbol FORD. A short
+        prefix of a long name ("a" for Apple) is too ambiguous to trust, so it
+        returns None and the caller falls back to the remote search.
+        """
+        query = query.strip()
+        if not query:
+            return None
+
+        normalized = normalize_name(query)
+        with self._lock:
+            entry = self._entries.get(query.upper())
+            if entry and query.isupper():
+                return entry[0], entry[1], 1.0
+
+            # Exact or prefix name match: the shortest name starting with the query.
+            position = bisect.bisect_left(self._names, (normalized, ""))
+            prefix_matches = []
+            for name, symbol in self._names[position : position + 50]:
+                if not name.startswith(normalized):
+                    break
+                prefix_matches.append((len(name), self._ranks[symbol], name, symbol))
+            if prefix_matches:
+                _, _, name, symbol = min(prefix_matches)
+                if name == normalized:
+                    return symbol, self._entries[symbol][1], 1.0
+                whole_words = name[len(normalized)] == " "
+                coverage = len(normalized) / len(name)
+                if len(normalized) >= TICKER_PREFIX_MIN_CHARS and (
+                    whole_words or coverage >= TICKER_PREFIX_MIN_COVERAGE
+                ):
+                    return symbol, self._entries[symbol][1], 0.9
+
+            if entry:
+                return entry[0], entry[1], 1.0
+            if prefix_matches:
+                return None
+
+            # Fuzzy match on shared trigrams.
+            query_grams = _trigrams(normalized)
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._trigram_postings.get(gram, ()))
+        if not shared:
+            return None
+
+        def dice(symbol: str) -> float:
+            return 2 * shared[symbol] / (len(query_grams) + self._trigram_counts[symbol])
+
+        best = max(shared, key=lambda symbol: (dice(symbol), -self._ranks[symbol]))
+        score = dice(best)
+        if score < TICKER_FUZZY_THRESHOLD:
+            return None
+        return best, self._entries[best][1], score
+
+
+def read_listing_csv(path: str) -> list[dict]:
+    """Reads an Alpha Vantage LISTING_STATUS CSV (symbol,name,exchange,...)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {"symbol": row["symbol"], "name": row["name"], "exchange": row.get("exchange")}
+            for row in csv.DictReader(f)
+            if row.get("symbol")
+            and row.get("name")
+            and (row.get("status") or "Active").lower() == "active"
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_ticker_index() -> TickerIndex:
+    """Returns the process-wide index, loading it from SQLite on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = TickerIndex()
+                symbols = load_ticker_symbols()
+                if not symbols and os.path.exists(TICKER_LISTING_PATH):
+                    symbols = read_listing_csv(TICKER_LISTING_PATH)
+                    upsert_ticker_symbols(symbols, source="listing")
+                for row in symbols:
+                    index.add(row["symbol"], row["name"])
+                print(f"Loaded {len(index)} ticker symbols into the local index.")
+                _index = index
+    return _index
+
+
+def remember_symbols(symbols: list[dict]):
+    """Adds symbols learned from the remote API to the index and persists them."""
+    if not symbols:
+        return
+    upsert_ticker_symbols(symbols, source="api")
+    index = get_ticker_index()
+    for row in symbols:
+        index.add(row["symbol"], row["name"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a ticker listing file.")
+    parser.add_argument("listing_csv", help="Alpha Vantage LISTING_STATUS CSV")
+    args = parser.parse_args()
+    initialize_database()
+    rows = read_listing_csv(args.listing_csv)
+    upsert_ticker_symbols(rows, source="listing")
+    print(f"Imported {len(rows)} symbols from {args.listing_csv}.")